@@ -0,0 +1,78 @@
+"""
+Near-duplicate lookup on synthetic hashes: the multi-index HashIndex against
+a blocked brute-force comparison of every pair.
+
+    python benchmarks/bench_duplicates.py --counts 1000 10000 100000
+
+Random 64-bit hashes with a few percent planted near-duplicates (up to
+--max-distance bits flipped). Both methods must find the same pairs; brute
+force is skipped above --brute-limit images.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from sorter.duplicates import DEFAULT_DISTANCE, HashIndex, popcount  # noqa: E402
+
+# Hashes compared against all others per brute-force step
+BLOCK = 2048
+
+
+def synthetic_hashes(count, max_distance, duplicates=0.05, seed=0):
+    rng = np.random.default_rng(seed)
+    hashes = rng.integers(0, 2**64, count, dtype=np.uint64)
+    copies = rng.choice(count, int(count * duplicates), replace=False)
+    for i in copies:
+        bits = rng.choice(64, rng.integers(0, max_distance + 1), replace=False)
+        mask = sum(1 << int(b) for b in bits)
+        hashes[(i + 1) % count] = hashes[i] ^ np.uint64(mask)
+    return hashes
+
+
+def brute_force(hashes, max_distance):
+    found = set()
+    for start in range(0, len(hashes), BLOCK):
+        block = hashes[start:start + BLOCK]
+        distances = popcount((block[:, None] ^ hashes[None, :]).ravel()).reshape(len(block), -1)
+        for i, j in zip(*np.nonzero(distances <= max_distance)):
+            if start + i < j:
+                found.add((int(start + i), int(j)))
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--max-distance", type=int, default=DEFAULT_DISTANCE)
+    parser.add_argument("--brute-limit", type=int, default=20000, help="largest count also run brute force")
+    args = parser.parse_args()
+
+    print(f"{'images':>8} {'index build':>12} {'pairs':>10} {'found':>8} {'brute force':>12}")
+    for count in args.counts:
+        hashes = synthetic_hashes(count, args.max_distance)
+        start = time.perf_counter()
+        index = HashIndex(hashes, args.max_distance)
+        build = time.perf_counter() - start
+        start = time.perf_counter()
+        pairs = index.pairs()
+        lookup = time.perf_counter() - start
+
+        brute = "-"
+        if count <= args.brute_limit:
+            start = time.perf_counter()
+            expected = brute_force(hashes, args.max_distance)
+            brute = f"{time.perf_counter() - start:.3f}s"
+            if {(i, j) for i, j, _ in pairs} != expected:
+                sys.exit(f"{count}: the index and brute force disagree")
+        print(f"{count:>8} {build:>11.3f}s {lookup:>9.3f}s {len(pairs):>8} {brute:>12}")
+
+
+if __name__ == "__main__":
+    main()
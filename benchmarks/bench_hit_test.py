@@ -0,0 +1,58 @@
+"""
+Per-motion-event cost of finding the drop target under the cursor.
+
+    python benchmarks/bench_hit_test.py --counts 100 1000 10000
+
+Compares the analytic GridGeometry.hit from sorter.layout with a linear scan
+over per-item cached rectangles (the shape of the old lookup, minus the Tk
+round-trips of winfo_containing which can't be measured without a display).
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sorter.layout import GridGeometry  # noqa: E402
+
+
+def linear_hit(rects, x, y):
+    for index, (rx, ry, w, h) in enumerate(rects):
+        if rx <= x < rx + w and ry <= y < ry + h:
+            return index, x < rx + w / 2
+    return None
+
+
+def time_per_call(fn, points):
+    start = time.perf_counter()
+    for x, y in points:
+        fn(x, y)
+    return (time.perf_counter() - start) / len(points) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--cols", type=int, default=7)
+    parser.add_argument("--events", type=int, default=20000, help="motion events per run")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'tiles':>8} {'geometry us':>12} {'linear us':>12}")
+    for count in args.counts:
+        geometry = GridGeometry(args.cols, count, 200, 230)
+        rects = [geometry.rect(i) for i in range(count)]
+        width, height = geometry.content_size
+        points = [(rng.uniform(0, width), rng.uniform(0, height)) for _ in range(args.events)]
+
+        # Fewer events for the O(n) scan so large grids finish in reasonable time
+        linear_points = points[:max(200, args.events * 100 // count)]
+        print(f"{count:>8} {time_per_call(geometry.hit, points):>12.2f} "
+              f"{time_per_call(lambda x, y: linear_hit(rects, x, y), linear_points):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Time to load architecture_metadata.js, and how many entries each parser finds.
+
+    python benchmarks/bench_metadata_parse.py --counts 100 1000 10000
+
+Compares the tokenizer in sorter.jsliteral (via core.load_metadata_entries)
+with the single re.findall the sorter used before, on generated files where
+a share of the entries have a description, escaped quotes or unusual spacing
+(the entries the regex silently dropped).
+"""
+
+import argparse
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from sorter import core  # noqa: E402
+
+OLD_RE = re.compile(r'"([^"]+)":\s*\{\s*location:\s*"([^"]*)"\s*\}')
+
+
+def regex_load(path):
+    return dict(OLD_RE.findall(Path(path).read_text(encoding='utf-8')))
+
+
+def make_metadata(count, odd_share, rng):
+    """Metadata mapping where odd_share of the entries trip up the old regex"""
+    mapping = {}
+    for i in range(count):
+        fields = {"location": rng.choice(["New York, NY", "London, UK", "Paris, France"])}
+        if rng.random() < odd_share:
+            kind = rng.randrange(3)
+            if kind == 0:
+                fields["description"] = f"Facade {i}, seen from the {{north}} side"
+            elif kind == 1:
+                fields["location"] = 'The "Gherkin", London'
+            else:
+                fields.update(width=3072, height=4080, aspect=0.7529, color="#9cbddc")
+        mapping[f"{i + 1:05d}_PXL_{rng.randrange(10 ** 9):09d}.webp"] = fields
+    return mapping
+
+
+def best_of(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--odd", type=float, default=0.2, help="share of entries the old regex can't read")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    print(f"{'entries':>8} {'tokenizer ms':>13} {'found':>7} {'regex ms':>9} {'found':>7}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.counts:
+            path = Path(tmp) / f"metadata_{count}.js"
+            core.save_metadata(make_metadata(count, args.odd, rng), path)
+            new_ms, new = best_of(lambda: core.load_metadata_entries(path), args.repeat)
+            old_ms, old = best_of(lambda: regex_load(path), args.repeat)
+            print(f"{count:>8} {new_ms:>13.2f} {len(new):>7} {old_ms:>9.2f} {len(old):>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+End-to-end timings of the sorter window on synthetic galleries.
+
+    python benchmarks/bench_sorter.py --out before.json
+    ... change something ...
+    python benchmarks/bench_sorter.py --out after.json
+    python benchmarks/compare.py before.json after.json
+
+Per gallery (--counts x --resolutions), each run in a fresh process:
+
+    startup_cold_*  ImageSorter() with an empty thumbnail cache: constructor,
+                    first layout pass (overlay gone), visible tiles decoded
+    startup_warm_*  the same with the cache the cold run filled
+    zoom_<level>_*  on_zoom_change handler, then until the visible tiles are
+                    final at that zoom (the slider debounce is skipped)
+    refresh_*       a full re-grid and the re-grid after one long move,
+                    including the layout pass
+    drag_event_*    on_drag per synthetic motion event (p50 / p99)
+    apply_*         plan and journaled renames for the reversed order, then
+                    back to the original one (renames per second)
+
+Needs a display: $DISPLAY if set, otherwise an Xvfb started for the run.
+"Cold" is the sorter's own cache; the OS page cache is warm after the first
+run. Galleries are generated once into --gallery-dir and reused.
+"""
+
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from gallery import Gallery, generate, parse_resolution  # noqa: E402
+from sorter.profiling import machine_info  # noqa: E402
+
+ZOOM_LEVELS = (150, 200, 100)
+REFRESH_REPEAT = 20
+DRAG_EVENTS = 500
+# on_drag auto-scrolls within this distance of the canvas edges
+SCROLL_ZONE = 100
+SETTLE_TIMEOUT = 600
+
+
+def elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+def pump(root, done, timeout=SETTLE_TIMEOUT):
+    """Run the Tk event loop until done() is true"""
+    deadline = time.perf_counter() + timeout
+    while not done():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("the sorter did not settle")
+        root.update()
+        # Leave the CPU to the decode workers between polls
+        time.sleep(0.001)
+
+
+def settled(app):
+    """No layout pass waiting and every queued decode installed"""
+    return not app.layout.pending and app._pending_decodes == 0
+
+
+class MotionEvent:
+    def __init__(self, widget, x_root, y_root):
+        self.widget = widget
+        self.x_root = x_root
+        self.y_root = y_root
+
+
+def measure_startup(root, gallery, mode):
+    from sorter.gui import ImageSorter
+
+    results = {}
+    start = time.perf_counter()
+    app = ImageSorter(root, autosave=False, image_dir=gallery.image_dir, thumb_dir=gallery.thumb_dir,
+                      metadata_file=gallery.metadata_file, cache_dir=gallery.cache_dir)
+    results[f"startup_{mode}_construct_ms"] = elapsed_ms(start)
+    pump(root, lambda: not hasattr(app, "loading_overlay"))
+    results[f"startup_{mode}_first_layout_ms"] = elapsed_ms(start)
+    pump(root, lambda: settled(app))
+    results[f"startup_{mode}_visible_ready_ms"] = elapsed_ms(start)
+    return app, results
+
+
+def measure_zoom(app, root):
+    results = {}
+    for level in ZOOM_LEVELS:
+        start = time.perf_counter()
+        app.on_zoom_change(level)
+        results[f"zoom_{level}_handler_ms"] = elapsed_ms(start)
+        # Skip the slider debounce: the refine pass is what's being measured
+        root.after_cancel(app._zoom_timer)
+        app.apply_zoom_images()
+        pump(root, lambda: settled(app))
+        results[f"zoom_{level}_settle_ms"] = elapsed_ms(start)
+    return results
+
+
+def measure_refresh(app, root):
+    count = len(app.model)
+    full, move = [], []
+    for _ in range(REFRESH_REPEAT):
+        start = time.perf_counter()
+        app.refresh_grid()
+        app.layout.run()
+        full.append(elapsed_ms(start))
+        root.update()
+
+        start = time.perf_counter()
+        app.refresh_grid(0, count // 2)
+        app.layout.run()
+        move.append(elapsed_ms(start))
+        root.update()
+    return {"refresh_full_ms": statistics.median(full), "refresh_move_ms": statistics.median(move)}
+
+
+def measure_drag(app, root):
+    tile = next(t for t in app.tile_pool if t['item'] is not None and t['item'].ready)
+    index = tile['index']
+    canvas_x, canvas_y = app.canvas.winfo_rootx(), app.canvas.winfo_rooty()
+    width, height = app.canvas.winfo_width(), app.canvas.winfo_height()
+    tile_x, tile_y = app.geometry.origin(index)
+    home = (canvas_x + tile_x + 10, canvas_y + tile_y - int(app.canvas.canvasy(0)) + 10)
+
+    event = MotionEvent(tile['frame'], *home)
+    app.start_drag(event, index)
+    rng = random.Random(0)
+    times = []
+    for _ in range(DRAG_EVENTS):
+        # Clear of the auto-scroll zones so the view stays put
+        event.x_root = canvas_x + rng.randrange(width)
+        event.y_root = canvas_y + SCROLL_ZONE + rng.randrange(max(1, height - 2 * SCROLL_ZONE))
+        start = time.perf_counter()
+        app.on_drag(event, index)
+        times.append(elapsed_ms(start))
+        root.update()
+    # Dropped where it was picked up: nothing moves
+    event.x_root, event.y_root = home
+    app.end_drag(event, index)
+
+    times.sort()
+    return {
+        "drag_event_p50_ms": times[len(times) // 2],
+        "drag_event_p99_ms": times[min(len(times) - 1, len(times) * 99 // 100)]
+    }
+
+
+def measure_apply(gallery):
+    """Apply the reversed order, then the original one again (the gallery ends up unchanged)"""
+    from sorter import core
+
+    results = {}
+    gallery.marker.unlink()
+    for step in ("reverse", "restore"):
+        thumb_names = set(os.listdir(gallery.thumb_dir))
+        locations = core.load_metadata(gallery.metadata_file)
+        entries = [
+            (f, core.find_thumbnail(gallery.thumb_dir, f, thumb_names), locations.get(f.name, ""))
+            for f in reversed(core.list_images(gallery.image_dir))
+        ]
+        start = time.perf_counter()
+        plan = core.plan_order(entries, gallery.image_dir, gallery.thumb_dir, metadata_file=gallery.metadata_file)
+        core.apply_plan(plan, gallery.image_dir, gallery.metadata_file)
+        results[f"apply_{step}_ms"] = elapsed_ms(start)
+        results[f"apply_{step}_renames_per_s"] = len(plan) / (results[f"apply_{step}_ms"] / 1000)
+    gallery.marker.touch()
+    return results
+
+
+def child(mode, gallery_root):
+    """One measurement run; prints its results as JSON on the last line"""
+    import tkinter as tk
+
+    gallery = Gallery(gallery_root)
+    if mode == "cold":
+        shutil.rmtree(gallery.cache_dir, ignore_errors=True)
+
+    root = tk.Tk()
+    app, results = measure_startup(root, gallery, mode)
+    if mode == "warm":
+        results.update(measure_zoom(app, root))
+        results.update(measure_refresh(app, root))
+        results.update(measure_drag(app, root))
+    root.destroy()
+    if mode == "warm":
+        results.update(measure_apply(gallery))
+    print(json.dumps(results))
+
+
+@contextmanager
+def display():
+    """$DISPLAY, or a private Xvfb server for the duration of the run"""
+    if os.environ.get("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+    xvfb = shutil.which("Xvfb")
+    if not xvfb:
+        sys.exit("No display: set DISPLAY or install Xvfb")
+    number = next(n for n in range(99, 200) if not os.path.exists(f"/tmp/.X11-unix/X{n}"))
+    server = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1920x1080x24", "-nolisten", "tcp"],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + 10
+        while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            if server.poll() is not None or time.monotonic() > deadline:
+                sys.exit("Xvfb failed to start")
+            time.sleep(0.05)
+        yield f":{number}"
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run_child(mode, gallery, display_name):
+    env = dict(os.environ, DISPLAY=display_name)
+    proc = subprocess.run([sys.executable, __file__, "--child", mode, str(gallery.root)],
+                          env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{mode} run failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def progress(stage, done, total):
+    if done == total or done % 100 == 0:
+        print(f"\r  {stage}: {done}/{total}", end="\n" if done == total else "", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--counts", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--resolutions", nargs="+", default=["1600x1200", "4000x3000"], help="WIDTHxHEIGHT")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per mode; the median is reported")
+    parser.add_argument("--gallery-dir", type=Path, default=Path(tempfile.gettempdir()) / "sorter-bench-galleries")
+    parser.add_argument("--out", type=Path, help="results JSON (default: printed only)")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "GALLERY"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    report = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "machine": machine_info(),
+        "config": {"repeat": args.repeat, "zoom_levels": ZOOM_LEVELS, "drag_events": DRAG_EVENTS},
+        "cases": {}
+    }
+    with display() as display_name:
+        for resolution in args.resolutions:
+            for count in args.counts:
+                case = f"{count}@{resolution}"
+                print(f"{case}")
+                gallery = generate(args.gallery_dir / case, count, parse_resolution(resolution), progress=progress)
+                runs = []
+                for _ in range(args.repeat):
+                    # Cold first: it leaves the cache filled for the warm run
+                    results = run_child("cold", gallery, display_name)
+                    results.update(run_child("warm", gallery, display_name))
+                    runs.append(results)
+                metrics = {name: round(statistics.median(run[name] for run in runs), 3) for name in runs[0]}
+                report["cases"][case] = metrics
+                for name, value in metrics.items():
+                    print(f"  {name:<36} {value:>12.3f}")
+
+    if args.out:
+        args.out.parent.mkdir(parents=True, exist_ok=True)
+        args.out.write_text(json.dumps(report, indent=1), encoding="utf-8")
+        print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
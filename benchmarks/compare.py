@@ -0,0 +1,69 @@
+"""
+Compare two bench_sorter.py result files.
+
+    python benchmarks/compare.py before.json after.json --threshold 10
+
+Prints every metric both files have, with the change in percent, and marks
+changes beyond --threshold as faster or slower (metrics ending in _per_s are
+throughputs, higher is better; everything else is a time). Exits with 1 if
+anything got slower, so it can gate a change.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def load(path):
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+
+def verdict(name, before, after, threshold):
+    """(change in percent, '' / 'faster' / 'slower')"""
+    if not before:
+        return None, ""
+    change = (after - before) / before * 100
+    better = change > 0 if name.endswith("_per_s") else change < 0
+    if abs(change) < threshold:
+        return change, ""
+    return change, "faster" if better else "slower"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="percent change worth flagging")
+    args = parser.parse_args()
+
+    before, after = load(args.before), load(args.after)
+    for label, report in (("before", before), ("after", after)):
+        print(f"{label:>6}: {report.get('revision') or '?'} {report.get('created', '')} "
+              f"({report['machine'].get('platform')}, {report['machine'].get('cpus')} CPUs)")
+    if before["machine"] != after["machine"]:
+        print("Warning: the runs were on different machines or software versions")
+
+    slower = 0
+    for case in before["cases"]:
+        if case not in after["cases"]:
+            print(f"\n{case}: only in {args.before}")
+            continue
+        print(f"\n{case}")
+        print(f"  {'metric':<36} {'before':>12} {'after':>12} {'change':>8}")
+        old, new = before["cases"][case], after["cases"][case]
+        for name in old:
+            if name not in new:
+                continue
+            change, label = verdict(name, old[name], new[name], args.threshold)
+            change_text = f"{change:+.1f}%" if change is not None else "-"
+            print(f"  {name:<36} {old[name]:>12.3f} {new[name]:>12.3f} {change_text:>8}  {label}")
+            slower += label == "slower"
+
+    if slower:
+        print(f"\n{slower} metrics slower by more than {args.threshold:g}%")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
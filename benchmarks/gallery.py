@@ -0,0 +1,85 @@
+"""
+Synthetic galleries for the benchmarks: the repo's layout (images, thumbs/,
+architecture_metadata.js) with count JPEGs of a given resolution.
+
+Every image differs (the thumbnail cache is keyed on content), and galleries
+are generated once per (count, resolution) and reused, since 10k images at
+12 MP take a while to write.
+"""
+
+import random
+import shutil
+from pathlib import Path
+
+from PIL import Image
+
+from sorter import core, planner, thumbs
+from sorter.cache import CACHE_DIR_NAME
+
+LOCATIONS = ["New York, NY", "London, UK", "Paris, France", "Tokyo, Japan", ""]
+
+
+class Gallery:
+    """Paths of one generated gallery under root"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.image_dir = self.root / "public" / "images" / "architecture"
+        self.thumb_dir = self.image_dir / "thumbs"
+        self.metadata_file = self.root / "src" / "data" / "architecture_metadata.js"
+        self.cache_dir = self.root / CACHE_DIR_NAME
+        # Removed while a benchmark renames files, so a broken gallery is rebuilt
+        self.marker = self.root / ".complete"
+
+    @property
+    def complete(self):
+        return self.marker.exists()
+
+
+def parse_resolution(text):
+    width, _, height = text.lower().partition("x")
+    return int(width), int(height)
+
+
+def generate(root, count, resolution, seed=0, progress=None):
+    """Gallery of count images at resolution (width, height) in root, reused if already complete"""
+    gallery = Gallery(root)
+    if gallery.complete:
+        return gallery
+    if gallery.root.exists():
+        shutil.rmtree(gallery.root)
+    gallery.image_dir.mkdir(parents=True)
+    gallery.metadata_file.parent.mkdir(parents=True)
+
+    rng = random.Random(seed)
+    width, height = resolution
+    base = Image.merge("RGB", (
+        Image.linear_gradient("L").resize((width, height)),
+        Image.effect_noise((width, height), 32),
+        Image.linear_gradient("L").rotate(90).resize((width, height))
+    ))
+    # Named the way Apply Changes numbers them, so a reorder and back restores the gallery
+    names = planner.numbered_names([
+        f"PXL_2025{rng.randrange(1, 13):02d}{rng.randrange(1, 29):02d}_{i:09d}.jpg" for i in range(count)
+    ])
+    metadata = {}
+    for i, name in enumerate(names):
+        # A block of its own colour at its own spot makes each file unique
+        img = base.copy()
+        box_w, box_h = width // 4, height // 4
+        x, y = rng.randrange(width - box_w), rng.randrange(height - box_h)
+        img.paste(tuple(rng.randrange(256) for _ in range(3)), (x, y, x + box_w, y + box_h))
+        img.save(gallery.image_dir / name, quality=85)
+        location = rng.choice(LOCATIONS)
+        if location:
+            metadata[name] = {"location": location}
+        if progress:
+            progress("images", i + 1, count)
+
+    failures = thumbs.build(gallery.image_dir, gallery.thumb_dir, names,
+                            progress=(lambda done, total, _: progress("thumbs", done, total)) if progress else None)
+    if failures:
+        raise RuntimeError(f"{len(failures)} thumbnails failed, e.g. {failures[0][0]}: {failures[0][1]}")
+    core.save_metadata(metadata, gallery.metadata_file)
+    gallery.marker.touch()
+    return gallery
@@ -0,0 +1,113 @@
+"""
+Peak RSS of the sorter's zoom image cache: full-resolution copies (the old
+'original_image' per tile) versus capped masters from sorter.imagestore.
+
+    python benchmarks/memory_report.py --count 500 --megapixels 12
+
+Each strategy runs in its own subprocess so peak RSS is measured cleanly.
+Synthetic JPEGs are generated once into --dir (default: a temp directory).
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS reports bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def generate(directory, count, megapixels):
+    """Write count synthetic JPEGs of roughly the given size (4:3)"""
+    directory.mkdir(parents=True, exist_ok=True)
+    height = int((megapixels * 1_000_000 * 3 / 4) ** 0.5)
+    width = height * 4 // 3
+    base = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 24)
+    paths = []
+    for i in range(count):
+        path = directory / f"synthetic_{i:04d}.jpg"
+        if not path.exists():
+            tint = Image.merge("RGB", (base, noise, base.rotate(180 if i % 2 else 0)))
+            tint.save(path, quality=85)
+        paths.append(path)
+    return paths
+
+
+def run_legacy(paths):
+    """What load_images used to keep: a full-resolution copy plus the 200px thumbnail"""
+    kept = []
+    for path in paths:
+        with Image.open(path) as file_img:
+            file_img.load()
+            img = file_img.copy()
+        original_img = img.copy()
+        img.thumbnail((200, 200), Image.Resampling.LANCZOS)
+        kept.append((original_img, img))
+    return kept
+
+
+def run_store(paths):
+    """Capped masters (300% tile size), no eviction"""
+    from sorter.imagestore import ImageStore
+    store = ImageStore(budget_bytes=float("inf"))
+    kept = []
+    for path in paths:
+        img = store.master(path).copy()
+        img.thumbnail((200, 200), Image.Resampling.LANCZOS)
+        kept.append(img)
+    return store
+
+
+MODES = {"legacy": run_legacy, "store": run_store}
+
+
+def child(mode, directory):
+    paths = sorted(Path(directory).glob("*.jpg"))
+    start = time.perf_counter()
+    MODES[mode](paths)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({"mode": mode, "images": len(paths), "peak_rss_mb": round(peak_rss_mb(), 1),
+                      "seconds": round(elapsed, 2)}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=500)
+    parser.add_argument("--megapixels", type=float, default=12)
+    parser.add_argument("--dir", type=Path, help="where to keep the synthetic images")
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.dir)
+        return
+
+    directory = args.dir or Path(tempfile.gettempdir()) / f"sorter_mem_{args.count}_{args.megapixels:g}mp"
+    print(f"Generating {args.count} x {args.megapixels:g} MP images in {directory} ...")
+    generate(directory, args.count, args.megapixels)
+
+    for mode in args.modes:
+        out = subprocess.run(
+            [sys.executable, __file__, "--child", mode, "--dir", str(directory)],
+            capture_output=True, text=True, check=True
+        )
+        result = json.loads(out.stdout)
+        print(f"{mode:>8}: peak RSS {result['peak_rss_mb']:>9.1f} MB  "
+              f"({result['images']} images, {result['seconds']} s)")
+
+
+if __name__ == "__main__":
+    main()
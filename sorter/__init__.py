@@ -0,0 +1,4 @@
+"""
+Architecture image sorter (launched by image_sorter.py).
+Only sorter.gui imports tkinter; everything else runs headless.
+"""
@@ -0,0 +1,251 @@
+"""
+Suggested orderings for the gallery, from cheap per-image features:
+
+    color     64-bin RGB histogram (4 levels per channel) of the thumbnail
+    time      capture time from Pixel names (PXL_YYYYMMDD_HHMMSSmmm), else
+              EXIF DateTimeOriginal / DateTime of the full resolution file
+    location  from architecture_metadata.js (or as typed in the window)
+
+Modes:
+
+    location  grouped by location, groups in the order of their first shot
+              and images without a location last, chronological within
+    time      chronological
+    visual    greedy nearest-neighbour walk from the current first image:
+              each image is followed by the one whose colors are closest
+
+Images without a time keep their current relative order after the dated
+ones. Colors and EXIF times are computed in batches in worker processes and
+cached in the sorter's cache directory by file identity (which survives
+renames), so arranging again, in any mode, only reads the cache.
+"""
+
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from sorter.cache import CACHE_DIR_NAME
+from sorter.core import REPO_DIR, find_thumbnail, strip_prefix, write_atomic
+
+MODES = ("location", "time", "visual")
+DEFAULT_MODE = "location"
+CACHE_FILE = REPO_DIR / CACHE_DIR_NAME / "features.json"
+# Thumbnails per worker task
+BATCH_SIZE = 256
+# Pixels sampled per image for the histogram
+COLOR_SAMPLE = 64
+# Levels per channel: LEVELS ** 3 histogram bins
+LEVELS = 4
+BINS = LEVELS ** 3
+# Bump when the features change so cached entries are rebuilt
+VERSION = 1
+
+PIXEL_NAME_RE = re.compile(r'PXL_(\d{8})_(\d{6})(\d{3})?')
+EXIF_FORMAT = "%Y:%m:%d %H:%M:%S"
+EXIF_IFD = 0x8769
+EXIF_DATETIME_ORIGINAL = 0x9003
+EXIF_DATETIME = 0x0132
+
+
+def time_from_name(name):
+    """Capture time encoded in a Pixel camera file name, or None"""
+    match = PIXEL_NAME_RE.search(name)
+    if not match:
+        return None
+    date, clock, millis = match.groups()
+    try:
+        taken = datetime.strptime(date + clock, "%Y%m%d%H%M%S")
+    except ValueError:
+        return None
+    return taken.replace(microsecond=int(millis or 0) * 1000)
+
+
+def _exif_time(img):
+    exif = img.getexif()
+    text = exif.get_ifd(EXIF_IFD).get(EXIF_DATETIME_ORIGINAL) or exif.get(EXIF_DATETIME)
+    try:
+        return datetime.strptime(str(text).strip("\x00 "), EXIF_FORMAT).isoformat()
+    except ValueError:
+        return None
+
+
+def histograms(pixels):
+    """(n, pixels, 3) uint8 -> (n, BINS) color histograms, each summing to 1"""
+    levels = (pixels // (256 // LEVELS)).astype(np.intp)
+    bins = (levels[..., 0] * LEVELS + levels[..., 1]) * LEVELS + levels[..., 2]
+    # One bincount for the batch: image i counts into bins i * BINS ...
+    bins += np.arange(len(pixels))[:, None] * BINS
+    counts = np.bincount(bins.ravel(), minlength=len(pixels) * BINS).reshape(-1, BINS)
+    return counts / pixels.shape[1]
+
+
+def compute_features(sources):
+    """Features of each (image, preview) pair as a dict, None where it can't be read (runs in a worker)"""
+    from PIL import Image, ImageOps
+
+    pixels = np.zeros((len(sources), COLOR_SAMPLE * COLOR_SAMPLE, 3), np.uint8)
+    times = []
+    for i, (src, preview) in enumerate(sources):
+        # Exactly one entry per source, so times stays in step with pixels
+        try:
+            with Image.open(src) as img:
+                taken = _exif_time(img)
+            with Image.open(preview or src) as img:
+                img.draft("RGB", (COLOR_SAMPLE, COLOR_SAMPLE))
+                img = ImageOps.exif_transpose(img).convert("RGB")
+                img = img.resize((COLOR_SAMPLE, COLOR_SAMPLE), Image.Resampling.BOX)
+            pixels[i] = np.asarray(img).reshape(-1, 3)
+        except OSError:
+            taken = False
+        times.append(taken)
+
+    # Stored as 0-255 per bin of the square root (see visual_flow)
+    levels = np.round(np.sqrt(histograms(pixels)) * 255).astype(np.uint8)
+    return [
+        {"time": taken, "color": levels[i].tobytes().hex()} if taken is not False else None
+        for i, taken in enumerate(times)
+    ]
+
+
+def _identity(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def image_features(image_files, thumb_dir, cache_file=CACHE_FILE, jobs=None, force=False, progress=None):
+    """
+    Features of image_files. Returns (files, times, colors): the files that
+    could be read, their capture times (datetime or None) and an (n, BINS)
+    float32 array of unit-length color vectors, all in the same order.
+    """
+    cache_file = Path(cache_file)
+    try:
+        cache = json.loads(cache_file.read_text(encoding='utf-8'))
+        if cache.get("version") != VERSION:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    cached = {} if force else cache.get("entries", {})
+
+    thumb_names = set(os.listdir(thumb_dir)) if Path(thumb_dir).is_dir() else set()
+    keys = {}
+    entries = {}
+    todo = []
+    for src in image_files:
+        preview = find_thumbnail(thumb_dir, src, thumb_names)
+        # The preview is part of the key: a rebuilt thumbnail changes the pixels
+        key = _identity(src) + ("|" + _identity(preview) if preview else "")
+        keys[src] = key
+        if key in cached:
+            entries[key] = cached[key]
+        else:
+            todo.append((key, (src, preview)))
+
+    batches = [todo[i:i + BATCH_SIZE] for i in range(0, len(todo), BATCH_SIZE)]
+    if len(batches) > 1 and jobs != 1:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(compute_features, [[sources for _, sources in batch] for batch in batches])
+    else:
+        pool = None
+        results = (compute_features([sources for _, sources in batch]) for batch in batches)
+    try:
+        done = 0
+        for batch, batch_features in zip(batches, results):
+            for (key, _), found in zip(batch, batch_features):
+                if found is not None:
+                    entries[key] = found
+            done += len(batch)
+            if progress:
+                progress(done, len(todo))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Keep only what the current files need; an unchanged cache isn't rewritten
+    if todo or len(entries) != len(cached) or cache.get("version") != VERSION:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(cache_file, json.dumps({"version": VERSION, "entries": entries}))
+
+    files = [f for f in image_files if keys[f] in entries]
+    times = []
+    for f in files:
+        taken = entries[keys[f]]["time"]
+        times.append(time_from_name(strip_prefix(f.name)) or (datetime.fromisoformat(taken) if taken else None))
+    colors = np.frombuffer(
+        bytes.fromhex("".join(entries[keys[f]]["color"] for f in files)), np.uint8
+    ).reshape(-1, BINS).astype(np.float32)
+    # Rounding moved the vectors off unit length
+    colors /= np.maximum(np.linalg.norm(colors, axis=1, keepdims=True), 1e-6)
+    return files, times, colors
+
+
+def chronological(indices, times):
+    """indices sorted by time; undated ones keep their order at the end"""
+    return sorted(indices, key=lambda i: (times[i] is None, times[i] or datetime.min, i))
+
+
+def by_location(locations, times):
+    """Indices grouped by location, chronological within a group"""
+    groups = {}
+    for i, location in enumerate(locations):
+        groups.setdefault(location.strip().casefold(), []).append(i)
+    unplaced = groups.pop("", [])
+    ordered = [chronological(group, times) for group in groups.values()]
+    # A group goes where its first shot would go in a chronological order
+    ordered.sort(key=lambda group: (times[group[0]] is None, times[group[0]] or datetime.min, group[0]))
+    return [i for group in ordered for i in group] + chronological(unplaced, times)
+
+
+def visual_flow(colors, start=0):
+    """
+    Greedy nearest-neighbour walk from start over unit-length color vectors.
+    The vectors hold square roots of histograms, so the largest dot product
+    is the smallest Hellinger distance.
+    """
+    count = len(colors)
+    if not count:
+        return []
+    order = [start]
+    current = start
+    # Candidates still to visit; compacted when half of them are gone
+    remaining = np.delete(np.arange(count), start)
+    pool = colors[remaining]
+    alive = np.ones(len(remaining), bool)
+    left = len(remaining)
+    while left:
+        similarity = pool @ colors[current]
+        similarity[~alive] = -np.inf
+        pick = int(np.argmax(similarity))
+        alive[pick] = False
+        left -= 1
+        current = int(remaining[pick])
+        order.append(current)
+        if left and left * 2 < len(remaining):
+            remaining = remaining[alive]
+            pool = colors[remaining]
+            alive = np.ones(len(remaining), bool)
+    return order
+
+
+def suggest_order(image_files, thumb_dir, locations, mode=DEFAULT_MODE, cache_file=CACHE_FILE,
+                  jobs=None, force=False, progress=None):
+    """
+    image_files (in their current order) rearranged by mode. locations maps
+    file names to location text. Files that can't be read stay at the end.
+    """
+    if mode not in MODES:
+        raise ValueError(f"Unknown arrange mode {mode!r} (expected one of {', '.join(MODES)})")
+    files, times, colors = image_features(image_files, thumb_dir, cache_file, jobs, force, progress)
+    if mode == "visual":
+        order = visual_flow(colors)
+    elif mode == "time":
+        order = chronological(range(len(files)), times)
+    else:
+        order = by_location([locations.get(f.name, "") for f in files], times)
+    readable = set(files)
+    return [files[i] for i in order] + [f for f in image_files if f not in readable]
@@ -0,0 +1,89 @@
+"""
+Background autosave of metadata edits (locations typed in the sorter).
+
+Edits are collected and written with core.update_metadata once no new edit
+has come in for a short delay, on a thread of its own so the Tk thread never
+waits for the disk. Only the edited entries change in the file.
+"""
+
+import threading
+import time
+
+from sorter import core
+
+AUTOSAVE_DELAY = 1.0  # Seconds of quiet before pending edits are written
+
+
+class MetadataAutosaver:
+    """Debounced writer of per-file metadata updates"""
+
+    def __init__(self, metadata_file=core.METADATA_FILE, delay=AUTOSAVE_DELAY):
+        self.metadata_file = metadata_file
+        self.delay = delay
+        self._pending = {}
+        self._deadline = None
+        self._writing = False
+        self._attempts = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="metadata-autosave", daemon=True)
+        self._thread.start()
+
+    def update(self, filename, **fields):
+        """Queue new field values for filename (None or "" removes a field)"""
+        with self._cond:
+            self._pending.setdefault(filename, {}).update(fields)
+            self._deadline = time.monotonic() + self.delay
+            self._cond.notify_all()
+
+    def flush(self):
+        """Write pending edits now and wait for the attempt (a failure is printed, not raised)"""
+        with self._cond:
+            # The write in progress (if any) plus one for what's pending
+            target = self._attempts + self._writing + bool(self._pending)
+            if self._pending:
+                self._deadline = time.monotonic()
+                self._cond.notify_all()
+            while self._attempts < target and self._thread.is_alive():
+                self._cond.wait(0.1)
+
+    def close(self):
+        """Write whatever is pending and stop the thread"""
+        self.flush()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _run(self):
+        with self._cond:
+            while True:
+                # Wait for edits, then for the delay to pass without new ones
+                while not self._closed and (not self._pending or time.monotonic() < self._deadline):
+                    timeout = None if not self._pending else self._deadline - time.monotonic()
+                    self._cond.wait(timeout)
+                if not self._pending:
+                    return
+
+                updates, self._pending = self._pending, {}
+                self._writing = True
+                self._cond.release()
+                try:
+                    core.update_metadata(updates, self.metadata_file)
+                    failed = None
+                except Exception as e:
+                    print(f"Error saving metadata: {e}")
+                    failed = updates
+                finally:
+                    self._cond.acquire()
+                    self._writing = False
+                    self._attempts += 1
+
+                if failed:
+                    # Retry later, without overwriting edits made meanwhile
+                    for filename, fields in failed.items():
+                        self._pending[filename] = dict(fields, **self._pending.get(filename, {}))
+                    self._deadline = time.monotonic() + self.delay
+                    if self._closed:
+                        self._pending.clear()
+                self._cond.notify_all()
@@ -0,0 +1,167 @@
+"""
+Persistent on-disk cache of pre-scaled grid thumbnails.
+
+Blobs are PNG files keyed on the *content* hash of the source image plus the
+pixel size they were scaled to, so renaming a file (e.g. by Apply Changes)
+never invalidates its entries. A small index maps file identity
+(inode, size, mtime) to the content hash so unchanged files are not re-hashed
+on every launch. Total blob size is capped and the least recently used blobs
+are evicted first.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+CACHE_DIR_NAME = ".sorter_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Zoom levels are quantized so nearby slider positions share cache entries
+ZOOM_BUCKET = 10  # percent
+
+# Zoom levels pre-rendered in the background so most zoom changes are a blob read
+MIP_ZOOMS = (100, 150, 200, 300)
+
+# Bump when thumbnails are rendered differently (2: EXIF orientation applied)
+# so blobs from before aren't served; they age out through the LRU
+RENDER_VERSION = 2
+
+
+def zoom_bucket(zoom_level):
+    """Round a zoom percentage down to its cache bucket"""
+    return max(ZOOM_BUCKET, int(zoom_level) // ZOOM_BUCKET * ZOOM_BUCKET)
+
+
+def hash_file(path, chunk_size=1024 * 1024):
+    """Content hash of a file (hex digest)"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ThumbnailCache:
+    """Thread-safe LRU cache of scaled thumbnails stored as PNG blobs"""
+
+    def __init__(self, cache_dir, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.blob_dir = self.cache_dir / "blobs"
+        self.index_file = self.cache_dir / "index.json"
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._hashes = {}
+        self._dirty = False
+
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        if self.index_file.exists():
+            try:
+                self._hashes = json.loads(self.index_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._hashes = {}
+
+        self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(self.blob_dir))
+
+    @staticmethod
+    def _identity(stat):
+        # No file name in the identity: a rename keeps inode, size and mtime
+        return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    def content_key(self, path):
+        """Content hash for a source file, hashing only when its identity is new"""
+        identity = self._identity(os.stat(path))
+        with self._lock:
+            key = self._hashes.get(identity)
+        if key is None:
+            key = hash_file(path)
+            with self._lock:
+                self._hashes[identity] = key
+                self._dirty = True
+        return key
+
+    def blob_path(self, key, size):
+        return self.blob_dir / f"{key}_{size}_r{RENDER_VERSION}.png"
+
+    def get(self, key, size):
+        """Return the PNG bytes for (key, size), or None on a miss"""
+        blob = self.blob_path(key, size)
+        try:
+            data = blob.read_bytes()
+        except OSError:
+            return None
+        # Touch so eviction sees this blob as recently used
+        try:
+            os.utime(blob)
+        except OSError:
+            pass
+        return data
+
+    def has(self, key, size):
+        return self.blob_path(key, size).exists()
+
+    def nearest(self, key, size, sizes, larger_only=False):
+        """
+        PNG bytes of the cached entry among sizes closest to size, preferring
+        the smallest one at least as large. Returns None if none is cached.
+        """
+        larger = sorted(s for s in sizes if s >= size)
+        smaller = [] if larger_only else sorted((s for s in sizes if s < size), reverse=True)
+        for candidate in larger + smaller:
+            data = self.get(key, candidate)
+            if data is not None:
+                return data
+        return None
+
+    def put(self, key, size, img):
+        """Store a scaled PIL image, evicting old blobs if over the size cap"""
+        blob = self.blob_path(key, size)
+        tmp = blob.with_name(f"{blob.name}.{threading.get_ident()}.tmp")
+        # Low compression keeps writes cheap; decode speed is the same
+        img.save(tmp, "PNG", compress_level=1)
+        new_bytes = tmp.stat().st_size
+        old_bytes = blob.stat().st_size if blob.exists() else 0
+        os.replace(tmp, blob)
+
+        with self._lock:
+            self._total_bytes += new_bytes - old_bytes
+            over_cap = self._total_bytes > self.max_bytes
+        if over_cap:
+            self.prune()
+
+    def prune(self):
+        """Evict least recently used blobs until the cache fits its size cap"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in os.scandir(self.blob_dir):
+                if entry.name.endswith(".tmp"):
+                    continue  # being written by another thread
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+
+            # Leave some headroom so we don't prune again on the next put
+            target = int(self.max_bytes * 0.9)
+            for _, size, path in sorted(entries):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._total_bytes = total
+
+    def flush(self):
+        """Persist the identity -> content hash index"""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self._hashes)
+            self._dirty = False
+        tmp = self.index_file.with_suffix(".tmp")
+        tmp.write_text(data, encoding='utf-8')
+        os.replace(tmp, self.index_file)
@@ -0,0 +1,452 @@
+"""
+Command line entry point for image_sorter.py.
+
+    python image_sorter.py                          # drag-and-drop window
+    python -m image_sorter apply --order order.json # headless renumbering
+    python -m image_sorter migrate                  # one prefix width + order manifest
+    python -m image_sorter arrange --out order.json # suggested order for `apply`
+
+Subcommands import only what they need; `apply` never loads tkinter or Pillow.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+from sorter import core, planner, profiling, thumbs
+
+
+def recover_before_renaming(image_dir):
+    """Finish an interrupted rename first. Returns False if that failed."""
+    try:
+        recovered = core.recover_pending(image_dir)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: interrupted rename could not be recovered: {e}", file=sys.stderr)
+        return False
+    if recovered:
+        print(f"Warning: an interrupted rename was {recovered}")
+    return True
+
+
+def run_plan(plan, count, image_dir, metadata_file, dry_run):
+    """Print the plan, then execute it unless dry_run"""
+    print(f"Plan: {plan.describe()} for {count} images")
+
+    if dry_run:
+        for src, dst in plan.ops:
+            print(f"  {os.path.relpath(src, image_dir)} -> {os.path.relpath(dst, image_dir)}")
+        return 0
+
+    core.apply_plan(plan, image_dir, metadata_file)
+    print(f"Renamed {len(plan)} files and updated {metadata_file} and {core.order_manifest_for(metadata_file).name}")
+    return 0
+
+
+def cmd_apply(args):
+    """Renumber images (and thumbnails) to match an order file"""
+    image_dir = Path(args.image_dir)
+    thumb_dir = Path(args.thumb_dir) if args.thumb_dir else image_dir / "thumbs"
+
+    if not args.dry_run and not recover_before_renaming(image_dir):
+        return 1
+
+    image_files = core.list_images(image_dir)
+    if not image_files:
+        print(f"Error: No images found in {image_dir}", file=sys.stderr)
+        return 1
+
+    try:
+        order = core.read_order_file(args.order)
+        ordered = core.resolve_order(order, image_files)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    metadata = core.load_metadata(args.metadata)
+    locations = {}
+    for name, location in order:
+        if location is not None:
+            locations[name] = location
+
+    thumb_names = set(os.listdir(thumb_dir)) if thumb_dir.is_dir() else set()
+    entries = []
+    for image_file in ordered:
+        thumb_file = core.find_thumbnail(thumb_dir, image_file, thumb_names)
+        # Location from the order file if it has one, else keep the current one
+        location = locations.get(image_file.name)
+        if location is None:
+            location = locations.get(core.strip_prefix(image_file.name))
+        if location is None:
+            location = metadata.get(image_file.name, "")
+        entries.append((image_file, thumb_file, location))
+
+    try:
+        plan = core.plan_order(entries, image_dir, thumb_dir, args.numbering, args.step, args.metadata)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return run_plan(plan, len(entries), image_dir, args.metadata, args.dry_run)
+
+
+def cmd_migrate(args):
+    """
+    Renumber every image in its current order in one journaled batch, so all
+    prefixes share the width the collection needs, and write the order manifest
+    """
+    image_dir = Path(args.image_dir)
+    thumb_dir = Path(args.thumb_dir) if args.thumb_dir else image_dir / "thumbs"
+
+    if not args.dry_run and not recover_before_renaming(image_dir):
+        return 1
+
+    # Current order: the manifest if there is one, else the number prefixes
+    order = core.load_order_manifest(core.order_manifest_for(args.metadata))
+    image_files = core.list_images(image_dir, order)
+    if not image_files:
+        print(f"Error: No images found in {image_dir}", file=sys.stderr)
+        return 1
+
+    metadata = core.load_metadata(args.metadata)
+    thumb_names = set(os.listdir(thumb_dir)) if thumb_dir.is_dir() else set()
+    entries = [
+        (image_file, core.find_thumbnail(thumb_dir, image_file, thumb_names), metadata.get(image_file.name, ""))
+        for image_file in image_files
+    ]
+    try:
+        plan = core.plan_order(entries, image_dir, thumb_dir, args.numbering, args.step, args.metadata)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    return run_plan(plan, len(entries), image_dir, args.metadata, args.dry_run)
+
+
+def cmd_recover(args):
+    """Finish or undo an interrupted rename"""
+    try:
+        recovered = core.recover_pending(args.image_dir, rollback=args.rollback)
+    except (OSError, RuntimeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"Interrupted rename {recovered}" if recovered else "Nothing to recover")
+    return 0
+
+
+def cmd_thumbs(args):
+    """Generate missing or stale thumbnails, or just report with --check"""
+    image_dir = Path(args.image_dir)
+    thumb_dir = Path(args.thumb_dir) if args.thumb_dir else image_dir / "thumbs"
+
+    start = time.perf_counter()
+    status = thumbs.check(image_dir, thumb_dir)
+    if args.check:
+        for label, names in (("missing", status.missing), ("stale", status.stale), ("orphaned", status.orphaned)):
+            for name in names:
+                print(f"{label:>8}  {name}")
+        print(f"{status.summary()} ({time.perf_counter() - start:.3f}s)")
+        return 0 if status.clean else 1
+
+    todo = sorted(status.missing + status.stale + (status.ok_names if args.force else []))
+    if status.orphaned:
+        if args.prune:
+            thumbs.prune(thumb_dir, status.orphaned)
+            print(f"Removed {len(status.orphaned)} orphaned thumbnails")
+        else:
+            print(f"Warning: {len(status.orphaned)} orphaned thumbnails (remove with --prune)")
+
+    def progress(done, total, name):
+        print(f"[{done}/{total}] {name}")
+
+    failures = thumbs.build(image_dir, thumb_dir, todo, args.width, args.quality, args.jobs, progress)
+    for name, error in failures:
+        print(f"Error: {name}: {error}", file=sys.stderr)
+    print(f"Built {len(todo) - len(failures)} thumbnails in {time.perf_counter() - start:.1f}s")
+    return 1 if failures else 0
+
+
+def cmd_derivatives(args):
+    """Generate srcset derivatives and the image manifest"""
+    # Imported here: hashing and the pool aren't needed by the other commands
+    from sorter import derivatives
+
+    formats = ["webp"]
+    if args.avif:
+        if derivatives.avif_supported():
+            formats.append("avif")
+        else:
+            print("Warning: this Pillow build has no AVIF support, writing WebP only")
+
+    start = time.perf_counter()
+    builder = derivatives.DerivativeBuilder(args.image_dir, args.widths, formats)
+
+    def progress(done, total, name):
+        print(f"[{done}/{total}] {name}")
+
+    rendered, renamed, removed, failures = builder.build(args.jobs, args.force, progress)
+    for name, error in failures:
+        print(f"Error: {name}: {error}", file=sys.stderr)
+    builder.write_manifest(args.manifest)
+    print(f"{rendered} rendered, {renamed} files renamed, {removed} removed "
+          f"in {time.perf_counter() - start:.1f}s; manifest: {args.manifest}")
+    return 1 if failures else 0
+
+
+def cmd_manifest(args):
+    """Add size, aspect ratio, dominant color and LQIP of every image to the metadata module"""
+    # Imported here: only this command needs the pool (and Pillow in the workers)
+    from sorter import manifest
+
+    image_dir = Path(args.image_dir)
+    thumb_dir = Path(args.thumb_dir) if args.thumb_dir else image_dir / "thumbs"
+    start = time.perf_counter()
+    cache_file = manifest.CACHE_FILE
+    if args.force:
+        cache_file.unlink(missing_ok=True)
+
+    def progress(done, total, name):
+        print(f"[{done}/{total}] {name}")
+
+    info, failures = manifest.build_manifest(image_dir, thumb_dir, args.jobs, cache_file, progress)
+    for name, error in failures:
+        print(f"Error: {name}: {error}", file=sys.stderr)
+
+    entries = core.load_metadata_entries(args.metadata)
+    core.save_metadata(manifest.merge_into_metadata(entries, info), args.metadata)
+    print(f"Updated {len(info)} images in {args.metadata} in {time.perf_counter() - start:.1f}s")
+    return 1 if failures else 0
+
+
+def cmd_duplicates(args):
+    """List groups of near-duplicate images (perceptual hashes of the thumbnails)"""
+    try:
+        # Imported here: only this command (and the window's Duplicates button) needs NumPy
+        from sorter import duplicates
+    except ImportError as e:
+        print(f"Error: finding duplicates needs NumPy ({e})", file=sys.stderr)
+        return 1
+
+    image_dir = Path(args.image_dir)
+    thumb_dir = Path(args.thumb_dir) if args.thumb_dir else image_dir / "thumbs"
+    start = time.perf_counter()
+    order = core.load_order_manifest(core.order_manifest_for(args.metadata))
+
+    def progress(done, total):
+        print(f"[{done}/{total}] hashed")
+
+    groups = duplicates.find_duplicates(
+        core.list_images(image_dir, order), thumb_dir, duplicates.hashes_file_for(args.metadata),
+        args.hash, args.max_distance, args.jobs, args.force, progress
+    )
+    for number, group in enumerate(groups, 1):
+        print(f"Group {number}:")
+        for image_file in group:
+            print(f"  {image_file.name}")
+    extra = sum(len(group) - 1 for group in groups)
+    print(f"{len(groups)} groups, {extra} duplicate images ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+def cmd_arrange(args):
+    """Suggest an order (by location and date, by date, or by color) as an order file for `apply`"""
+    try:
+        # Imported here: only this command (and the window's Arrange button) needs NumPy
+        from sorter import arrange
+    except ImportError as e:
+        print(f"Error: arranging needs NumPy ({e})", file=sys.stderr)
+        return 1
+
+    image_dir = Path(args.image_dir)
+    thumb_dir = Path(args.thumb_dir) if args.thumb_dir else image_dir / "thumbs"
+    start = time.perf_counter()
+    image_files = core.list_images(image_dir, core.load_order_manifest(core.order_manifest_for(args.metadata)))
+    if not image_files:
+        print(f"Error: No images found in {image_dir}", file=sys.stderr)
+        return 1
+
+    def progress(done, total):
+        print(f"[{done}/{total}] analysed")
+
+    ordered = arrange.suggest_order(
+        image_files, thumb_dir, core.load_metadata(args.metadata), args.mode, jobs=args.jobs, force=args.force,
+        progress=progress
+    )
+    names = [image_file.name for image_file in ordered]
+    if args.out:
+        core.write_atomic(Path(args.out), json.dumps({"order": names}, indent=1))
+        print(f"Wrote {args.out} (apply it with: python -m image_sorter apply --order {args.out})")
+    else:
+        for name in names:
+            print(name)
+    moved = sum(1 for a, b in zip(image_files, ordered) if a != b)
+    print(f"{moved} of {len(names)} images change position ({time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+def cmd_gui(args):
+    # Imported here so headless commands don't need a display or tkinter
+    with profiling.span("import_gui"):
+        from sorter.gui import run
+    run(evict_offscreen=args.evict_offscreen, numbering=args.numbering, numbering_step=args.step,
+        autosave=not args.no_autosave, prefetch_rows=args.prefetch_rows)
+    return 0
+
+
+def positive_int(text):
+    """argparse type: an integer of at least 1"""
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def add_numbering_arguments(parser):
+    parser.add_argument(
+        "--numbering",
+        choices=planner.NUMBERING_MODES,
+        default=planner.DENSE,
+        help="dense: 01, 02, ...; sparse: keep current numbers and fill gaps; "
+             "respace: renumber with gaps of --step (do once before using sparse)"
+    )
+    parser.add_argument(
+        "--step", type=positive_int, default=planner.DEFAULT_STEP, help="gap between numbers for respace/sparse"
+    )
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="image_sorter",
+        description="Drag-and-drop sorter for the architecture gallery"
+    )
+    parser.add_argument(
+        "--evict-offscreen",
+        action="store_true",
+        help="drop zoom masters for tiles that scroll out of view (lowest memory)"
+    )
+    parser.add_argument(
+        "--prefetch-rows",
+        type=int,
+        default=4,
+        help="rows below and above the visible ones whose images are decoded ahead of scrolling (default: 4)"
+    )
+    parser.add_argument(
+        "--no-autosave",
+        action="store_true",
+        help="only write locations on Apply Changes instead of as they are typed"
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="record startup phases, per-image work and event latencies to PATH (JSON)"
+    )
+    parser.add_argument(
+        "--profile-format",
+        choices=profiling.FORMATS,
+        default="summary",
+        help="summary: p50/p90/p99 per span; trace: Chrome trace events (chrome://tracing, Perfetto)"
+    )
+    add_numbering_arguments(parser)
+    parser.set_defaults(func=cmd_gui)
+    subparsers = parser.add_subparsers(dest="command")
+
+    apply_parser = subparsers.add_parser("apply", help="renumber images from an order file without a window")
+    apply_parser.add_argument("--order", required=True, help="JSON or CSV order file (filenames plus optional locations)")
+    apply_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    apply_parser.add_argument("--thumb-dir", help="default: IMAGE_DIR/thumbs")
+    apply_parser.add_argument("--metadata", default=str(core.METADATA_FILE), help="architecture_metadata.js to rewrite")
+    apply_parser.add_argument("--dry-run", action="store_true", help="print the renames without touching any file")
+    add_numbering_arguments(apply_parser)
+    apply_parser.set_defaults(func=cmd_apply)
+
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="renumber all images to one prefix width in their current order and write the order manifest"
+    )
+    migrate_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    migrate_parser.add_argument("--thumb-dir", help="default: IMAGE_DIR/thumbs")
+    migrate_parser.add_argument("--metadata", default=str(core.METADATA_FILE), help="architecture_metadata.js to rewrite")
+    migrate_parser.add_argument("--dry-run", action="store_true", help="print the renames without touching any file")
+    add_numbering_arguments(migrate_parser)
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    thumbs_parser = subparsers.add_parser("thumbs", help="generate thumbs/ for new or changed images")
+    thumbs_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    thumbs_parser.add_argument("--thumb-dir", help="default: IMAGE_DIR/thumbs")
+    thumbs_parser.add_argument("--check", action="store_true", help="only report missing, stale and orphaned thumbnails")
+    thumbs_parser.add_argument("--prune", action="store_true", help="delete thumbnails whose source is gone")
+    thumbs_parser.add_argument("--force", action="store_true", help="rebuild every thumbnail")
+    thumbs_parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    thumbs_parser.add_argument("--width", type=int, default=thumbs.THUMB_WIDTH)
+    thumbs_parser.add_argument("--quality", type=int, default=thumbs.THUMB_QUALITY)
+    thumbs_parser.set_defaults(func=cmd_thumbs)
+
+    derivatives_parser = subparsers.add_parser("derivatives", help="generate responsive sizes and the srcset manifest")
+    derivatives_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    derivatives_parser.add_argument("--widths", type=int, nargs="+", default=[320, 640, 1280, 2048])
+    derivatives_parser.add_argument("--avif", action="store_true", help="also write AVIF next to WebP")
+    derivatives_parser.add_argument("--manifest", default=str(core.METADATA_FILE.with_name("architecture_images.js")))
+    derivatives_parser.add_argument("--force", action="store_true", help="re-encode everything")
+    derivatives_parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    derivatives_parser.set_defaults(func=cmd_derivatives)
+
+    manifest_parser = subparsers.add_parser("manifest", help="add dimensions, color and LQIP to the metadata module")
+    manifest_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    manifest_parser.add_argument("--thumb-dir", help="default: IMAGE_DIR/thumbs (pixels are read from the thumbnails)")
+    manifest_parser.add_argument("--metadata", default=str(core.METADATA_FILE), help="architecture_metadata.js to update")
+    manifest_parser.add_argument("--force", action="store_true", help="ignore the cache and read every image again")
+    manifest_parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    manifest_parser.set_defaults(func=cmd_manifest)
+
+    duplicates_parser = subparsers.add_parser("duplicates", help="list near-duplicate images")
+    duplicates_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    duplicates_parser.add_argument("--thumb-dir", help="default: IMAGE_DIR/thumbs (hashes are taken from the thumbnails)")
+    duplicates_parser.add_argument(
+        "--metadata", default=str(core.METADATA_FILE), help="architecture_metadata.js (hashes are stored next to it)"
+    )
+    duplicates_parser.add_argument("--hash", choices=("ahash", "dhash", "phash"), default="phash")
+    duplicates_parser.add_argument(
+        "--max-distance", type=int, default=10, help="bits (of 64) that may differ between duplicates"
+    )
+    duplicates_parser.add_argument("--force", action="store_true", help="ignore stored hashes and hash every thumbnail")
+    duplicates_parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    duplicates_parser.set_defaults(func=cmd_duplicates)
+
+    arrange_parser = subparsers.add_parser("arrange", help="suggest an order by location and date, date or color")
+    arrange_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    arrange_parser.add_argument("--thumb-dir", help="default: IMAGE_DIR/thumbs (colors are taken from the thumbnails)")
+    arrange_parser.add_argument("--metadata", default=str(core.METADATA_FILE), help="architecture_metadata.js (locations)")
+    arrange_parser.add_argument(
+        "--mode",
+        choices=("location", "time", "visual"),
+        default="location",
+        help="location: grouped by location, by date within; time: by date; visual: similar colors next to each other"
+    )
+    arrange_parser.add_argument("--out", help="write a JSON order file for `apply --order` instead of printing")
+    arrange_parser.add_argument("--force", action="store_true", help="ignore the cache and read every image again")
+    arrange_parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    arrange_parser.set_defaults(func=cmd_arrange)
+
+    recover_parser = subparsers.add_parser("recover", help="finish or undo an interrupted rename")
+    recover_parser.add_argument("--image-dir", default=str(core.IMAGE_DIR))
+    recover_parser.add_argument(
+        "--rollback",
+        action="store_true",
+        help="undo it instead of finishing it (only before its metadata was written)"
+    )
+    recover_parser.set_defaults(func=cmd_recover)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if not args.profile:
+        return args.func(args)
+
+    profiling.PROFILER.enable()
+    try:
+        with profiling.span(args.command or "gui", "command"):
+            return args.func(args)
+    finally:
+        profiling.PROFILER.write(args.profile, args.profile_format)
+        print(f"Profile written to {args.profile}")
@@ -0,0 +1,370 @@
+"""
+Renaming and metadata logic shared by the sorter window and the batch CLI.
+
+Nothing here decodes an image: ordering only needs directory listings,
+renames, and the location mapping in architecture_metadata.js.
+"""
+
+import csv
+import json
+import os
+from pathlib import Path
+
+from sorter import jsliteral, planner
+from sorter.journal import RenameJournal, fsync_dir
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+IMAGE_DIR = REPO_DIR / "public" / "images" / "architecture"
+THUMB_DIR = IMAGE_DIR / "thumbs"
+METADATA_FILE = REPO_DIR / "src" / "data" / "architecture_metadata.js"
+# Gallery position per filename, written next to the metadata on every apply
+ORDER_MANIFEST_FILE = METADATA_FILE.with_name("architecture_order.js")
+ORDER_EXPORT = "architectureOrder"
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def list_images(image_dir, order=None):
+    """
+    Image files directly inside image_dir (one directory scan) in gallery
+    order: by position in order (filename -> position, see
+    load_order_manifest), then by number prefix, so 100_ follows 99_.
+    """
+    order = order or {}
+    unlisted = len(order)
+    with os.scandir(image_dir) as entries:
+        return sorted(
+            (
+                Path(entry.path) for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS
+            ),
+            key=lambda path: (order.get(path.name, unlisted), planner.sort_key(path.name))
+        )
+
+
+def strip_prefix(name):
+    """Remove number prefix if exists (e.g. 01_image.jpg or 010_image.jpg -> image.jpg)"""
+    return planner.split_prefix(name)[2]
+
+
+def find_thumbnail(thumb_dir, image_file, thumb_names=None):
+    """
+    Thumbnail for image_file, also matching an unprefixed thumb
+    (main="01_img.jpg", thumb="img.jpg"). Returns None if there is none.
+    thumb_names (a set of names in thumb_dir) saves a stat per lookup.
+    """
+    if thumb_names is None:
+        thumb_names = {p.name for p in Path(thumb_dir).glob("*")} if Path(thumb_dir).is_dir() else set()
+    for name in (image_file.name, strip_prefix(image_file.name)):
+        if name in thumb_names:
+            return Path(thumb_dir) / name
+    return None
+
+
+# Field order in the written file; anything else follows alphabetically
+FIELD_ORDER = ("location", "description", "width", "height", "aspect", "color", "lqip")
+METADATA_EXPORT = "architectureMetadata"
+
+
+def read_metadata(metadata_file=METADATA_FILE, with_sources=True):
+    """
+    Parse the metadata JS file: (entries, sources, text), where entries maps
+    filename -> dict of fields and sources holds each entry's text as written.
+    Only writers need the sources, they cost more than the parse itself, so
+    with_sources=False leaves them out (None).
+    A missing file is empty; a file that can't be parsed raises ValueError.
+    """
+    try:
+        text = Path(metadata_file).read_text(encoding='utf-8')
+    except FileNotFoundError:
+        return {}, {}, None
+    parsed = jsliteral.parse_export(text, METADATA_EXPORT)
+    if not isinstance(parsed, dict):
+        raise ValueError(f"{METADATA_EXPORT} is not an object")
+    entries = {}
+    for filename, fields in parsed.items():
+        if isinstance(fields, dict):
+            entries[filename] = fields
+        else:
+            print(f"Warning: Ignoring metadata for {filename}: expected an object")
+    sources = jsliteral.entry_sources(text, METADATA_EXPORT) if with_sources else None
+    return entries, sources, text
+
+
+def load_metadata_entries(metadata_file=METADATA_FILE):
+    """Load every field of every entry in the metadata JS file (filename -> dict)"""
+    try:
+        return read_metadata(metadata_file, with_sources=False)[0]
+    except Exception as e:
+        print(f"Warning: Failed to parse metadata file: {e}")
+        return {}
+
+
+def load_metadata(metadata_file=METADATA_FILE):
+    """Load existing location metadata from the JS file"""
+    return {
+        filename: fields["location"]
+        for filename, fields in load_metadata_entries(metadata_file).items()
+        if "location" in fields
+    }
+
+
+def order_manifest_for(metadata_file):
+    """The order manifest that goes with metadata_file (same directory)"""
+    return Path(metadata_file).with_name(ORDER_MANIFEST_FILE.name)
+
+
+def load_order_manifest(order_file=ORDER_MANIFEST_FILE):
+    """filename -> gallery position, or {} if there is no (readable) manifest"""
+    try:
+        order = jsliteral.parse_export(Path(order_file).read_text(encoding='utf-8'), ORDER_EXPORT)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        print(f"Warning: Failed to parse order manifest: {e}")
+        return {}
+    if not isinstance(order, dict):
+        print(f"Warning: Ignoring order manifest: {ORDER_EXPORT} is not an object")
+        return {}
+    return order
+
+
+def save_order_manifest(names, order_file=ORDER_MANIFEST_FILE):
+    """Write the gallery order (names, first to last). Returns True if the file changed."""
+    lines = [
+        "/**",
+        " * Gallery order of the architecture images, written by the image sorter.",
+        " * Key: Filename (as it appears in public/images/architecture/)",
+        " * Value: position in the gallery (0 = first)",
+        " */",
+        f"export const {ORDER_EXPORT} = {{"
+    ]
+    lines.extend(f"    {json.dumps(name, ensure_ascii=False)}: {position}," for position, name in enumerate(names))
+    lines.append("};")
+
+    text = "\n".join(lines)
+    try:
+        if Path(order_file).read_text(encoding='utf-8') == text:
+            return False
+    except FileNotFoundError:
+        pass
+    write_atomic(order_file, text)
+    return True
+
+
+def write_atomic(path, text):
+    """Replace path with text via a synced temp file, so readers see the old or the new file"""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8', newline='') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+    fsync_dir(path.parent)
+
+
+def save_metadata(metadata_mapping, metadata_file=METADATA_FILE):
+    """
+    Save the updated mapping back to architecture_metadata.js.
+    Values are a location string or a dict of fields (see FIELD_ORDER).
+    Entries whose fields didn't change keep their text exactly as written,
+    and an unchanged file isn't touched at all. Returns True if it was written.
+    """
+    try:
+        existing, sources, old_text = read_metadata(metadata_file)
+    except (OSError, ValueError):
+        existing, sources, old_text = {}, {}, None
+
+    opening = f"export const {METADATA_EXPORT} = {{"
+    lines = [
+        "/**",
+        " * Metadata for architecture gallery images.",
+        " * Key: Filename (as it appears in public/images/architecture/)",
+        " * Value: { location: string, description: string (optional),",
+        " *          width, height, aspect, color, lqip (from `python -m image_sorter manifest`) }",
+        " */",
+        opening
+    ]
+    # The comment above the object is kept as written
+    if old_text is not None:
+        head, found, _ = ("\n" + old_text).partition("\n" + opening + "\n")
+        if found:
+            lines = head.split("\n")[1:] + [opening]
+
+    # Sort by filename to keep the file clean (and the diff to changed lines)
+    for filename in sorted(metadata_mapping.keys()):
+        fields = metadata_mapping[filename]
+        if isinstance(fields, str):
+            fields = {"location": fields}
+        if filename in sources and existing.get(filename) == fields:
+            lines.append(f"    {sources[filename]},")
+            continue
+        keys = [k for k in FIELD_ORDER if k in fields] + sorted(k for k in fields if k not in FIELD_ORDER)
+        body = ", ".join(f"{key}: {json.dumps(fields[key], ensure_ascii=False)}" for key in keys)
+        lines.append(f'    {json.dumps(filename, ensure_ascii=False)}: {{ {body} }},')
+
+    lines.append("};")
+
+    text = "\n".join(lines)
+    if text == old_text:
+        return False
+    write_atomic(metadata_file, text)
+    return True
+
+
+def update_metadata(updates, metadata_file=METADATA_FILE):
+    """
+    Merge updates (filename -> {field: value}) into the metadata file. A
+    value of None or "" removes the field, an entry left without fields is
+    removed. Everything else in the file is kept as it is. Raises ValueError
+    rather than overwrite a file it can't parse.
+    """
+    entries = read_metadata(metadata_file, with_sources=False)[0]
+    for filename, fields in updates.items():
+        merged = dict(entries.get(filename, {}))
+        for key, value in fields.items():
+            if value is None or value == "":
+                merged.pop(key, None)
+            else:
+                merged[key] = value
+        if merged:
+            entries[filename] = merged
+        else:
+            entries.pop(filename, None)
+    return save_metadata(entries, metadata_file)
+
+
+def plan_order(entries, image_dir=IMAGE_DIR, thumb_dir=THUMB_DIR,
+               numbering=planner.DENSE, step=planner.DEFAULT_STEP, metadata_file=None):
+    """
+    Plan the renames that number entries in order (see sorter.planner).
+    entries is a list of (image_file, thumb_file or None, location).
+    Files already at their final name are left alone, so a reorder only
+    touches the files that actually shift. Other fields of the entries in
+    metadata_file (image manifest data) follow their image to its new name;
+    entries for files that aren't being ordered are kept as they are.
+    """
+    image_dir = Path(image_dir)
+    thumb_dir = Path(thumb_dir)
+    final_names = planner.numbered_names([f.name for f, _, _ in entries], numbering, step)
+    existing = load_metadata_entries(metadata_file) if metadata_file else {}
+
+    renames = []
+    ordered_names = {f.name for f, _, _ in entries}
+    new_metadata = {name: fields for name, fields in existing.items() if name not in ordered_names}
+    for (original_full, original_thumb, location), final_name in zip(entries, final_names):
+        fields = {k: v for k, v in existing.get(original_full.name, {}).items() if k != "location"}
+        location = (location or "").strip()
+        if location:
+            fields["location"] = location
+        if fields:
+            new_metadata[final_name] = fields
+        else:
+            new_metadata.pop(final_name, None)
+        renames.append((original_full, image_dir / final_name))
+        if original_thumb:
+            renames.append((original_thumb, thumb_dir / final_name))
+
+    return planner.RenamePlan(planner.order_moves(renames), new_metadata, final_names)
+
+
+def apply_plan(plan, image_dir=IMAGE_DIR, metadata_file=METADATA_FILE):
+    """
+    Execute a RenamePlan and write its metadata and order manifest (next to
+    metadata_file). Runs through a write-ahead
+    journal: an interrupted run is finished or undone by recover_pending().
+    """
+    RenameJournal.plan(image_dir, plan.ops, plan.metadata, metadata_file, plan.final_names).run()
+
+
+def apply_order(entries, image_dir=IMAGE_DIR, thumb_dir=THUMB_DIR, metadata_file=METADATA_FILE,
+                numbering=planner.DENSE, step=planner.DEFAULT_STEP):
+    """Rename images (and their thumbnails) to number prefixes in the given order"""
+    plan = plan_order(entries, image_dir, thumb_dir, numbering, step, metadata_file)
+    apply_plan(plan, image_dir, metadata_file)
+    return plan
+
+
+def recover_pending(image_dir=IMAGE_DIR, rollback=False):
+    """
+    Finish or undo a rename that was interrupted (crash, Ctrl+C, locked file).
+    By default it is rolled forward. Returns what was done, or None if there
+    was nothing to recover.
+    """
+    journal = RenameJournal.load(image_dir)
+    if journal is None:
+        return None
+    if rollback:
+        journal.rollback()
+        return "rolled back"
+    journal.roll_forward()
+    return "rolled forward"
+
+
+def read_order_file(path):
+    """
+    Read an order file as a list of (filename, location or None).
+
+    JSON: a list of filenames or {"file": ..., "location": ...} objects
+    (optionally wrapped as {"order": [...]}).
+    CSV: a header row with a "file" column and an optional "location" column.
+    A missing location means "keep the current one".
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            if not reader.fieldnames or "file" not in reader.fieldnames:
+                raise ValueError(f"{path}: CSV order files need a 'file' column")
+            return [(row["file"].strip(), row.get("location")) for row in reader if row["file"].strip()]
+
+    data = json.loads(path.read_text(encoding='utf-8'))
+    if isinstance(data, dict):
+        data = data.get("order")
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a list of files (or {{\"order\": [...]}})")
+
+    order = []
+    for entry in data:
+        if isinstance(entry, str):
+            order.append((entry, None))
+        elif isinstance(entry, dict) and "file" in entry:
+            order.append((entry["file"], entry.get("location")))
+        else:
+            raise ValueError(f"{path}: bad order entry {entry!r}")
+    return order
+
+
+def resolve_order(order, image_files):
+    """
+    Match order file names to images on disk and return the full ordering as
+    a list of image paths. Names match exactly or ignoring the number prefix,
+    so an order file stays valid after a renumbering. Images the order file
+    doesn't mention keep their relative order after the listed ones.
+    """
+    by_name = {f.name: f for f in image_files}
+    by_clean = {}
+    for f in image_files:
+        by_clean.setdefault(strip_prefix(f.name), []).append(f)
+
+    ordered = []
+    seen = set()
+    for name, _ in order:
+        image_file = by_name.get(name)
+        if image_file is None:
+            candidates = by_clean.get(strip_prefix(name), [])
+            if len(candidates) > 1:
+                raise ValueError(f"Ambiguous order entry {name!r}: {', '.join(c.name for c in candidates)}")
+            image_file = candidates[0] if candidates else None
+        if image_file is None:
+            raise ValueError(f"No image matches order entry {name!r}")
+        if image_file in seen:
+            raise ValueError(f"Image listed twice in order file: {image_file.name}")
+        seen.add(image_file)
+        ordered.append(image_file)
+
+    rest = [f for f in image_files if f not in seen]
+    if rest:
+        print(f"Warning: {len(rest)} images not in the order file are kept at the end")
+    return ordered + rest
@@ -0,0 +1,260 @@
+"""
+Responsive derivatives of the gallery images for srcset.
+
+For every full resolution image this writes WebP (and optionally AVIF)
+copies at a few fixed widths:
+
+    public/images/architecture/derivatives/<width>/<stem>.<format>
+
+and a manifest next to architecture_metadata.js with the original and
+derivative dimensions and byte sizes, so the page can build srcset/sizes
+and reserve the right aspect ratio before anything loads.
+
+Work is skipped by content hash: an unchanged image is never re-encoded,
+and a renamed one (Apply Changes) only has its derivatives renamed.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from sorter import planner
+from sorter.cache import hash_file
+from sorter.core import IMAGE_DIR, METADATA_FILE, list_images
+
+DERIVATIVE_DIR_NAME = "derivatives"
+DEFAULT_WIDTHS = (320, 640, 1280, 2048)
+DEFAULT_QUALITY = {"webp": 80, "avif": 55}
+MANIFEST_FILE = METADATA_FILE.with_name("architecture_images.js")
+STATE_NAME = "index.json"
+
+
+def avif_supported():
+    from PIL import features
+    return bool(features.check("avif"))
+
+
+def _identity(stat):
+    # Same idea as the thumbnail cache: no name, so a rename keeps it
+    return f"{stat.st_dev}:{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def output_path(out_dir, width, stem, fmt):
+    return Path(out_dir) / str(width) / f"{stem}.{fmt}"
+
+
+def render(src, out_dir, stem, widths, formats, quality):
+    """
+    Decode src once and write every (width, format) derivative, largest
+    first, each resized from the previous one. Runs in a worker process.
+    Widths at or above the source width are skipped (the original covers them).
+    """
+    # Imported here so the parent process never needs Pillow for a no-op run
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        # Displayed size: EXIF orientations 5-8 swap width and height
+        full_width, full_height = img.size
+        if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            full_width, full_height = full_height, full_width
+
+        wanted = sorted((w for w in widths if w < full_width), reverse=True)
+        if wanted:
+            # JPEG decodes straight at 1/2, 1/4 or 1/8 scale; no-op for other formats
+            img.draft("RGB", (wanted[0], wanted[0]))
+        current = ImageOps.exif_transpose(img)
+        if current.mode not in ("RGB", "RGBA"):
+            current = current.convert("RGB")
+
+        variants = []
+        for width in wanted:
+            height = max(1, round(full_height * width / full_width))
+            current = current.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            variant = {"width": width, "height": height}
+            for fmt in formats:
+                dst = output_path(out_dir, width, stem, fmt)
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                tmp = dst.with_name(f".{dst.name}.tmp")
+                current.save(tmp, format=fmt.upper(), quality=quality[fmt])
+                os.replace(tmp, dst)
+                variant[fmt] = dst.stat().st_size
+            variants.append(variant)
+
+    return {"width": full_width, "height": full_height, "variants": variants[::-1]}
+
+
+def _outputs(entry, formats):
+    return [(v["width"], fmt) for v in entry["variants"] for fmt in formats]
+
+
+class DerivativeBuilder:
+    """Incremental derivative generation for one image directory"""
+
+    def __init__(self, image_dir=IMAGE_DIR, widths=DEFAULT_WIDTHS, formats=("webp",), quality=None):
+        self.image_dir = Path(image_dir)
+        self.out_dir = self.image_dir / DERIVATIVE_DIR_NAME
+        self.state_file = self.out_dir / STATE_NAME
+        self.widths = tuple(sorted(widths))
+        self.formats = tuple(formats)
+        self.quality = dict(DEFAULT_QUALITY, **(quality or {}))
+        try:
+            self.state = json.loads(self.state_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _complete(self, entry, stem):
+        """True if entry was made with the current settings and its files exist"""
+        if entry.get("widths") != list(self.widths) or entry.get("formats") != list(self.formats):
+            return False
+        return all(output_path(self.out_dir, w, stem, fmt).exists() for w, fmt in _outputs(entry, self.formats))
+
+    def plan(self, force=False):
+        """
+        Compare sources with the state file. Returns (todo, renames, entries):
+        names to render, derivative files to rename (src, dst) for renamed
+        sources, and the entries that are already complete under their name.
+        """
+        by_identity = {e["identity"]: e for e in self.state.values()}
+        by_hash = {}
+        for name, e in self.state.items():
+            by_hash.setdefault(e["hash"], (name, e))
+
+        sources = list_images(self.image_dir)
+
+        # Content hash per current name, hashing only files whose identity is new
+        hashes = {}
+        identities = {}
+        for src in sources:
+            identity = _identity(src.stat())
+            known = self.state.get(src.name)
+            if not known or known["identity"] != identity:
+                known = by_identity.get(identity)
+            identities[src.name] = identity
+            hashes[src.name] = known["hash"] if known else hash_file(src)
+
+        todo = []
+        renames = []
+        entries = {}
+        stems = set()
+        claimed = set()
+        for src in sources:
+            name, stem = src.name, src.stem
+            if stem in stems:
+                print(f"Warning: {name} shares its stem with another image, skipped")
+                continue
+            stems.add(stem)
+
+            identity, content_hash = identities[name], hashes[name]
+            entry = self.state.get(name)
+            if not force and entry and entry["hash"] == content_hash and self._complete(entry, stem):
+                entries[name] = dict(entry, identity=identity)
+                continue
+
+            # Renamed: move the old files instead of encoding again, unless the
+            # old name still holds the same content and needs them itself
+            previous = None if force else by_hash.get(content_hash)
+            if (previous and previous[0] not in claimed and hashes.get(previous[0]) != content_hash
+                    and self._complete(previous[1], Path(previous[0]).stem)):
+                claimed.add(previous[0])
+                old_stem = Path(previous[0]).stem
+                for w, fmt in _outputs(previous[1], self.formats):
+                    renames.append((output_path(self.out_dir, w, old_stem, fmt), output_path(self.out_dir, w, stem, fmt)))
+                entries[name] = dict(previous[1], identity=identity)
+                continue
+
+            todo.append((name, identity, content_hash))
+        return todo, renames, entries
+
+    def build(self, jobs=None, force=False, progress=None):
+        """Bring the derivatives up to date. Returns (rendered, renamed, removed, failures)."""
+        todo, renames, entries = self.plan(force)
+
+        # Renamed sources: one plan so swapped names don't overwrite each other
+        for src, dst in planner.order_moves(renames):
+            os.replace(src, dst)
+
+        failures = []
+        if todo:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                futures = {
+                    pool.submit(render, self.image_dir / name, self.out_dir, Path(name).stem,
+                                self.widths, self.formats, self.quality): (name, identity, content_hash)
+                    for name, identity, content_hash in todo
+                }
+                for done, future in enumerate(as_completed(futures), 1):
+                    name, identity, content_hash = futures[future]
+                    try:
+                        info = future.result()
+                    except Exception as e:
+                        failures.append((name, e))
+                        # Keep the previous derivatives (and retry next time) rather than delete them
+                        if name in self.state:
+                            entries[name] = self.state[name]
+                    else:
+                        entries[name] = dict(info, identity=identity, hash=content_hash,
+                                             widths=list(self.widths), formats=list(self.formats))
+                    if progress:
+                        progress(done, len(futures), name)
+
+        removed = self._remove_orphans(entries)
+        self.state = entries
+        self._save_state()
+        return len(todo) - len(failures), len(renames), removed, failures
+
+    def _remove_orphans(self, entries):
+        """Delete derivative files no current entry refers to"""
+        keep = {
+            output_path(self.out_dir, w, Path(name).stem, fmt)
+            for name, entry in entries.items()
+            for w, fmt in _outputs(entry, self.formats)
+        }
+        removed = 0
+        if not self.out_dir.is_dir():
+            return removed
+        for width_dir in self.out_dir.iterdir():
+            if not width_dir.is_dir():
+                continue
+            for path in width_dir.iterdir():
+                if path not in keep:
+                    path.unlink()
+                    removed += 1
+        return removed
+
+    def _save_state(self):
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=1, sort_keys=True), encoding='utf-8')
+        os.replace(tmp, self.state_file)
+
+    def write_manifest(self, manifest_file=MANIFEST_FILE):
+        """Write the srcset manifest (JS module) from the current state"""
+        lines = [
+            "/**",
+            " * Generated by `python -m image_sorter derivatives`. Do not edit.",
+            " * Key: Filename (as it appears in public/images/architecture/)",
+            " * Value: { width, height, bytes, variants: [{ width, height, <format>: bytes }] }",
+            f" * Variant path: images/architecture/{DERIVATIVE_DIR_NAME}/<width>/<stem>.<format>",
+            " */",
+            f"export const derivativeFormats = {json.dumps(list(self.formats))};",
+            "",
+            "export const architectureImages = {"
+        ]
+        for name in sorted(self.state):
+            entry = self.state[name]
+            size = (self.image_dir / name).stat().st_size
+            variants = ", ".join(
+                "{ " + ", ".join(f"{key}: {variant[key]}" for key in ("width", "height") + self.formats) + " }"
+                for variant in entry["variants"]
+            )
+            lines.append(
+                f'    {json.dumps(name)}: {{ width: {entry["width"]}, height: {entry["height"]}, '
+                f'bytes: {size}, variants: [{variants}] }},'
+            )
+        lines.append("};")
+        lines.append("")
+
+        manifest_file = Path(manifest_file)
+        tmp = manifest_file.with_suffix(".tmp")
+        tmp.write_text("\n".join(lines), encoding='utf-8')
+        os.replace(tmp, manifest_file)
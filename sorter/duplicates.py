@@ -0,0 +1,280 @@
+"""
+Near-duplicate detection (the same shot as an original and a `~2` edit)
+with perceptual hashes of the thumbnails.
+
+Three 64-bit hashes per image, computed with NumPy over batches of
+thumbnails (first bit is the most significant):
+
+    ahash  8x8 block means, bit = block brighter than the image mean
+    dhash  9x8 pixels, bit = pixel brighter than its right neighbour
+    phash  32x32 DCT, bit = low-frequency coefficient above their median
+
+They are kept in architecture_hashes.json next to the metadata, keyed by
+the name without its number prefix (Apply Changes doesn't invalidate them)
+and checked against the thumbnail's size and mtime, so only new or changed
+thumbnails are hashed again.
+
+Lookups use multi-index hashing: with the hashes split into 4 chunks of 16
+bits, two hashes at most d bits apart differ in at most d // 4 bits on at
+least one chunk, so only images whose chunk is that close (a handful of
+binary searches per chunk) are ever compared.
+"""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from sorter.core import METADATA_FILE, find_thumbnail, strip_prefix, write_atomic
+
+HASHES_FILE = METADATA_FILE.with_name("architecture_hashes.json")
+HASH_NAMES = ("ahash", "dhash", "phash")
+DEFAULT_HASH = "phash"
+# Bits that may differ between near-duplicates (of 64)
+DEFAULT_DISTANCE = 10
+# Thumbnails per worker task
+BATCH_SIZE = 256
+# The index splits hashes into CHUNKS chunks of CHUNK_BITS
+CHUNKS = 4
+CHUNK_BITS = 64 // CHUNKS
+CHUNK_MASK = (1 << CHUNK_BITS) - 1
+# Bump when the hash definitions change so stored hashes are recomputed
+VERSION = 1
+
+
+def _dct_matrix(n):
+    """Orthonormal DCT-II matrix: coefficients of x are M @ x"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2 / n)
+    matrix[0] /= np.sqrt(2)
+    return matrix.astype(np.float32)
+
+
+DCT_32 = _dct_matrix(32)
+
+
+def popcount(values):
+    """Set bits of each uint64"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(values).astype(np.intp)
+    # NumPy < 2.0
+    return np.unpackbits(values.astype(">u8").view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+def _pack(bits):
+    """(n, 64) booleans -> n uint64"""
+    return np.packbits(bits, axis=1).view(">u8").ravel().astype(np.uint64)
+
+
+def hash_pixels(small, tiny):
+    """
+    Hashes of a batch of grayscale images, given as (n, 32, 32) and
+    (n, 8, 9) float32 arrays. Returns {hash name: uint64 array}.
+    """
+    blocks = small.reshape(-1, 8, 4, 8, 4).mean(axis=(2, 4))
+    ahash = _pack((blocks > blocks.mean(axis=(1, 2), keepdims=True)).reshape(-1, 64))
+    dhash = _pack((tiny[:, :, :-1] > tiny[:, :, 1:]).reshape(-1, 64))
+    # matmul broadcasts over the batch: one 2-D DCT per image
+    low = (DCT_32 @ small @ DCT_32.T)[:, :8, :8].reshape(-1, 64)
+    # The DC term only carries overall brightness, leave it out of the median
+    phash = _pack(low > np.median(low[:, 1:], axis=1, keepdims=True))
+    return {"ahash": ahash, "dhash": dhash, "phash": phash}
+
+
+def hash_files(paths):
+    """Hashes of each file as a dict of ints, None where it can't be read (runs in a worker)"""
+    from PIL import Image
+
+    small = np.zeros((len(paths), 32, 32), np.float32)
+    tiny = np.zeros((len(paths), 8, 9), np.float32)
+    readable = []
+    for i, path in enumerate(paths):
+        try:
+            with Image.open(path) as img:
+                img.draft("L", (64, 64))
+                gray = img.convert("L")
+            small[i] = np.asarray(gray.resize((32, 32), Image.Resampling.BOX), np.float32)
+            tiny[i] = np.asarray(gray.resize((9, 8), Image.Resampling.BOX), np.float32)
+            readable.append(True)
+        except OSError:
+            readable.append(False)
+
+    hashes = hash_pixels(small, tiny)
+    return [
+        {name: int(hashes[name][i]) for name in HASH_NAMES} if ok else None
+        for i, ok in enumerate(readable)
+    ]
+
+
+def _identity(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def hashes_file_for(metadata_file):
+    """The hash store that goes with metadata_file (same directory)"""
+    return Path(metadata_file).with_name(HASHES_FILE.name)
+
+
+def image_hashes(image_files, thumb_dir, hashes_file=HASHES_FILE, jobs=None, force=False, progress=None):
+    """
+    Hashes of image_files, read from their thumbnails (the image itself if
+    there is none). Returns (files, hashes): the files that could be read
+    and {hash name: uint64 array} in the same order.
+    """
+    hashes_file = Path(hashes_file)
+    try:
+        store = json.loads(hashes_file.read_text(encoding='utf-8'))
+        if store.get("version") != VERSION:
+            store = {}
+    except (OSError, ValueError):
+        store = {}
+    stored = {} if force else store.get("images", {})
+
+    thumb_names = set(os.listdir(thumb_dir)) if Path(thumb_dir).is_dir() else set()
+    entries = {}
+    todo = []
+    for image_file in image_files:
+        source = find_thumbnail(thumb_dir, image_file, thumb_names) or image_file
+        key = strip_prefix(image_file.name)
+        identity = _identity(source)
+        entry = stored.get(key)
+        if entry is not None and entry["source"] == identity:
+            entries[key] = entry
+        else:
+            todo.append((key, identity, source))
+
+    batches = [todo[i:i + BATCH_SIZE] for i in range(0, len(todo), BATCH_SIZE)]
+    if len(batches) > 1 and jobs != 1:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        results = pool.map(hash_files, [[source for _, _, source in batch] for batch in batches])
+    else:
+        pool = None
+        results = (hash_files([source for _, _, source in batch]) for batch in batches)
+    try:
+        done = 0
+        for batch, batch_hashes in zip(batches, results):
+            for (key, identity, _), found in zip(batch, batch_hashes):
+                if found is not None:
+                    entries[key] = {"source": identity, **{name: f"{found[name]:016x}" for name in HASH_NAMES}}
+            done += len(batch)
+            if progress:
+                progress(done, len(todo))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    # Only what the current files need; unchanged stores aren't rewritten
+    if todo or len(entries) != len(stored) or store.get("version") != VERSION:
+        text = json.dumps({"version": VERSION, "images": entries}, indent=1, sort_keys=True)
+        hashes_file.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(hashes_file, text)
+
+    files = [f for f in image_files if strip_prefix(f.name) in entries]
+    hashes = {
+        name: np.array([int(entries[strip_prefix(f.name)][name], 16) for f in files], dtype=np.uint64)
+        for name in HASH_NAMES
+    }
+    return files, hashes
+
+
+def _flip_masks(bits, max_flips):
+    """Every value of `bits` bits with at most max_flips bits set"""
+    masks = {0}
+    for _ in range(max_flips):
+        masks |= {mask | (1 << b) for mask in masks for b in range(bits)}
+    return np.array(sorted(masks), dtype=np.intp)
+
+
+class HashIndex:
+    """Lookups within max_distance bits over a fixed set of 64-bit hashes"""
+
+    def __init__(self, hashes, max_distance=DEFAULT_DISTANCE):
+        if not 0 <= max_distance < 64:
+            raise ValueError("max_distance must be between 0 and 63")
+        self.hashes = np.asarray(hashes, dtype=np.uint64)
+        self.max_distance = max_distance
+        # Within max_distance overall means within this much on some chunk
+        self.masks = _flip_masks(CHUNK_BITS, max_distance // CHUNKS)
+        # Per chunk: the chunk value of every hash, and the hashes grouped by
+        # value (bucket v is order[starts[v]:starts[v] + sizes[v]])
+        self._keys = []
+        self._buckets = []
+        for k in range(CHUNKS):
+            keys = self._chunk(self.hashes, k)
+            sizes = np.bincount(keys, minlength=CHUNK_MASK + 1)
+            self._keys.append(keys)
+            self._buckets.append((np.argsort(keys, kind="stable"), np.cumsum(sizes) - sizes, sizes))
+
+    @staticmethod
+    def _chunk(values, k):
+        return ((values >> np.uint64(k * CHUNK_BITS)) & np.uint64(CHUNK_MASK)).astype(np.intp)
+
+    def _matches(self, k, probes):
+        """(probe index, hash index) of every hash whose chunk k equals a probe"""
+        order, starts, sizes = self._buckets[k]
+        left = starts[probes]
+        counts = sizes[probes]
+        rows = np.repeat(np.arange(len(probes)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        return rows, order[np.repeat(left, counts) + offsets]
+
+    def near(self, value, max_distance=None):
+        """(index, distance) of every hash within max_distance of value, closest first"""
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        value = np.uint64(value)
+        found = [self._matches(k, self._chunk(value, k) ^ self.masks)[1] for k in range(CHUNKS)]
+        candidates = np.unique(np.concatenate(found))
+        distances = popcount(self.hashes[candidates] ^ value)
+        keep = distances <= limit
+        candidates, distances = candidates[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+        return list(zip(candidates[order].tolist(), distances[order].tolist()))
+
+    def pairs(self):
+        """(i, j, distance) for every pair i < j within max_distance"""
+        count = len(self.hashes)
+        found = []
+        for k in range(CHUNKS):
+            keys = self._keys[k]
+            for mask in self.masks.tolist():
+                first, second = self._matches(k, keys ^ mask)
+                # Checked right away so memory stays proportional to the matches
+                keep = (first < second) & (popcount(self.hashes[first] ^ self.hashes[second]) <= self.max_distance)
+                found.append(first[keep].astype(np.int64) * count + second[keep])
+        # A pair close on several chunks is found once per chunk
+        codes = np.unique(np.concatenate(found))
+        first, second = np.divmod(codes, count)
+        distances = popcount(self.hashes[first] ^ self.hashes[second])
+        return list(zip(first.tolist(), second.tolist(), distances.tolist()))
+
+
+def group_pairs(pairs):
+    """Connected groups of indices (each sorted, groups by first member)"""
+    parent = {}
+
+    def root(i):
+        while parent.setdefault(i, i) != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j, _ in pairs:
+        a, b = root(i), root(j)
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+    groups = {}
+    for i in parent:
+        groups.setdefault(root(i), []).append(i)
+    return sorted(sorted(group) for group in groups.values())
+
+
+def find_duplicates(image_files, thumb_dir, hashes_file=HASHES_FILE, hash_name=DEFAULT_HASH,
+                    max_distance=DEFAULT_DISTANCE, jobs=None, force=False, progress=None):
+    """Groups of near-duplicate files (lists of Paths in image_files order), singletons left out"""
+    files, hashes = image_hashes(image_files, thumb_dir, hashes_file, jobs, force, progress)
+    index = HashIndex(hashes[hash_name], max_distance)
+    return [[files[i] for i in group] for group in group_pairs(index.pairs())]
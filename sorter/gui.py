@@ -0,0 +1,1613 @@
+"""
+Architecture Image Sorter - Grid View
+A simple drag-and-drop grid to reorder architecture gallery images.
+Uses thumbnails for fast loading, renames full-res files with number prefixes.
+"""
+
+import io
+import itertools
+import os
+import queue
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+import tkinter as tk
+from tkinter import ttk, messagebox
+from PIL import Image, ImageTk
+from collections import OrderedDict
+from pathlib import Path
+
+from sorter import core, planner, reorder, thumbs
+from sorter.profiling import PROFILER, mark, span, timed
+from sorter.autosave import MetadataAutosaver
+from sorter.cache import CACHE_DIR_NAME, MIP_ZOOMS, ThumbnailCache, zoom_bucket
+from sorter.imagestore import ImageStore, LazyImage
+from sorter.layout import GridGeometry, LayoutScheduler
+from sorter.model import GalleryModel
+from sorter.watcher import DirectoryWatcher
+
+# Thumbnail sizes of the pre-rendered zoom levels (100/150/200/300%)
+MIP_SIZES = tuple(int(200 * zoom / 100) for zoom in MIP_ZOOMS)
+
+
+# Worker-thread jobs below make no Tk calls. They return (image, final) where
+# image is PNG bytes for a cache hit or a PIL image, and final is False for a
+# low-quality preview that a later job will replace. None means skipped.
+
+@timed("load_thumbnail", "image")
+def load_thumbnail(cache, store, image, size, is_stale=None):
+    """
+    Build a grid thumbnail of a LazyImage. On a cache hit the source image is
+    never decoded, otherwise it is scaled down from a larger cached zoom level
+    or from the store's capped master.
+    """
+    if is_stale is not None and is_stale():
+        return None
+    
+    with span("cache_lookup", "image"):
+        key = cache.content_key(image.path)
+        data = cache.get(key, size)
+    if data is not None:
+        return data, True
+    
+    # A larger pre-rendered level is much cheaper to scale than the master
+    data = cache.nearest(key, size, MIP_SIZES, larger_only=True)
+    with span("decode", "image", path=image.path, source="mip" if data is not None else "master"):
+        if data is not None:
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        else:
+            img = store.master(image).copy()
+    with span("lanczos", "image", size=size):
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+    cache.put(key, size, img)
+    return img, True
+
+
+def load_preview(cache, img_path, size, is_stale):
+    """Fast first zoom stage: the nearest cached level, rescaled with BILINEAR"""
+    if is_stale():
+        return None
+    
+    key = cache.content_key(img_path)
+    data = cache.get(key, size)
+    if data is not None:
+        return data, True
+    
+    data = cache.nearest(key, size, MIP_SIZES)
+    if data is None:
+        return None
+    img = Image.open(io.BytesIO(data))
+    scale = size / max(img.size)
+    new_size = (max(1, round(img.width * scale)), max(1, round(img.height * scale)))
+    return img.resize(new_size, Image.Resampling.BILINEAR), False
+
+
+def build_mips(cache, store, image):
+    """Pre-render the missing zoom levels of one image (background thread)"""
+    key = cache.content_key(image.path)
+    missing = [size for size in MIP_SIZES if not cache.has(key, size)]
+    if not missing:
+        return
+    
+    # Don't let background work push visible tiles' masters out of the store
+    master = store.master(image, keep=False)
+    for size in missing:
+        img = master.copy()
+        img.thumbnail((size, size), Image.Resampling.LANCZOS)
+        cache.put(key, size, img)
+
+
+# Rows rendered above and below the viewport so scrolling doesn't show gaps
+OVERSCAN_ROWS = 2
+# Rows beyond the overscan whose thumbnails are decoded ahead of scrolling;
+# images further away are not read at all until they come this close
+PREFETCH_ROWS = 4
+# Photos kept for tiles that scrolled out of view, so scrolling back is instant
+PHOTO_LRU_SIZE = 128
+
+# How often the Tk thread picks up changes reported by the directory watcher
+WATCH_POLL_MS = 250
+# Pointer travel (px) below which a press and release on a tile is a click, not a drag
+CLICK_SLOP = 4
+# How often the Tk thread checks on duplicate search and auto-arrange
+FUTURE_POLL_MS = 100
+# Auto-arrange menu: sorter.arrange mode and label
+ARRANGE_MODES = (
+    ("location", "By location, then date"),
+    ("time", "By date"),
+    ("visual", "Visual flow (similar colors next to each other)")
+)
+# Position badge colours: normal, and member of a near-duplicate group
+BADGE = "#2196F3"
+DUPLICATE_BADGE = "#FF9800"
+
+
+class ImageSorter:
+    def __init__(self, root, evict_offscreen=False, numbering=planner.DENSE, numbering_step=planner.DEFAULT_STEP,
+                 autosave=True, image_dir=None, thumb_dir=None, metadata_file=None, cache_dir=None,
+                 prefetch_rows=PREFETCH_ROWS):
+        self.root = root
+        self.root.title("Architecture Image Sorter - Drag to Reorder")
+        self.root.geometry("1600x800")  # Increased width for 7 columns
+        
+        # Make window appear in front
+        self.root.lift()
+        self.root.attributes('-topmost', True)
+        self.root.after(100, lambda: self.root.attributes('-topmost', False))
+        
+        # How Apply Changes numbers the files (see sorter.planner)
+        self.numbering = numbering
+        self.numbering_step = numbering_step
+        # Location edits are written to the metadata file as they are typed
+        self.autosave = autosave
+        self.autosaver = None
+        
+        # Paths (the repo's gallery unless given, e.g. by benchmarks)
+        self.image_dir = Path(image_dir) if image_dir else core.IMAGE_DIR
+        self.thumb_dir = Path(thumb_dir) if thumb_dir else core.THUMB_DIR
+        self.metadata_file = Path(metadata_file) if metadata_file else core.METADATA_FILE
+        
+        # Finish or undo a rename that was interrupted last time
+        try:
+            recovered = core.recover_pending(self.image_dir)
+            if recovered:
+                messagebox.showinfo("Recovered", f"An interrupted rename was {recovered}.")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to recover an interrupted rename:\n{str(e)}")
+            root.destroy()
+            return
+        
+        # Get all image files from main directory, in the order of the last apply
+        with span("scan"):
+            order = core.load_order_manifest(core.order_manifest_for(self.metadata_file))
+            image_files = core.list_images(self.image_dir, order)
+        PROFILER.info["images"] = len(image_files)
+        
+        if not image_files:
+            messagebox.showerror("Error", f"No images found in {self.image_dir}")
+            root.destroy()
+            return
+        
+        # Drag state
+        self.drag_start_index = None
+        self.drag_widget = None
+        # Indices moved by the current drag: the selection the press was on
+        self._drag_indices = []
+        # Selected items, and the item shift-click ranges start from
+        self.selection = set()
+        self._selection_anchor = None
+        self.images_loaded = False
+        self.drop_indicator_height = int(200 * 1.15) + 16  # Match frame + padding
+        
+        # Background decoding: Pillow work runs on worker threads, results are
+        # handed back through a queue that the Tk thread drains with after()
+        self._executor = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+        self._decoded = queue.Queue()
+        self._pending_decodes = 0
+        self._draining = False
+        # Zoom jobs carry the generation they were queued for; moving the
+        # slider bumps it so stale work is skipped or cancelled
+        self._zoom_generation = 0
+        self._zoom_futures = []
+        # Decoding starts when a tile comes within this many rows of the viewport
+        self.prefetch_rows = max(0, prefetch_rows)
+        # Pre-rendering zoom levels gets its own thread so it never delays tiles
+        self._background = ThreadPoolExecutor(max_workers=1)
+        self.thumb_cache = ThumbnailCache(Path(cache_dir) if cache_dir else core.REPO_DIR / CACHE_DIR_NAME)
+        # Zoom masters capped at the 300% tile size instead of full-res copies
+        self.image_store = ImageStore(evict_offscreen=evict_offscreen)
+        self.root.bind("<Destroy>", self._on_root_destroy, add="+")
+        # Files added, removed or replaced while the window is open
+        self._directory_changes = queue.Queue()
+        self.watcher = DirectoryWatcher([self.image_dir, self.thumb_dir], self._on_directory_change)
+        
+        with span("setup_ui"):
+            self.setup_ui()
+        with span("load_metadata"):
+            self.load_metadata()
+        with span("load_images"):
+            self.load_images(image_files)
+        self.watcher.start()
+        self.root.after(WATCH_POLL_MS, self._poll_directory_changes)
+    
+    def load_metadata(self):
+        """Load existing location metadata (and manifest fields) from the JS file"""
+        self.metadata_entries = core.load_metadata_entries(self.metadata_file)
+        self.metadata = {name: fields.get("location", "") for name, fields in self.metadata_entries.items()}
+        if self.autosave:
+            self.autosaver = MetadataAutosaver(self.metadata_file)
+    
+    def setup_ui(self):
+        # Title bar
+        title_bar = tk.Frame(self.root, bg="#2c3e50", height=50)
+        title_bar.pack(fill=tk.X, side=tk.TOP)
+        
+        title_label = tk.Label(
+            title_bar,
+            text="Architecture Image Sorter",
+            font=("Arial", 14, "bold"),
+            bg="#2c3e50",
+            fg="white",
+            pady=10
+        )
+        title_label.pack(side=tk.LEFT, padx=20)
+        
+        # Zoom controls
+        zoom_frame = tk.Frame(title_bar, bg="#2c3e50")
+        zoom_frame.pack(side=tk.LEFT, padx=20)
+        
+        zoom_label = tk.Label(
+            zoom_frame,
+            text="Zoom:",
+            font=("Arial", 10),
+            bg="#2c3e50",
+            fg="white"
+        )
+        zoom_label.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Zoom level (50-300%)
+        self.zoom_level = 100
+        
+        # Zoom slider
+        self.zoom_slider = tk.Scale(
+            zoom_frame,
+            from_=50,
+            to=300,
+            orient=tk.HORIZONTAL,
+            command=self.on_zoom_change,
+            bg="#34495e",
+            fg="white",
+            highlightthickness=0,
+            troughcolor="#2c3e50",
+            activebackground="#3498db",
+            length=200,
+            width=15,
+            showvalue=0  # Hide default value display
+        )
+        self.zoom_slider.set(100)
+        self.zoom_slider.pack(side=tk.LEFT, padx=5)
+        
+        self.zoom_display = tk.Label(
+            zoom_frame,
+            text="100%",
+            font=("Arial", 10),
+            bg="#2c3e50",
+            fg="white",
+            width=5
+        )
+        self.zoom_display.pack(side=tk.LEFT, padx=(5, 0))
+        
+        # Button frame in title
+        button_frame = tk.Frame(title_bar, bg="#2c3e50") # Changed from title_frame to title_bar
+        button_frame.pack(side=tk.RIGHT, padx=20)
+        
+        self.arrange_menu = tk.Menu(self.root, tearoff=0)
+        for mode, label in ARRANGE_MODES:
+            self.arrange_menu.add_command(label=label, command=lambda m=mode: self.auto_arrange(m))
+        self.arrange_btn = tk.Button(
+            button_frame,
+            text="⇅ Arrange",
+            command=self._show_arrange_menu,
+            bg="#9C27B0",
+            fg="white",
+            font=("Arial", 11, "bold"),
+            padx=15,
+            pady=8,
+            relief=tk.FLAT,
+            cursor="hand2"
+        )
+        self.arrange_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.duplicates_btn = tk.Button(
+            button_frame,
+            text="⧉ Duplicates",
+            command=self.find_duplicates,
+            bg="#FF9800",
+            fg="white",
+            font=("Arial", 11, "bold"),
+            padx=15,
+            pady=8,
+            relief=tk.FLAT,
+            cursor="hand2"
+        )
+        self.duplicates_btn.pack(side=tk.LEFT, padx=5)
+        
+        apply_btn = tk.Button(
+            button_frame,
+            text="✓ Apply Changes",
+            command=self.apply_changes,
+            bg="#4CAF50",
+            fg="white",
+            font=("Arial", 11, "bold"),
+            padx=15,
+            pady=8,
+            relief=tk.FLAT,
+            cursor="hand2"
+        )
+        apply_btn.pack(side=tk.LEFT, padx=5)
+        
+        cancel_btn = tk.Button(
+            button_frame,
+            text="✕ Cancel",
+            command=self.root.destroy,
+            bg="#f44336",
+            fg="white",
+            font=("Arial", 11, "bold"),
+            padx=15,
+            pady=8,
+            relief=tk.FLAT,
+            cursor="hand2"
+        )
+        cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        # Main canvas with scrollbar
+        main_frame = tk.Frame(self.root)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Canvas for scrolling. Tiles are a small pool of frames embedded as
+        # canvas windows and recycled as the view scrolls, so widget count
+        # depends on the viewport rather than the number of images.
+        self.canvas = tk.Canvas(main_frame, bg="#f5f5f5", highlightthickness=0)
+        self.scrollbar = ttk.Scrollbar(main_frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(yscrollcommand=self._on_canvas_yview)
+        
+        self.tile_pool = []
+        self._highlighted_tiles = []
+        self._photo_lru = OrderedDict()
+        # Resize, zoom, scroll and reorder all funnel into one idle layout pass
+        self.layout = LayoutScheduler(self.root.after_idle, self._relayout)
+        self._scroll_region = None
+        self._yview = None
+        
+        # Drop indicator is a canvas item, hidden until a drag needs it
+        self.drop_indicator = self.canvas.create_rectangle(
+            0, 0, 0, 0, fill="#f44336", width=0, state="hidden"
+        )
+        
+        # Pack canvas and scrollbar
+        self.canvas.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+        
+        # Bind mousewheel to canvas
+        self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
+        
+        # Viewport height changes which rows are visible
+        self.canvas.bind("<Configure>", self._on_canvas_configure)
+        
+        # Bind window resize to adjust columns
+        self.root.bind("<Configure>", self.on_window_resize)
+        
+        # A click between tiles clears the selection
+        self.canvas.bind("<Button-1>", self._on_canvas_click)
+        
+        # Keyboard: undo/redo, selection and moving the selected images
+        keys = {
+            "<Control-z>": self.undo,
+            "<Control-y>": self.redo,
+            "<Control-Shift-Z>": self.redo,
+            "<Control-a>": self.select_all,
+            "<Escape>": self.clear_selection,
+            "<Home>": lambda: self.move_selection(-len(self.model)),
+            "<End>": lambda: self.move_selection(len(self.model)),
+            "<Prior>": lambda: self.move_selection(-self._page_size()),
+            "<Next>": lambda: self.move_selection(self._page_size()),
+            "<Control-Left>": lambda: self.move_selection(-1),
+            "<Control-Right>": lambda: self.move_selection(1),
+            "<Control-Up>": lambda: self.move_selection(-self._current_cols),
+            "<Control-Down>": lambda: self.move_selection(self._current_cols)
+        }
+        for sequence, action in keys.items():
+            self.root.bind(sequence, lambda e, a=action: self._on_key(e, a))
+    
+    def calculate_columns(self):
+        """Calculate number of columns based on window width"""
+        window_width = self.root.winfo_width()
+        # Calculate size per image based on zoom level
+        base_size = 200
+        zoom_multiplier = self.zoom_level / 100 if hasattr(self, 'zoom_level') else 1.0
+        image_size = int(base_size * zoom_multiplier)
+        # Each image takes image_size + 10px padding on each side + extra margin
+        size_per_image = image_size + 20  # Increased from 10 to 20 for safety
+        # Add more margin for scrollbar and borders
+        available_width = window_width - 60  # Increased from 40 to 60
+        cols = max(1, available_width // size_per_image)
+        return cols
+    
+    @timed("resize", "event")
+    def on_window_resize(self, event):
+        """Handle window resize to adjust columns"""
+        # Only respond to root window resize events
+        if event.widget != self.root:
+            return
+        
+        # Calculate new column count
+        new_cols = self.calculate_columns()
+        
+        # Only relayout if column count changed (the pass re-grids everything then)
+        if not hasattr(self, '_current_cols') or self._current_cols != new_cols:
+            self.layout.request()
+    
+    def recache_positions(self):
+        """Cache the grid geometry and the canvas position on screen"""
+        if not hasattr(self, 'model'):
+            return
+        
+        # Cache canvas position (tile positions are canvas coordinates)
+        self.cached_grid_x = self.canvas.winfo_rootx()
+        self.cached_grid_y = self.canvas.winfo_rooty()
+        
+        # The grid is uniform, so one geometry object covers every tile
+        self.geometry = self.grid_geometry()
+        self.geometry_generation = self.layout.generation
+    
+    @timed("relayout", "event")
+    def _relayout(self, first, last):
+        """
+        The one layout pass (idle callback of self.layout): columns, scroll
+        region, visible tiles and the cached geometry, all for the same window
+        size, zoom and order. Slots come straight from the model's order, so
+        the items that moved (first..last) need no work of their own.
+        """
+        if not hasattr(self, 'model'):
+            return
+        
+        self._current_cols = self.calculate_columns()
+        self.update_scroll_region()
+        self._render_visible()
+        self.recache_positions()
+        
+        if self.images_loaded and hasattr(self, 'loading_overlay'):
+            # Laid out once: nothing left to hide
+            self.loading_overlay.destroy()
+            del self.loading_overlay
+            PROFILER.add("first_layout", "phase", self._load_done, PROFILER.now() - self._load_done)
+            mark("overlay_removed")
+    
+    @timed("on_zoom_change", "event")
+    def on_zoom_change(self, value):
+        """Handle zoom slider change"""
+        new_zoom = int(float(value))
+        if new_zoom != self.zoom_level:
+            self.zoom_level = new_zoom
+            self.zoom_display.config(text=f"{self.zoom_level}%")
+            
+            # Quick update: just resize frames (fast)
+            self.apply_zoom_frames_only()
+            
+            # Fast low-quality images right away, dropping work for older positions
+            self._cancel_zoom_work()
+            self.apply_zoom_preview()
+            
+            # Debounce high-quality resizing (expensive operation)
+            if hasattr(self, '_zoom_timer'):
+                self.root.after_cancel(self._zoom_timer)
+            # Resize actual images after 300ms of no slider movement
+            self._zoom_timer = self.root.after(300, self.apply_zoom_images)
+    
+    def apply_zoom_frames_only(self):
+        """Quickly resize frames without touching images (fast)"""
+        if not hasattr(self, 'model') or len(self.model) == 0:
+            return
+        
+        # Height is maintained at 1.15x ratio to accommodate text box
+        new_width, new_height = self.tile_size()
+        
+        # Only update frame sizes of the pooled tiles (very fast)
+        for tile in self.tile_pool:
+            tile['frame'].config(width=new_width, height=new_height)
+        
+        # Update drop indicator height to match new frame height + small buffer
+        self.drop_indicator_height = new_height + 16
+        
+        # Tile origins, the column count and the scroll region follow in the next layout pass
+        self.layout.request()
+    
+    def apply_zoom_preview(self):
+        """Show visible tiles at the new zoom straight away from the nearest cached level"""
+        if not hasattr(self, 'model') or len(self.model) == 0:
+            return
+        
+        size = self.thumb_size()
+        is_stale = self._stale_check()
+        for tile in self._tiles_by_visibility():
+            item = tile['item']
+            if item.photo_size == size:
+                continue
+            item.decode_size = size
+            future = self._submit_job(
+                item, size, load_preview, self.thumb_cache, item.img_path, size, is_stale
+            )
+            self._zoom_futures.append(future)
+    
+    @timed("apply_zoom_images", "event")
+    def apply_zoom_images(self):
+        """Refine visible tiles to full quality (called after slider stops)"""
+        if not hasattr(self, 'model') or len(self.model) == 0:
+            return
+        
+        new_size = self.thumb_size()
+        
+        # Off-screen photos are the wrong size now, they reload when shown
+        for item in self._photo_lru.values():
+            item.photo = None
+            item.photo_size = None
+            item.decode_size = None
+        self._photo_lru.clear()
+        
+        # Thumbnails come from the disk cache when this zoom bucket was used
+        # before, otherwise they are resized on the worker pool, on-screen
+        # tiles first. Tiles already final at this size are left alone.
+        is_stale = self._stale_check()
+        for tile in self._tiles_by_visibility():
+            item = tile['item']
+            if item.photo_final and item.photo_size == new_size:
+                continue
+            self._zoom_futures.append(self._submit_decode(item, is_stale))
+    
+    def apply_zoom(self):
+        """Apply current zoom level to all images (full update)"""
+        self.apply_zoom_frames_only()
+        self.apply_zoom_images()
+    
+    def update_scroll_region(self):
+        """Update canvas scroll region to match actual content size"""
+        if not hasattr(self, 'model'):
+            return
+        
+        # Content size follows from the layout, most tiles have no widget to measure
+        content_width, content_height = self.grid_geometry().content_size
+        
+        # If content height is less than canvas height, disable vertical scrolling
+        canvas_height = self.canvas.winfo_height()
+        region = (0, 0, content_width, max(content_height, canvas_height))
+        # Reconfiguring fires yscrollcommand, which would request another layout pass
+        if region != self._scroll_region:
+            self._scroll_region = region
+            self.canvas.configure(scrollregion=region)
+    
+    def tile_size(self):
+        """Tile (frame) width and height for the current zoom"""
+        size = int(200 * (self.zoom_level / 100))
+        return size, int(size * 1.15)
+    
+    def grid_geometry(self):
+        """Layout of the grid for the current columns, zoom and image count"""
+        width, height = self.tile_size()
+        return GridGeometry(self._current_cols, len(self.model), width, height)
+    
+    def _on_canvas_yview(self, first, last):
+        """Canvas scrolled: update the scrollbar and re-render the visible rows"""
+        self.scrollbar.set(first, last)
+        if (first, last) != self._yview:
+            self._yview = (first, last)
+            self.layout.request()
+    
+    def _on_canvas_configure(self, event):
+        """Canvas resized: the number of visible rows may have changed"""
+        self.layout.request()
+    
+    @timed("render_visible", "event")
+    def _render_visible(self):
+        """Bind pooled tiles to the items inside the viewport (plus overscan) and prefetch past it"""
+        if not self.model:
+            return
+        
+        geometry = self.grid_geometry()
+        
+        # Index range covered by the viewport
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        start, end = geometry.row_range(top, bottom, OVERSCAN_ROWS)
+        
+        # Tiles showing items outside the range are free for reuse, except the
+        # one being dragged: it holds the pointer grab until the release
+        dragged = self.model[self.drag_start_index] if self.drag_start_index is not None else None
+        free = []
+        for tile in self.tile_pool:
+            item = tile['item']
+            if item is None or (item is not dragged and not start <= self.model.index(item) < end):
+                free.append(tile)
+        
+        for idx in range(start, end):
+            item = self.model[idx]
+            tile = item.tile
+            if tile is None:
+                tile = free.pop() if free else self._create_tile()
+                self._bind_tile(tile, item)
+            
+            # Reposition and relabel only tiles whose slot changed
+            origin = geometry.origin(idx)
+            if tile['index'] != idx or tile['origin'] != origin:
+                self.canvas.coords(tile['window'], *origin)
+                tile['pos_label'].config(text=str(idx + 1))
+                tile['index'] = idx
+                tile['origin'] = origin
+            self.canvas.itemconfigure(tile['window'], state="normal")
+        
+        for tile in free:
+            self._unbind_tile(tile)
+        
+        # Bound tiles queued their own decodes; warm the caches for the rows beyond
+        near_start, near_end = geometry.row_range(top, bottom, OVERSCAN_ROWS + self.prefetch_rows)
+        for idx in itertools.chain(range(near_start, start), range(end, near_end)):
+            item = self.model[idx]
+            if not item.ready and item.decode_size is None:
+                self._submit_decode(item)
+    
+    @timed("create_tile", "widget")
+    def _create_tile(self):
+        """Create one reusable tile (frame, position badge, image, location entry)"""
+        width, height = self.tile_size()
+        frame = tk.Frame(
+            self.canvas,
+            bg="white",
+            relief=tk.FLAT,
+            borderwidth=1,
+            cursor="hand2",
+            width=width,
+            height=height
+        )
+        frame.pack_propagate(False)  # Prevent frame from resizing
+        
+        # Position number overlay
+        pos_label = tk.Label(
+            frame,
+            text="",
+            font=("Arial", 16, "bold"),
+            bg=BADGE,
+            fg="white",
+            padx=8,
+            pady=4
+        )
+        pos_label.place(x=5, y=5)
+        
+        # Location Entry (at the bottom of the frame)
+        # Pack this BEFORE the image to ensure it's visible
+        location_frame = tk.Frame(frame, bg="white")
+        location_frame.pack(side=tk.BOTTOM, fill=tk.X, padx=2, pady=2)
+        
+        loc_entry = tk.Entry(
+            location_frame,
+            font=("Arial", 9),
+            bg="#fcfcfc",
+            relief=tk.SUNKEN,
+            borderwidth=1
+        )
+        loc_entry.pack(fill=tk.X)
+        
+        # Placeholder until the worker pool has decoded the image
+        img_label = tk.Label(frame, text="Loading...", font=("Arial", 9), bg="white", fg="#999")
+        img_label.pack(expand=True, fill=tk.BOTH)
+        
+        tile = {
+            'frame': frame,
+            'pos_label': pos_label,
+            'img_label': img_label,
+            'loc_entry': loc_entry,
+            'window': self.canvas.create_window(0, 0, window=frame, anchor="nw", state="hidden"),
+            'item': None,
+            'index': None,
+            'origin': None,
+            'highlighted': False
+        }
+        # Bound once: handlers look up the tile's current index when they fire
+        self.bind_drag_events(frame, tile)
+        loc_entry.bind("<KeyRelease>", lambda e, t=tile: self._location_edited(t))
+        self.tile_pool.append(tile)
+        return tile
+    
+    def _bind_tile(self, tile, item):
+        """Show an item in a pooled tile"""
+        if tile['item'] is not None:
+            self._unbind_tile(tile)
+        
+        tile['item'] = item
+        item.tile = tile
+        self._photo_lru.pop(id(item), None)
+        
+        tile['loc_entry'].delete(0, tk.END)
+        tile['loc_entry'].insert(0, item.location)
+        
+        dragging = self.drag_start_index is not None and self.model[self.drag_start_index] is item
+        self._set_highlight(tile, dragging or item in self.selection)
+        self._set_badge(tile)
+        
+        photo = item.photo
+        if photo is not None:
+            tile['img_label'].config(image=photo, text="", bg="white")
+        else:
+            tile['img_label'].config(image="", text="Loading...", fg="#999", bg=item.color)
+            # First time near the viewport, or the photo was dropped while
+            # off-screen (then usually a cache hit)
+            if item.decode_size is None:
+                self._submit_decode(item)
+    
+    def _set_badge(self, tile):
+        """Members of a near-duplicate group get an orange badge"""
+        tile['pos_label'].config(bg=DUPLICATE_BADGE if tile['item'].duplicate_group is not None else BADGE)
+    
+    def _unbind_tile(self, tile):
+        """Detach a pooled tile from its item and hide it"""
+        item = tile['item']
+        if item is not None:
+            # Keep edits made in the recycled entry
+            item.location = tile['loc_entry'].get()
+            item.tile = None
+            self.image_store.offscreen(item.img_path)
+            
+            # Keep a bounded number of off-screen photos around
+            if item.photo is not None:
+                self._photo_lru[id(item)] = item
+                while len(self._photo_lru) > PHOTO_LRU_SIZE:
+                    _, evicted = self._photo_lru.popitem(last=False)
+                    evicted.photo = None
+                    evicted.photo_size = None
+                    evicted.decode_size = None
+        
+        tile['item'] = None
+        tile['index'] = None
+        tile['origin'] = None
+        self.canvas.itemconfigure(tile['window'], state="hidden")
+    
+    def _set_highlight(self, tile, highlighted):
+        """Highlight or clear a tile, touching Tk only when its state changes"""
+        if tile['highlighted'] == highlighted:
+            return
+        tile['highlighted'] = highlighted
+        if highlighted:
+            tile['frame'].config(bg="#bbdefb", relief=tk.FLAT, borderwidth=2)  # Light blue
+            self._highlighted_tiles.append(tile)
+        else:
+            tile['frame'].config(bg="white", borderwidth=1, relief=tk.FLAT)
+            self._highlighted_tiles = [t for t in self._highlighted_tiles if t is not tile]
+    
+    def _clear_highlights(self, keep=None):
+        """Clear every highlighted tile except keep and the selected ones"""
+        for tile in list(self._highlighted_tiles):
+            if tile is not keep and tile['item'] not in self.selection:
+                self._set_highlight(tile, False)
+    
+    def _select(self, item, selected):
+        if selected:
+            self.selection.add(item)
+        else:
+            self.selection.discard(item)
+        if item.tile is not None:
+            self._set_highlight(item.tile, selected)
+    
+    def _selected_indices(self):
+        """Indices of the selected items, ascending"""
+        return sorted(self.model.index(item) for item in self.selection)
+    
+    def clear_selection(self):
+        for item in list(self.selection):
+            self._select(item, False)
+    
+    def select_all(self):
+        for item in self.model:
+            self._select(item, True)
+    
+    def select_only(self, index):
+        """Plain click: just this item"""
+        self.clear_selection()
+        self._select(self.model[index], True)
+        self._selection_anchor = self.model[index]
+    
+    def toggle_selection(self, index):
+        """Ctrl-click: add or remove one item"""
+        self._take_focus()
+        if index is None:
+            return
+        item = self.model[index]
+        self._select(item, item not in self.selection)
+        self._selection_anchor = item
+    
+    def extend_selection(self, index):
+        """Shift-click: everything between the last clicked item and this one"""
+        self._take_focus()
+        if index is None:
+            return
+        if self._selection_anchor not in self.model:
+            self.select_only(index)
+            return
+        anchor = self.model.index(self._selection_anchor)
+        self.clear_selection()
+        for idx in range(min(anchor, index), max(anchor, index) + 1):
+            self._select(self.model[idx], True)
+    
+    def _location_edited(self, tile):
+        """Queue a typed location for autosave (keys that don't change the text are ignored)"""
+        item = tile['item']
+        if item is None:
+            return
+        location = tile['loc_entry'].get()
+        if location == item.location:
+            return
+        item.location = location
+        if self.autosaver is not None:
+            self.autosaver.update(item.file.name, location=location.strip())
+    
+    def get_location(self, item):
+        """Current location text for an item (live from its entry if on screen)"""
+        tile = item.tile
+        if tile is not None:
+            return tile['loc_entry'].get()
+        return item.location
+    
+    def show_loading_overlay(self):
+        """Show loading overlay on top of everything"""
+        # Create loading overlay
+        self.loading_overlay = tk.Frame(
+            self.root,
+            bg="#f5f5f5"
+        )
+        self.loading_overlay.place(relx=0, rely=0, relwidth=1, relheight=1)
+        
+        loading_label = tk.Label(
+            self.loading_overlay,
+            text="Loading images...",
+            font=("Arial", 16, "bold"),
+            bg="#f5f5f5",
+            fg="#666"
+        )
+        loading_label.place(relx=0.5, rely=0.5, anchor="center")
+        
+        # Ensure overlay is on top
+        self.loading_overlay.lift()
+    
+    def _on_mousewheel(self, event):
+        self.canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
+    
+    def load_images(self, image_files):
+        # Show loading overlay immediately
+        self.show_loading_overlay()
+        
+        # Items and their order; the grid is a view of it
+        self.model = GalleryModel()
+        
+        # Calculate grid dimensions - responsive based on window width
+        self._current_cols = self.calculate_columns()
+        
+        # One listing instead of a stat per image
+        thumb_names = set(os.listdir(self.thumb_dir)) if self.thumb_dir.is_dir() else set()
+        
+        for image_file in image_files:
+            self._new_item(image_file, thumb_names)
+        
+        # The site hides images without an exact-name thumbnail
+        missing = sum(1 for f in image_files if f.name not in thumb_names)
+        if missing:
+            print(f"Warning: {missing} images have no thumbnail (run: python -m image_sorter thumbs)")
+
+        # Grid is usable right away, tiles become draggable as they finish decoding
+        self.images_loaded = True
+
+        # The first layout pass renders the visible rows and removes the overlay
+        self._load_done = PROFILER.now()
+        self.layout.request(0)
+
+    def _new_item(self, image_file, thumb_names):
+        """Add image_file after the other items; its thumbnail loads when it comes near the viewport"""
+        # No widgets and no file reads here: tiles are created on demand for
+        # the visible rows, and the grid is uniform so it needs no image sizes
+        return self.model.add(
+            image_file,
+            core.find_thumbnail(self.thumb_dir, image_file, thumb_names),
+            self.metadata.get(image_file.name, ""),
+            self.metadata_entries.get(image_file.name, {}).get("color", "white")
+        )
+    
+    def _reload_item(self, item, thumb_file):
+        """Drop everything loaded for an item whose image or thumbnail changed on disk"""
+        self.image_store.evict(item.img_path)
+        self._photo_lru.pop(id(item), None)
+        item.thumb_file = thumb_file
+        item.image = LazyImage(thumb_file or item.file)
+        item.photo = None
+        item.photo_size = None
+        item.photo_final = False
+        item.decode_size = None
+        item.ready = False
+        # Off-screen items load again when they come near the viewport
+        tile = item.tile
+        if tile is not None:
+            tile['img_label'].config(image="", text="Loading...", fg="#999", bg=item.color)
+            self._submit_decode(item)
+    
+    def _on_directory_change(self, changes):
+        """Watcher callback (watcher thread): hand the changed names to the Tk thread"""
+        self._directory_changes.put(changes)
+    
+    def _poll_directory_changes(self):
+        """Apply changes reported by the watcher (Tk thread), but never in the middle of a drag"""
+        if self.drag_start_index is None and not self._directory_changes.empty():
+            names = set()
+            while not self._directory_changes.empty():
+                for changed in self._directory_changes.get_nowait().values():
+                    # None: the watcher lost events, so treat everything as changed
+                    names = None if changed is None or names is None else names | changed
+            self.sync_with_directory(names)
+        self.root.after(WATCH_POLL_MS, self._poll_directory_changes)
+    
+    @timed("sync_with_directory", "event")
+    def sync_with_directory(self, changed=None):
+        """
+        Bring the grid in line with the image directory: drop items whose file
+        is gone, reload the ones in changed (image or thumbnail names, None for
+        all), and append new files at the end. The order and typed locations
+        of everything else stay as they are.
+        """
+        current = {path.name: path for path in core.list_images(self.image_dir)}
+        thumb_names = set(os.listdir(self.thumb_dir)) if self.thumb_dir.is_dir() else set()
+        
+        for item in self.model:
+            if item.file.name not in current:
+                if item.tile is not None:
+                    self._unbind_tile(item.tile)
+                self.selection.discard(item)
+                self._photo_lru.pop(id(item), None)
+                self.image_store.evict(item.img_path)
+        # Removing items also clears the undo history
+        first_moved = self.model.retain(lambda item: item.file.name in current)
+        
+        for item in self.model:
+            thumb_file = core.find_thumbnail(self.thumb_dir, item.file, thumb_names)
+            if (changed is None or item.file.name in changed or thumb_file != item.thumb_file
+                    or (thumb_file is not None and thumb_file.name in changed)):
+                self._reload_item(item, thumb_file)
+        
+        added = [path for name, path in current.items() if self.model.find(name) is None]
+        if added:
+            if first_moved is None:
+                first_moved = len(self.model)
+            # Locations of files that come back (or were added by hand) are in the file
+            self.metadata_entries = core.load_metadata_entries(self.metadata_file)
+            self.metadata.update(
+                (name, fields["location"]) for name, fields in self.metadata_entries.items() if "location" in fields
+            )
+            for image_file in added:
+                self._new_item(image_file, thumb_names)
+        
+        self._update_thumbnails(changed, current, thumb_names)
+        if first_moved is not None:
+            self.refresh_grid(first_moved)
+    
+    def _update_thumbnails(self, changed, current, thumb_names):
+        """Regenerate thumbs/ entries that are missing or older than their changed image"""
+        names = current.keys() if changed is None else changed & current.keys()
+        for name in names:
+            thumb = self.thumb_dir / name
+            try:
+                if name in thumb_names and thumb.stat().st_mtime_ns >= current[name].stat().st_mtime_ns:
+                    continue
+            except FileNotFoundError:
+                continue
+            # The watcher sees the new thumbnail and switches the tile over to it
+            self.thumb_dir.mkdir(parents=True, exist_ok=True)
+            future = self._background.submit(thumbs.make_thumbnail, current[name], thumb)
+            future.add_done_callback(
+                lambda f, n=name: f.exception() and print(f"Warning: thumbnail for {n} failed: {f.exception()}")
+            )
+    
+    def thumb_size(self):
+        """Pixel size of grid thumbnails for the current zoom bucket"""
+        return int(200 * zoom_bucket(self.zoom_level) / 100)
+    
+    def _submit_decode(self, item, is_stale=None):
+        """Queue a tile's full-quality thumbnail for loading on the worker pool"""
+        size = self.thumb_size()
+        if not item.ready:
+            # First load: pre-render the other zoom levels once it's in
+            self._background.submit(build_mips, self.thumb_cache, self.image_store, item.image)
+        item.decode_size = size
+        return self._submit_job(
+            item, size, load_thumbnail, self.thumb_cache, self.image_store,
+            item.image, size, is_stale
+        )
+    
+    def _submit_job(self, item, size, job, *args):
+        """Run an image job on the worker pool and deliver its result to the Tk thread"""
+        future = self._executor.submit(job, *args)
+        self._pending_decodes += 1
+        # The callback runs on the worker thread, so only touch the queue here
+        future.add_done_callback(lambda f, w=item, s=size: self._decoded.put((w, s, f)))
+        
+        if not self._draining:
+            self._draining = True
+            self.root.after(15, self._drain_decoded)
+        return future
+    
+    def _stale_check(self):
+        """Callable telling a worker whether the zoom it was queued for is outdated"""
+        generation = self._zoom_generation
+        return lambda: self._zoom_generation != generation
+    
+    def _cancel_zoom_work(self):
+        """Invalidate queued zoom jobs (unstarted ones are cancelled outright)"""
+        self._zoom_generation += 1
+        for future in self._zoom_futures:
+            future.cancel()
+        self._zoom_futures = []
+    
+    def _tiles_by_visibility(self):
+        """Tiles that show an item, on-screen ones first, each group top to bottom"""
+        geometry = self.grid_geometry()
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        
+        def key(tile):
+            y = geometry.origin(tile['index'])[1]
+            return (y + geometry.tile_height <= top or y >= bottom, tile['index'])
+        
+        return sorted((tile for tile in self.tile_pool if tile['item'] is not None), key=key)
+
+    @timed("drain_decoded", "event")
+    def _drain_decoded(self):
+        """Install finished images on their tiles (Tk thread only)"""
+        # Bound the work per tick so the UI keeps handling events during load
+        deadline = time.perf_counter() + 0.012
+        while time.perf_counter() < deadline:
+            try:
+                item, size, future = self._decoded.get_nowait()
+            except queue.Empty:
+                break
+            self._pending_decodes -= 1
+
+            if future.cancelled():
+                continue
+
+            tile = item.tile
+            try:
+                result = future.result()
+                
+                # Skipped as stale, or no cached level to preview from
+                if result is None:
+                    continue
+                img, final = result
+                
+                # Zoom moved on while this was loading, a newer request is queued
+                if size != item.decode_size:
+                    continue
+                
+                # Never replace a refined image with the preview of the same size
+                if not final and item.photo_final and item.photo_size == size:
+                    continue
+                
+                if tile is None:
+                    # Scrolled away meanwhile: no photo now, reload from cache when shown
+                    if final:
+                        item.decode_size = None
+                        item.ready = True
+                    continue
+                
+                with span("photoimage", "image", png=isinstance(img, bytes)):
+                    if isinstance(img, bytes):
+                        # Cache hit: Tk reads the PNG directly, no Pillow involved
+                        photo = tk.PhotoImage(data=img)
+                    else:
+                        photo = ImageTk.PhotoImage(img)
+                item.photo = photo
+                item.photo_size = size
+                item.photo_final = final
+                tile['img_label'].config(image=photo, text="", bg="white")
+                if not final:
+                    continue
+            except Exception:
+                if tile is not None:
+                    tile['img_label'].config(text="Image", fg="black")
+
+            item.ready = True
+
+        if self._pending_decodes > 0:
+            self.root.after(15, self._drain_decoded)
+        else:
+            self._draining = False
+            self.thumb_cache.flush()
+            mark("thumbnails_loaded")
+
+    def _on_root_destroy(self, event):
+        """Stop background decoding when the window goes away"""
+        if event.widget is self.root:
+            self.watcher.stop()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._background.shutdown(wait=False, cancel_futures=True)
+            self.thumb_cache.flush()
+            if self.autosaver is not None:
+                # Don't lose the last edits typed before closing
+                self.autosaver.close()
+
+    def bind_drag_events(self, widget, tile):
+        """Bind drag events to widget and all children, excluding Entries"""
+        if isinstance(widget, tk.Entry):
+            return
+        
+        # The tile's index changes as items move, so resolve it when the event fires
+        widget.bind("<Button-1>", lambda e, t=tile: self.start_drag(e, t['index']))
+        widget.bind("<Control-Button-1>", lambda e, t=tile: self.toggle_selection(t['index']))
+        widget.bind("<Shift-Button-1>", lambda e, t=tile: self.extend_selection(t['index']))
+        widget.bind("<B1-Motion>", lambda e, t=tile: self.on_drag(e, t['index']))
+        widget.bind("<ButtonRelease-1>", lambda e, t=tile: self.end_drag(e, t['index']))
+        
+        for child in widget.winfo_children():
+            self.bind_drag_events(child, tile)
+    
+    @timed("start_drag", "event")
+    def start_drag(self, event, index):
+        self._take_focus()
+        # Don't allow drag if images are still loading
+        if index is None or not self.images_loaded or not self.model[index].ready:
+            return
+        
+        # Pressing on a selected item drags the whole selection
+        if self.model[index] not in self.selection:
+            self.select_only(index)
+        self._drag_indices = self._selected_indices()
+        self._press_position = (event.x_root, event.y_root)
+        
+        self.drag_start_index = index
+        # The window may have moved since the last layout pass
+        self.layout.run()
+        self.recache_positions()
+        tile = self.model[index].tile
+        self.drag_widget = tile['frame']
+        self._set_highlight(tile, True)
+        
+        # Create floating drag image
+        try:
+            photo = self.model[index].photo
+            
+            if photo is not None:
+                # Create toplevel window for floating image
+                self.drag_image_window = tk.Toplevel(self.root)
+                self.drag_image_window.overrideredirect(True)  # Remove window decorations
+                self.drag_image_window.attributes('-alpha', 0.7)  # 70% opacity
+                self.drag_image_window.attributes('-topmost', True)  # Always on top
+                
+                # Create label with the image
+                drag_label = tk.Label(
+                    self.drag_image_window,
+                    image=photo,
+                    bg="white",
+                    relief=tk.RAISED,
+                    borderwidth=2
+                )
+                drag_label.pack()
+                
+                # Update to get actual size
+                self.drag_image_window.update_idletasks()
+                img_width = self.drag_image_window.winfo_width()
+                
+                # Position centered horizontally on cursor, slightly below
+                x_pos = event.x_root - (img_width // 2)
+                y_pos = event.y_root + 10
+                self.drag_image_window.geometry(f"+{x_pos}+{y_pos}")
+        except Exception:
+            # If floating image creation fails, continue without it
+            pass
+    
+    @timed("on_drag", "event")
+    def on_drag(self, event, current_index):
+        if self.drag_start_index is None or not self.images_loaded:
+            return
+        
+        # Move floating drag image with cursor (centered horizontally)
+        if hasattr(self, 'drag_image_window') and self.drag_image_window.winfo_exists():
+            img_width = self.drag_image_window.winfo_width()
+            x_pos = event.x_root - (img_width // 2)
+            y_pos = event.y_root + 10
+            self.drag_image_window.geometry(f"+{x_pos}+{y_pos}")
+        
+        # Auto-scroll when dragging near edges with smooth acceleration
+        canvas_y = event.y_root - self.canvas.winfo_rooty()
+        canvas_height = self.canvas.winfo_height()
+        scroll_zone = 100  # pixels from edge to trigger scroll
+        
+        # Store current scroll state for timer
+        self._current_scroll_speed = 0.0
+        
+        if canvas_y < scroll_zone:
+            # Near top - scroll up with acceleration
+            distance_from_edge = canvas_y
+            speed_factor = 1.0 - (distance_from_edge / scroll_zone)
+            self._current_scroll_speed = -(speed_factor ** 2 * 1)  # Max 1 unit
+        elif canvas_y > canvas_height - scroll_zone:
+            # Near bottom - scroll down with acceleration
+            distance_from_edge = (canvas_height - canvas_y)
+            speed_factor = 1.0 - (distance_from_edge / scroll_zone)
+            self._current_scroll_speed = (speed_factor ** 2 * 1)  # Max 1 unit
+        
+        # Start continuous scroll timer if not already running
+        if not hasattr(self, '_scroll_timer_running') or not self._scroll_timer_running:
+            if self._current_scroll_speed != 0:
+                self._scroll_timer_running = True
+                self._continuous_scroll()
+        
+        # Update drop indicator position
+        self._update_drop_indicator(event)
+    
+    def _continuous_scroll(self):
+        """Continuously scroll while in scroll zone"""
+        if not hasattr(self, '_current_scroll_speed'):
+            self._scroll_timer_running = False
+            return
+        
+        # Initialize accumulator if needed
+        if not hasattr(self, '_scroll_accumulator'):
+            self._scroll_accumulator = 0.0
+        
+        # Accumulate and scroll
+        if self._current_scroll_speed != 0 and self.drag_start_index is not None:
+            self._scroll_accumulator += self._current_scroll_speed
+            if abs(self._scroll_accumulator) >= 1.0:
+                scroll_amount = int(self._scroll_accumulator)
+                self.canvas.yview_scroll(scroll_amount, "units")
+                self._scroll_accumulator -= scroll_amount
+            
+            # Continue scrolling after 50ms
+            self.root.after(50, self._continuous_scroll)
+        else:
+            # Stop scrolling
+            self._scroll_timer_running = False
+            self._scroll_accumulator = 0.0
+    
+    def _drop_target(self, event):
+        """
+        (index, insert_before) for the tile under the cursor, or None.
+        Pure arithmetic on the cached geometry: no widget lookups or Tk round-trips.
+        """
+        # A pass still waiting for idle time means the geometry is from an older layout
+        self.layout.run()
+        if not hasattr(self, 'geometry'):
+            return None
+        x = event.x_root - self.cached_grid_x + self.canvas.canvasx(0)
+        y = event.y_root - self.cached_grid_y + self.canvas.canvasy(0)
+        return self.geometry.hit(x, y)
+    
+    def _update_drop_indicator(self, event):
+        """Update drop indicator position based on mouse position"""
+        target = self._drop_target(event)
+        drop_index, insert_before = target if target else (None, False)
+        position = self._drop_position(drop_index, insert_before)
+        
+        # Only update if drop target changed
+        if position is not None:
+            # Check if we need to update (prevent flickering)
+            current_state = (drop_index, insert_before)
+            if not hasattr(self, '_last_drop_state') or self._last_drop_state != current_state:
+                self._last_drop_state = current_state
+                
+                # Clear highlights left from the previous target
+                self._clear_highlights(keep=self.model[self.drag_start_index].tile)
+                
+                # Center of the gap next to the target, from the cached geometry
+                center_x = self.geometry.indicator_x(drop_index, insert_before)
+                target_y = self.geometry.origin(drop_index)[1]
+                
+                # Move indicator to new position (canvas coordinates)
+                left = center_x - 3
+                top = target_y - 10
+                self.canvas.coords(self.drop_indicator, left, top, left + 6, top + self.drop_indicator_height)
+                self.canvas.itemconfigure(self.drop_indicator, state="normal")
+        else:
+            # Clear state when not over a target that moves anything
+            if hasattr(self, '_last_drop_state'):
+                delattr(self, '_last_drop_state')
+            # Clear highlights and indicators
+            self._clear_highlights(keep=self.model[self.drag_start_index].tile)
+            # Hide indicator
+            self.canvas.itemconfigure(self.drop_indicator, state="hidden")
+    
+    @timed("end_drag", "event")
+    def end_drag(self, event, current_index):
+        if self.drag_start_index is None:
+            return
+        
+        # Tile under the cursor, same arithmetic as the drop indicator
+        target = self._drop_target(event)
+        drop_index, insert_before = target if target else (None, False)
+        position = self._drop_position(drop_index, insert_before)
+        
+        if position is not None:
+            # The dragged items move as one block, in one splice
+            self.move_items(self._drag_indices, position)
+        elif (abs(event.x_root - self._press_position[0]) <= CLICK_SLOP
+                and abs(event.y_root - self._press_position[1]) <= CLICK_SLOP):
+            # A click (no drag) on a selected item selects just that item
+            self.select_only(self.drag_start_index)
+        
+        # Hide drop indicator
+        self.canvas.itemconfigure(self.drop_indicator, state="hidden")
+        
+        # Destroy floating drag image
+        if hasattr(self, 'drag_image_window'):
+            try:
+                self.drag_image_window.destroy()
+            except:
+                pass
+            delattr(self, 'drag_image_window')
+        
+        # Stop continuous scroll
+        self._current_scroll_speed = 0.0
+        self._scroll_timer_running = False
+        
+        # Reset
+        self.drag_start_index = None
+        self.drag_widget = None
+        self._drag_indices = []
+        
+        # Reset backgrounds
+        self._clear_highlights()
+    
+    def _drop_position(self, drop_index, insert_before):
+        """Where the dragged block lands for a drop next to drop_index, None if that moves nothing"""
+        if drop_index is None:
+            return None
+        selected = self._drag_indices
+        position = reorder.drop_position(selected, drop_index if insert_before else drop_index + 1)
+        contiguous = selected[-1] - selected[0] + 1 == len(selected)
+        if contiguous and position == selected[0]:
+            return None
+        return position
+    
+    def move_items(self, selected, position):
+        """Move the items at selected (ascending indices) together so the first lands at position"""
+        diff = self.model.move(selected, position)
+        if diff is not None:
+            self.refresh_grid(diff.first, diff.last)
+    
+    def move_selection(self, delta):
+        """Keyboard move: the selection, gathered into a block, delta positions further"""
+        selected = self._selected_indices()
+        if not selected:
+            return
+        position = max(0, min(len(self.model) - len(selected), selected[0] + delta))
+        self.move_items(selected, position)
+        self._scroll_to(position)
+    
+    def _page_size(self):
+        """Items in one screenful of rows"""
+        geometry = self.grid_geometry()
+        return max(1, self.canvas.winfo_height() // geometry.pitch_y) * geometry.cols
+    
+    def _scroll_to(self, index):
+        """Scroll so the item at index is on screen"""
+        geometry = self.grid_geometry()
+        top = self.canvas.canvasy(0)
+        y = geometry.origin(index)[1]
+        if top <= y and y + geometry.tile_height <= top + self.canvas.winfo_height():
+            return
+        # The layout pass brings the scroll region up to date first
+        self.layout.run()
+        self.canvas.yview_moveto((y - geometry.pad) / self._scroll_region[3])
+    
+    def undo(self):
+        diff = self.model.undo()
+        if diff is not None:
+            self.refresh_grid(diff.first, diff.last)
+    
+    def redo(self):
+        diff = self.model.redo()
+        if diff is not None:
+            self.refresh_grid(diff.first, diff.last)
+    
+    def _take_focus(self):
+        """Move keyboard focus off a location entry so the shortcuts apply again"""
+        self.canvas.focus_set()
+    
+    def _on_canvas_click(self, event):
+        self._take_focus()
+        self.clear_selection()
+    
+    def _on_key(self, event, action):
+        """Run a keyboard action, unless a location is being typed or a drag is in progress"""
+        if isinstance(event.widget, tk.Entry) or self.drag_start_index is not None:
+            return None
+        action()
+        return "break"
+    
+    def refresh_grid(self, first=0, last=None):
+        """
+        Re-grid items first..last (inclusive, default all) in the next layout
+        pass. A move between two indices only shifts the items in between, the
+        rest keep their slots; only on-screen tiles whose index changed are
+        moved and relabelled.
+        """
+        self.layout.request(first, last)
+    
+    def find_duplicates(self):
+        """Hash the thumbnails off the Tk thread, then flag near-duplicate groups"""
+        try:
+            from sorter import duplicates
+        except ImportError as e:
+            messagebox.showerror("Error", f"Finding duplicates needs NumPy:\n{e}")
+            return
+        
+        self.duplicates_btn.config(state=tk.DISABLED, text="⧉ Hashing...")
+        image_files = self.model.files()
+        hashes_file = duplicates.hashes_file_for(self.metadata_file)
+        self._run_in_thread(
+            lambda: duplicates.find_duplicates(image_files, self.thumb_dir, hashes_file),
+            self._duplicates_found
+        )
+    
+    def _duplicates_found(self, future):
+        self.duplicates_btn.config(state=tk.NORMAL, text="⧉ Duplicates")
+        try:
+            groups = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to find duplicates:\n{str(e)}")
+            return
+        
+        # Files may have been moved or removed while hashing
+        groups = [[self.model.find(f.name) for f in group] for group in groups]
+        groups = [[item for item in group if item is not None] for group in groups]
+        groups = [group for group in groups if len(group) > 1]
+        for item in self.model:
+            item.duplicate_group = None
+        for number, group in enumerate(groups):
+            for item in group:
+                item.duplicate_group = number
+        # Only the badges change: the tiles stay bound and in place
+        for tile in self.tile_pool:
+            if tile['item'] is not None:
+                self._set_badge(tile)
+        
+        if not groups:
+            messagebox.showinfo("Duplicates", "No near-duplicate images found.")
+            return
+        
+        extra = sum(len(group) - 1 for group in groups)
+        if messagebox.askyesno(
+            "Duplicates",
+            f"Found {len(groups)} groups of near-duplicates ({extra} extra images), marked orange.\n\n"
+            "Move each group next to its first image?"
+        ):
+            self.collapse_duplicates(groups)
+    
+    def collapse_duplicates(self, groups):
+        """Move the members of each group right after its first (earliest) member"""
+        followers = {}
+        moved = set()
+        for group in groups:
+            group = sorted(group, key=self.model.index)
+            followers[group[0]] = group[1:]
+            moved.update(group[1:])
+        
+        order = []
+        for item in self.model:
+            if item not in moved:
+                order.append(item)
+                order.extend(followers.get(item, ()))
+        
+        self._reorder(order)
+    
+    def auto_arrange(self, mode):
+        """Compute the arrange features off the Tk thread, then reorder the grid by mode"""
+        try:
+            from sorter import arrange
+        except ImportError as e:
+            messagebox.showerror("Error", f"Auto-arrange needs NumPy:\n{e}")
+            return
+        
+        self.arrange_btn.config(state=tk.DISABLED, text="⇅ Arranging...")
+        image_files = self.model.files()
+        # Locations as typed, not as last saved
+        locations = {item.file.name: self.get_location(item) for item in self.model}
+        cache_file = self.thumb_cache.cache_dir / arrange.CACHE_FILE.name
+        self._run_in_thread(
+            lambda: arrange.suggest_order(image_files, self.thumb_dir, locations, mode, cache_file),
+            self._arranged
+        )
+    
+    def _arranged(self, future):
+        self.arrange_btn.config(state=tk.NORMAL, text="⇅ Arrange")
+        try:
+            order = future.result()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to arrange images:\n{str(e)}")
+            return
+        
+        # Images added while arranging stay at the end
+        position = {image_file: idx for idx, image_file in enumerate(order)}
+        self._reorder(sorted(self.model, key=lambda item: position.get(item.file, len(order))))
+    
+    def _show_arrange_menu(self):
+        button = self.arrange_btn
+        self.arrange_menu.tk_popup(button.winfo_rootx(), button.winfo_rooty() + button.winfo_height())
+    
+    def _reorder(self, items):
+        """Show all items in a new order (undoable)"""
+        diff = self.model.rearrange(items)
+        if diff is not None:
+            self.refresh_grid(diff.first, diff.last)
+    
+    def _run_in_thread(self, task, done):
+        """Run task() on a thread of its own, then done(future) on the Tk thread"""
+        # Not the shared pools: they may have thousands of decodes queued
+        executor = ThreadPoolExecutor(max_workers=1)
+        future = executor.submit(task)
+        executor.shutdown(wait=False)
+        self._poll_future(future, done)
+    
+    def _poll_future(self, future, done):
+        if future.done():
+            done(future)
+        else:
+            self.root.after(FUTURE_POLL_MS, self._poll_future, future, done)
+    
+    def apply_changes(self):
+        if self.autosaver is not None:
+            # The plan reads the metadata file, so it has to be current
+            self.autosaver.flush()
+        entries = [
+            (widget.file, widget.thumb_file, self.get_location(widget))
+            for widget in self.model
+        ]
+        # Only files whose number changes are renamed
+        try:
+            plan = core.plan_order(entries, self.image_dir, self.thumb_dir, self.numbering, self.numbering_step,
+                                   self.metadata_file)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Failed to plan the renames:\n{str(e)}")
+            return
+        
+        result = messagebox.askyesno(
+            "Confirm Changes",
+            f"Apply the new order of {len(self.model)} images?\n\n"
+            f"{plan.describe()} (full resolution images and thumbnails)."
+        )
+        
+        if not result:
+            return
+        
+        try:
+            # Renames and the new metadata JS file go through the rename journal
+            core.apply_plan(plan, self.image_dir, self.metadata_file)
+            
+            messagebox.showinfo(
+                "Success",
+                f"Renamed {len(plan)} files and updated metadata!"
+            )
+            
+            self.root.destroy()
+            
+        except Exception as e:
+            messagebox.showerror(
+                "Error",
+                f"Failed to apply changes:\n{str(e)}\n\n"
+                "Renames already done were undone (or are finished on the next start)."
+            )
+
+    def save_metadata(self, metadata_mapping):
+        """Save the updated mapping back to architecture_metadata.js"""
+        try:
+            core.save_metadata(metadata_mapping, self.metadata_file)
+        except Exception as e:
+            print(f"Error saving metadata: {e}")
+
+
+def run(evict_offscreen=False, numbering=planner.DENSE, numbering_step=planner.DEFAULT_STEP, autosave=True,
+        prefetch_rows=PREFETCH_ROWS):
+    root = tk.Tk()
+    
+    # Handle Ctrl+C gracefully
+    def signal_handler(sig, frame):
+        root.quit()
+        root.destroy()
+    
+    signal.signal(signal.SIGINT, signal_handler)
+    
+    # Periodic update to allow signal handling
+    def check_signals():
+        root.after(100, check_signals)
+    
+    app = ImageSorter(root, evict_offscreen=evict_offscreen, numbering=numbering, numbering_step=numbering_step,
+                      autosave=autosave, prefetch_rows=prefetch_rows)
+    check_signals()
+    
+    try:
+        root.mainloop()
+    except KeyboardInterrupt:
+        root.quit()
+        root.destroy()
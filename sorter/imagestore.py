@@ -0,0 +1,163 @@
+"""
+Capped-resolution image masters for the sorter's zoom levels.
+
+The grid never shows an image larger than the 300% zoom tile, so there is no
+reason to keep full-resolution pixels around. Masters are decoded at reduced
+size where the format allows it (JPEG DCT scaling through Image.draft, an
+integer-factor reduce() before resampling otherwise), held in an LRU with a
+byte budget, and can be dropped as soon as their tile scrolls off-screen.
+
+Images are opened through LazyImage, which reads only the header (format,
+size, EXIF orientation) until pixels are asked for. The orientation is
+applied to the reduced decode, so phone photos come out upright without a
+transpose of the full-size image.
+"""
+
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+BASE_SIZE = 200
+MAX_ZOOM = 300
+MASTER_SIZE = BASE_SIZE * MAX_ZOOM // 100
+DEFAULT_BUDGET_BYTES = 512 * 1024 * 1024
+
+
+EXIF_ORIENTATION = 0x0112
+# EXIF orientation -> transpose that shows the image upright (1 needs none)
+ORIENTATION_TRANSPOSE = {
+    2: Image.Transpose.FLIP_LEFT_RIGHT,
+    3: Image.Transpose.ROTATE_180,
+    4: Image.Transpose.FLIP_TOP_BOTTOM,
+    5: Image.Transpose.TRANSPOSE,
+    6: Image.Transpose.ROTATE_270,
+    7: Image.Transpose.TRANSVERSE,
+    8: Image.Transpose.ROTATE_90,
+}
+
+
+class LazyImage:
+    """An image file whose header is read on first use and whose pixels only on decode()"""
+
+    __slots__ = ("path", "_header")
+
+    def __init__(self, path):
+        self.path = path
+        self._header = None
+
+    def __repr__(self):
+        return f"LazyImage({str(self.path)!r})"
+
+    def _read_header(self, img):
+        self._header = (img.format, img.size, img.getexif().get(EXIF_ORIENTATION, 1))
+
+    def header(self):
+        """(format, stored size, EXIF orientation) without decoding any pixels"""
+        if self._header is None:
+            # Opening only parses the header, pixels are read by load()
+            with Image.open(self.path) as img:
+                self._read_header(img)
+        return self._header
+
+    @property
+    def format(self):
+        return self.header()[0]
+
+    @property
+    def orientation(self):
+        return self.header()[2]
+
+    @property
+    def size(self):
+        """Displayed size: orientations 5-8 swap width and height"""
+        _, (width, height), orientation = self.header()
+        return (height, width) if orientation in (5, 6, 7, 8) else (width, height)
+
+    def decode(self, max_size):
+        """Upright pixels no larger than max_size on the longest side"""
+        with Image.open(self.path) as img:
+            self._read_header(img)
+            # A square request keeps enough pixels whichever way it is rotated.
+            # JPEG decodes straight at 1/2, 1/4 or 1/8 scale; no-op for other formats
+            img.draft("RGB", (max_size, max_size))
+            img.load()
+            if max(img.size) > max_size:
+                # reducing_gap does a cheap integer reduce() before LANCZOS
+                img.thumbnail((max_size, max_size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+            else:
+                img = img.copy()
+        # Rotated after reducing, so only the small image is transposed
+        method = ORIENTATION_TRANSPOSE.get(self.orientation)
+        return img if method is None else img.transpose(method)
+
+
+def open_master(path, max_size=MASTER_SIZE):
+    """Decode an image, upright, no larger than max_size on its longest side"""
+    return LazyImage(path).decode(max_size)
+
+
+def image_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+class ImageStore:
+    """Thread-safe LRU of capped masters keyed by source path"""
+
+    def __init__(self, max_size=MASTER_SIZE, budget_bytes=DEFAULT_BUDGET_BYTES, evict_offscreen=False):
+        self.max_size = max_size
+        self.budget_bytes = budget_bytes
+        self.evict_offscreen = evict_offscreen
+
+        self._lock = threading.Lock()
+        self._masters = OrderedDict()
+        self._bytes = 0
+
+    def master(self, image, keep=True):
+        """
+        Return the master for image (a LazyImage or a path), decoding it if
+        it isn't held. With keep=False a freshly decoded master is not added
+        to the store (for one-off background work that shouldn't push out
+        visible tiles).
+        """
+        if not isinstance(image, LazyImage):
+            image = LazyImage(image)
+        key = str(image.path)
+        with self._lock:
+            img = self._masters.get(key)
+            if img is not None:
+                self._masters.move_to_end(key)
+                return img
+
+        # Decode outside the lock so workers run in parallel
+        img = image.decode(self.max_size)
+        if not keep:
+            return img
+
+        with self._lock:
+            if key not in self._masters:
+                self._masters[key] = img
+                self._bytes += image_bytes(img)
+                while self._bytes > self.budget_bytes and len(self._masters) > 1:
+                    _, evicted = self._masters.popitem(last=False)
+                    self._bytes -= image_bytes(evicted)
+            return self._masters[key]
+
+    def evict(self, path):
+        """Drop the master for path (it is re-decoded on next use)"""
+        with self._lock:
+            img = self._masters.pop(str(path), None)
+            if img is not None:
+                self._bytes -= image_bytes(img)
+
+    def offscreen(self, path):
+        """Called when a tile scrolls out of view"""
+        if self.evict_offscreen:
+            self.evict(path)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def __len__(self):
+        return len(self._masters)
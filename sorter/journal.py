@@ -0,0 +1,252 @@
+"""
+Write-ahead journal for the rename plan.
+
+Before any file is touched the full plan (the ordered renames from
+sorter.planner plus the metadata and gallery order to write afterwards) is written to a
+journal next to the images and fsynced. As each rename completes its index
+is appended to the journal (and "-index" as a rollback undoes it), so after
+a crash the run can be finished (rolled forward) or undone (rolled back)
+from exactly where it stopped.
+
+Progress lines aren't fsynced one by one, so a power loss can drop any
+number of them. The journal also records the inode of the file each rename
+moves (a rename keeps it), and recovery steps over every rename whose file
+is already past it, in the direction the run was going. A change of
+direction is written as a fsynced marker line, so the position it starts
+from is always on disk.
+"""
+
+import json
+import os
+from pathlib import Path
+
+JOURNAL_NAME = ".sorter_journal.jsonl"
+
+# Appended once the metadata has been written; the run can't be undone after it
+METADATA_DONE = "metadata"
+# Appended when renames start being undone, and when they go forward again after that
+ROLLBACK = "rollback"
+FORWARD = "forward"
+
+
+def journal_path(image_dir):
+    return Path(image_dir) / JOURNAL_NAME
+
+
+def fsync_dir(directory):
+    # Make the renames themselves durable (no-op where directories can't be opened)
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class RenameJournal:
+    """An ordered list of renames and how many of them have completed"""
+
+    def __init__(self, path, ops, metadata=None, metadata_file=None, order=None, done=0, metadata_done=False,
+                 inodes=None, rolling_back=False):
+        self.path = Path(path)
+        self.base = self.path.parent
+        # (src, dst) as paths relative to the journal's directory
+        self.ops = [tuple(op) for op in ops]
+        # Inode of the file each op moves (None in journals from before they were recorded)
+        self.inodes = inodes
+        self.rolling_back = rolling_back
+        self.metadata = metadata
+        self.metadata_file = metadata_file
+        # Final names in gallery order, for the order manifest
+        self.order = order
+        self.done = done
+        self.metadata_done = metadata_done
+        self._fd = None
+
+    @classmethod
+    def plan(cls, image_dir, ops, metadata=None, metadata_file=None, order=None):
+        """Journal for ops, an ordered list of (src, dst) paths"""
+        path = journal_path(image_dir)
+        base = path.parent
+        # Follow each file through the plan: a parked file's second move has the same inode
+        located = {}
+        inodes = []
+        for src, dst in ops:
+            inode = located.pop(src, None)
+            if inode is None:
+                inode = os.stat(src).st_ino
+            located[dst] = inode
+            inodes.append(inode)
+        ops = [tuple(os.path.relpath(p, base) for p in op) for op in ops]
+        return cls(path, ops, metadata, str(metadata_file) if metadata_file else None, order, inodes=inodes)
+
+    @classmethod
+    def load(cls, image_dir):
+        """The pending journal in image_dir, or None"""
+        path = journal_path(image_dir)
+        try:
+            lines = path.read_text(encoding='utf-8').split("\n")
+        except FileNotFoundError:
+            return None
+        header = json.loads(lines[0])
+        done = 0
+        metadata_done = False
+        rolling_back = False
+        # The last element is '' or a torn line that never got its newline
+        for line in lines[1:-1]:
+            if line == METADATA_DONE:
+                metadata_done = True
+            elif line in (ROLLBACK, FORWARD):
+                rolling_back = line == ROLLBACK
+            elif line.isdigit():
+                done = int(line) + 1
+            elif line[:1] == "-" and line[1:].isdigit():
+                done = int(line[1:])
+        return cls(path, header["ops"], header.get("metadata"), header.get("metadata_file"), header.get("order"),
+                   done, metadata_done, header.get("inodes"), rolling_back)
+
+    def _write_header(self):
+        header = json.dumps({
+            "ops": self.ops,
+            "metadata": self.metadata,
+            "metadata_file": self.metadata_file,
+            "order": self.order,
+            "inodes": self.inodes
+        })
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(header + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        fsync_dir(self.base)
+
+    def _log(self, line, sync=False):
+        # Progress lines aren't fsynced one by one (see _settle); markers are,
+        # which also makes every line before them durable
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND)
+        os.write(self._fd, f"{line}\n".encode())
+        if sync:
+            os.fsync(self._fd)
+
+    def _turn(self, rolling_back):
+        """Record a change of direction before the first rename in the new one"""
+        if rolling_back != self.rolling_back:
+            self.rolling_back = rolling_back
+            self._log(ROLLBACK if rolling_back else FORWARD, sync=True)
+
+    def _close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _paths(self, op):
+        return tuple(self.base / p for p in op)
+
+    def _rename(self, src, dst):
+        if dst.exists():
+            raise FileExistsError(f"Refusing to overwrite {dst}")
+        src.rename(dst)
+
+    def _sync_dirs(self):
+        for directory in {self._paths(op)[1].parent for op in self.ops}:
+            fsync_dir(directory)
+
+    def _holds(self, path, i):
+        """Whether path is where op i's file is"""
+        try:
+            return os.stat(path).st_ino == self.inodes[i]
+        except FileNotFoundError:
+            return False
+
+    def _settle(self):
+        """
+        Account for renames (or undos) that finished but whose lines were lost.
+        Going forward, op i has run once its file is no longer at its source:
+        the plan never moves a file back to a name it had. Undoing, op i has
+        been undone once its file is no longer at its target.
+        """
+        if self.inodes is not None:
+            if self.rolling_back:
+                while self.done > 0 and not self._holds(self._paths(self.ops[self.done - 1])[1], self.done - 1):
+                    self.done -= 1
+            else:
+                while self.done < len(self.ops) and not self._holds(self._paths(self.ops[self.done])[0], self.done):
+                    self.done += 1
+            return
+        # Older journals: only the rename in flight can be missing
+        if self.done < len(self.ops):
+            src, dst = self._paths(self.ops[self.done])
+            if not src.exists() and dst.exists():
+                self.done += 1
+                return
+        if self.done > 0:
+            src, dst = self._paths(self.ops[self.done - 1])
+            if src.exists() and not dst.exists():
+                self.done -= 1
+
+    def run(self):
+        """Execute the plan from the start"""
+        self._write_header()
+        try:
+            self._forward()
+        except BaseException:
+            # Undo whatever part of the plan ran, newest first
+            self._close()
+            if not self.metadata_done:
+                self.rollback()
+            raise
+
+    def _forward(self):
+        for i in range(self.done, len(self.ops)):
+            src, dst = self._paths(self.ops[i])
+            self._rename(src, dst)
+            self.done = i + 1
+            self._log(i)
+        self._sync_dirs()
+
+        if not self.metadata_done:
+            # Imported here: core imports this module
+            from sorter.core import order_manifest_for, save_metadata, save_order_manifest
+            if self.metadata is not None and self.metadata_file:
+                save_metadata(self.metadata, self.metadata_file)
+            if self.order is not None and self.metadata_file:
+                save_order_manifest(self.order, order_manifest_for(self.metadata_file))
+            self.metadata_done = True
+            # Durable, so a lost line can't let a later recovery undo the renames
+            self._log(METADATA_DONE, sync=True)
+        self._close()
+        self.path.unlink()
+
+    def roll_forward(self):
+        """Finish an interrupted run"""
+        self._settle()
+        self._turn(False)
+        self._forward()
+
+    def rollback(self):
+        """Undo an interrupted run (only possible before its metadata was written)"""
+        if self.metadata_done:
+            raise RuntimeError("Rename already finished; it can only be rolled forward")
+        self._settle()
+        self._turn(True)
+        for i in range(self.done - 1, -1, -1):
+            src, dst = self._paths(self.ops[i])
+            self._rename(dst, src)
+            self.done = i
+            self._log(f"-{i}")
+        self._sync_dirs()
+        self._close()
+        self.path.unlink()
+
+    @property
+    def remaining(self):
+        return len(self.ops) - self.done
+
+    def __len__(self):
+        return len(self.ops)
@@ -0,0 +1,204 @@
+"""
+Parser for the subset of JavaScript object literals used by the generated
+data modules in src/data (architecture_metadata.js and friends).
+
+Supported: nested objects and arrays, quoted or bare keys, single and double
+quoted strings with JS escapes, numbers, true/false/null, comments and
+trailing commas.
+
+parse_export turns the module into JSON with a handful of whole-text regex
+passes and hands it to the json module, so the only per-token Python is for
+bare keys and strings with escapes (benchmarks/bench_metadata_parse.py).
+Only if that fails does the token-by-token parser run, to report where the
+problem is.
+"""
+
+import json
+import re
+from itertools import chain
+
+TOKEN_RE = re.compile(r"""
+    (?P<skip>\s+|//[^\n]*|/\*.*?\*/)
+  | (?P<dstring>"(?:[^"\\\n]|\\.)*")
+  | (?P<sstring>'(?:[^'\\\n]|\\.)*')
+  | (?P<number>-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][+-]?\d+)?)
+  | (?P<ident>[A-Za-z_$][\w$]*)
+  | (?P<open>[{\[])
+  | (?P<close>[}\]])
+  | (?P<punct>[:,])
+  | (?P<error>.)
+""", re.VERBOSE | re.DOTALL)
+
+ESCAPE_RE = re.compile(r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|\r\n|.)", re.DOTALL)
+SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "b": "\b", "f": "\f", "v": "\v", "0": "\0"}
+JSON_SAFE_ESCAPE_RE = re.compile(r'\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4})')
+KEYWORDS = {"true", "false", "null"}
+
+# Fast path: strings and comments are split out (in C), the code between them
+# is rewritten with plain regex substitutions. \0 marks where each one was.
+SPLIT_RE = re.compile(r"""("[^"\\\n]*(?:\\.[^"\\\n]*)*"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'|//[^\n]*|/\*.*?\*/)""", re.DOTALL)
+BARE_KEY_RE = re.compile(r"([{,][\s\0]*)([A-Za-z_$][\w$]*)(?=[\s\0]*:)")
+TRAILING_COMMA_RE = re.compile(r",([\s\0]*[}\]])")
+
+# Just enough structure to find where each top-level entry starts and ends
+SPAN_RE = re.compile(
+    r"""("[^"\\\n]*(?:\\.[^"\\\n]*)*"|'[^'\\\n]*(?:\\.[^'\\\n]*)*')|//[^\n]*|/\*.*?\*/|([{\[])|([}\]])|(,)""",
+    re.DOTALL
+)
+LEADING_KEY_RE = re.compile(
+    r"""(?:\s|//[^\n]*|/\*.*?\*/)*("[^"\\\n]*(?:\\.[^"\\\n]*)*"|'[^'\\\n]*(?:\\.[^'\\\n]*)*'|[A-Za-z_$][\w$]*)""",
+    re.DOTALL
+)
+
+
+def _unescape(match):
+    escape = match.group(1)
+    if escape[0] == "u" and len(escape) > 1:
+        return chr(int(escape[2:-1] if escape[1] == "{" else escape[1:], 16))
+    if escape[0] == "x" and len(escape) == 3:
+        return chr(int(escape[1:], 16))
+    if escape in ("\n", "\r\n", "\r", "\u2028", "\u2029"):
+        return ""  # Line continuation
+    return SIMPLE_ESCAPES.get(escape, escape)
+
+
+def js_string(token):
+    """Value of a quoted JS string token"""
+    return ESCAPE_RE.sub(_unescape, token[1:-1])
+
+
+def _error(text, pos, message):
+    line = text.count("\n", 0, pos) + 1
+    column = pos - text.rfind("\n", 0, pos)
+    return ValueError(f"line {line}, column {column}: {message}")
+
+
+def parse_literal(text, pos=0):
+    """
+    Parse the object or array literal starting at text[pos] (after any
+    whitespace). Returns (value, end) where end is the index just past it.
+    Raises ValueError with the line and column of the first bad token.
+    """
+    parts = []
+    # Innermost open brackets; a bare word right after "{" or "," in an object is a key
+    stack = []
+    for match in TOKEN_RE.finditer(text, pos):
+        kind = match.lastgroup
+        token = match.group()
+        if kind == "skip":
+            continue
+        if not stack and kind != "open":
+            raise _error(text, match.start(), "expected an object or array")
+        if kind == "dstring":
+            # Most strings are already valid JSON; only re-encode odd escapes
+            if "\\" in token and "\\" in JSON_SAFE_ESCAPE_RE.sub("", token[1:-1]):
+                token = json.dumps(js_string(token), ensure_ascii=False)
+            parts.append(token)
+        elif kind == "sstring":
+            parts.append(json.dumps(js_string(token), ensure_ascii=False))
+        elif kind == "number":
+            parts.append(token)
+        elif kind == "ident":
+            if stack[-1] == "{" and parts[-1] in ("{", ","):
+                parts.append(f'"{token}"')
+            elif token in KEYWORDS:
+                parts.append(token)
+            else:
+                raise _error(text, match.start(), f"unsupported value {token!r}")
+        elif kind == "open":
+            stack.append(token)
+            parts.append(token)
+        elif kind == "close":
+            if parts[-1] == ",":
+                parts.pop()  # Trailing comma
+            parts.append(token)
+            stack.pop()
+            if not stack:
+                break
+        elif kind == "punct":
+            parts.append(token)
+        else:
+            raise _error(text, match.start(), f"unexpected character {token!r}")
+    else:
+        raise _error(text, len(text), "unterminated literal")
+
+    try:
+        value = json.loads("".join(parts), strict=False)
+    except json.JSONDecodeError as e:
+        # Positions in the JSON text don't map back; report the literal's start
+        raise _error(text, pos, f"invalid literal ({e.msg})") from None
+    return value, match.end()
+
+
+def _quote(match):
+    return f'{match.group(1)}"{match.group(2)}"'
+
+
+def _to_json(text):
+    """JSON for the JS literal at the start of text (anything after it is left as is)"""
+    pieces = SPLIT_RE.split(text)
+    code = BARE_KEY_RE.sub(_quote, "\0".join(pieces[0::2]))
+    code = TRAILING_COMMA_RE.sub(r"\1", code)
+    strings = [
+        "" if token[0] == "/"
+        else token if token[0] == '"' and "\\" not in token
+        else json.dumps(js_string(token), ensure_ascii=False)
+        for token in pieces[1::2]
+    ]
+    strings.append("")
+    return "".join(chain.from_iterable(zip(code.split("\0"), strings)))
+
+
+def _declaration(text, name):
+    match = re.search(rf"(?:export\s+)?(?:const|let|var)\s+{re.escape(name)}\s*=\s*", text)
+    if not match:
+        raise ValueError(f"no declaration of {name}")
+    return match.end()
+
+
+def parse_export(text, name):
+    """Value of `export const <name> = {...}` (or `const`/`let`/`var`) in a module's source"""
+    start = _declaration(text, name)
+    if text[start:start + 1] in ("{", "[") and "\0" not in text:
+        try:
+            value, _ = json.JSONDecoder(strict=False).raw_decode(_to_json(text[start:]))
+            return value
+        except ValueError:
+            pass
+    # Slow path, mostly to say where the problem is
+    value, _ = parse_literal(text, start)
+    return value
+
+
+def entry_sources(text, name):
+    """
+    Source text of each top-level entry of the exported object, as
+    key -> 'key: value' exactly as written (comments inside it included).
+    Lets a writer copy entries it didn't change verbatim.
+    """
+    sources = {}
+    depth = 0
+    entry_start = None
+
+    def finish(end):
+        source = text[entry_start:end].strip()
+        match = LEADING_KEY_RE.match(source)
+        if match:  # Nothing there after a trailing comma
+            key = match.group(1)
+            sources[js_string(key) if key[0] in "\"'" else key] = source
+
+    for match in SPAN_RE.finditer(text, _declaration(text, name)):
+        _, opening, closing, comma = match.groups()
+        if opening:
+            depth += 1
+            if depth == 1:
+                entry_start = match.end()
+        elif closing:
+            depth -= 1
+            if depth == 0:
+                finish(match.start())
+                break
+        elif comma and depth == 1:
+            finish(match.start())
+            entry_start = match.end()
+    return sources
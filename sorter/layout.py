@@ -0,0 +1,122 @@
+"""
+Tile geometry and hit testing for the sorter grid.
+
+The grid is uniform (every tile has the same size and pitch), so the tile
+under a point is found with two integer divisions instead of asking Tk which
+widget is under the pointer.
+"""
+
+GRID_PAD = 8
+
+
+class GridGeometry:
+    """Analytic layout of count tiles in cols columns (canvas coordinates)"""
+
+    def __init__(self, cols, count, tile_width, tile_height, pad=GRID_PAD):
+        self.cols = max(1, cols)
+        self.count = count
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.pad = pad
+        self.pitch_x = tile_width + 2 * pad
+        self.pitch_y = tile_height + 2 * pad
+
+    @property
+    def rows(self):
+        return -(-self.count // self.cols)
+
+    @property
+    def content_size(self):
+        """Width and height of the laid out grid"""
+        return self.pad + self.cols * self.pitch_x, self.rows * self.pitch_y
+
+    def origin(self, index):
+        """Top-left corner of the tile at index"""
+        row, col = divmod(index, self.cols)
+        return self.pad + col * self.pitch_x, self.pad + row * self.pitch_y
+
+    def rect(self, index):
+        x, y = self.origin(index)
+        return x, y, self.tile_width, self.tile_height
+
+    def row_range(self, top, bottom, overscan=0):
+        """Index range [start, end) of the rows intersecting top..bottom"""
+        first_row = max(0, int(top // self.pitch_y) - overscan)
+        last_row = int(bottom // self.pitch_y) + overscan
+        return first_row * self.cols, min(self.count, (last_row + 1) * self.cols)
+
+    def hit(self, x, y):
+        """
+        Tile under a point as (index, insert_before), or None outside the grid.
+        Each tile owns its whole cell including half the gap on either side,
+        and insert_before tells which half of the tile the point is in.
+        """
+        if x < 0 or y < 0:
+            return None
+        col = int(x // self.pitch_x)
+        row = int(y // self.pitch_y)
+        if col >= self.cols:
+            return None
+        index = row * self.cols + col
+        if index >= self.count:
+            return None
+        center_x = self.pad + col * self.pitch_x + self.tile_width / 2
+        return index, x < center_x
+
+    def indicator_x(self, index, insert_before):
+        """X position of the drop indicator for an insert before/after index"""
+        x = self.origin(index)[0]
+        if insert_before:
+            # Centered in the gap to the left (or the left margin)
+            return x - self.pad
+        col = index % self.cols
+        if col == self.cols - 1 or index == self.count - 1:
+            # Last in row: keep it right next to the tile
+            return x + self.tile_width + 2
+        return x + self.tile_width + self.pad
+
+
+class LayoutScheduler:
+    """
+    Coalesces relayout requests into a single idle callback.
+
+    Anything that changes the layout (resize, zoom, a move, files coming and
+    going, scrolling) calls request(); the pass runs once when the event loop
+    is idle, with the union of the index ranges whose rows and columns have to
+    be reassigned. Each pass bumps generation, so state derived from the
+    layout can tell whether it is current, and run() lets a caller that needs
+    current geometry right now (hit testing) do a pending pass early.
+    """
+
+    def __init__(self, schedule_idle, relayout):
+        self._schedule_idle = schedule_idle
+        self._relayout = relayout
+        self.generation = 0
+        self.pending = False
+        self._first = None
+        self._last = None
+
+    def request(self, first=None, last=None):
+        """
+        Schedule a layout pass. first..last (inclusive, last=None for the end)
+        are the items to re-grid; with first=None the pass only re-renders.
+        """
+        if first is not None:
+            if self._first is None:
+                self._first, self._last = first, last
+            else:
+                self._first = min(self._first, first)
+                self._last = None if last is None or self._last is None else max(self._last, last)
+        if not self.pending:
+            self.pending = True
+            self._schedule_idle(self.run)
+
+    def run(self):
+        """Do the pending pass now (the idle callback then finds nothing to do)"""
+        if not self.pending:
+            return
+        self.pending = False
+        first, last = self._first, self._last
+        self._first = self._last = None
+        self.generation += 1
+        self._relayout(first, last)
@@ -0,0 +1,130 @@
+"""
+Per-image layout data for the metadata module: intrinsic size, aspect
+ratio, dominant color and a tiny base64 LQIP placeholder.
+
+The size comes from the full resolution file's header (no decode). The
+pixels for the color and the placeholder come from the 800px thumbnail when
+there is one, so even large galleries build in seconds. Results are cached
+by file identity in the sorter's cache directory so unchanged images are
+skipped on the next run.
+"""
+
+import base64
+import io
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from sorter.cache import CACHE_DIR_NAME
+from sorter.core import REPO_DIR, find_thumbnail, list_images
+
+LQIP_SIZE = 8
+COLOR_SAMPLE = 64
+CACHE_FILE = REPO_DIR / CACHE_DIR_NAME / "manifest.json"
+# Bump when the computed fields change so cached entries are rebuilt
+VERSION = 1
+
+MANIFEST_FIELDS = ("width", "height", "aspect", "color", "lqip")
+
+
+def _identity(path):
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def dominant_color(img):
+    """Most common color of a small RGB image after reducing it to 5 colors"""
+    quantized = img.quantize(colors=5)
+    palette = quantized.getpalette()
+    _, index = max(quantized.getcolors())
+    r, g, b = palette[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def image_info(src, preview=None):
+    """Manifest fields for src, reading pixels from preview if given (runs in a worker)"""
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        width, height = img.size
+        # EXIF orientations 5-8 display rotated by 90 degrees
+        if img.getexif().get(0x0112, 1) in (5, 6, 7, 8):
+            width, height = height, width
+
+    with Image.open(preview or src) as img:
+        img.draft("RGB", (COLOR_SAMPLE, COLOR_SAMPLE))
+        img = ImageOps.exif_transpose(img).convert("RGB")
+        img.thumbnail((COLOR_SAMPLE, COLOR_SAMPLE), Image.Resampling.BOX)
+        color = dominant_color(img)
+
+        img.thumbnail((LQIP_SIZE, LQIP_SIZE), Image.Resampling.BOX)
+        buffer = io.BytesIO()
+        img.save(buffer, "PNG", optimize=True)
+    lqip = "data:image/png;base64," + base64.b64encode(buffer.getvalue()).decode("ascii")
+
+    return {
+        "width": width,
+        "height": height,
+        "aspect": round(width / height, 4),
+        "color": color,
+        "lqip": lqip
+    }
+
+
+def build_manifest(image_dir, thumb_dir, jobs=None, cache_file=CACHE_FILE, progress=None):
+    """Manifest fields for every image in image_dir (filename -> dict). Returns (manifest, failures)."""
+    cache_file = Path(cache_file)
+    try:
+        cache = json.loads(cache_file.read_text(encoding='utf-8'))
+        if cache.get("version") != VERSION:
+            cache = {}
+    except (OSError, ValueError):
+        cache = {}
+    entries = cache.get("entries", {})
+
+    thumb_names = set(os.listdir(thumb_dir)) if Path(thumb_dir).is_dir() else set()
+    manifest = {}
+    keys = {}
+    todo = []
+    for src in list_images(image_dir):
+        preview = find_thumbnail(thumb_dir, src, thumb_names)
+        # The preview is part of the key: a rebuilt thumbnail changes the pixels
+        keys[src.name] = _identity(src) + ("|" + _identity(preview) if preview else "")
+        if keys[src.name] in entries:
+            manifest[src.name] = entries[keys[src.name]]
+        else:
+            todo.append((src, preview))
+
+    failures = []
+    if todo:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = {pool.submit(image_info, src, preview): src.name for src, preview in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                try:
+                    manifest[name] = future.result()
+                except Exception as e:
+                    failures.append((name, e))
+                if progress:
+                    progress(done, len(futures), name)
+
+    # Keep only what the current files need
+    entries = {keys[name]: info for name, info in manifest.items()}
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp = cache_file.with_suffix(".tmp")
+    tmp.write_text(json.dumps({"version": VERSION, "entries": entries}), encoding='utf-8')
+    os.replace(tmp, cache_file)
+    return manifest, failures
+
+
+def merge_into_metadata(metadata_entries, manifest):
+    """Metadata entries with the manifest fields replaced (locations untouched)"""
+    merged = {}
+    for name, fields in metadata_entries.items():
+        kept = {k: v for k, v in fields.items() if k not in MANIFEST_FIELDS}
+        if name in manifest or kept:
+            merged[name] = kept
+    for name, info in manifest.items():
+        merged.setdefault(name, {}).update(info)
+    return merged
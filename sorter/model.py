@@ -0,0 +1,153 @@
+"""
+The sorter's data model, independent of Tk: one ImageItem per image and
+the display order as a permutation array.
+
+Items are numbered (item.id) in load order. Slot i of the grid shows
+items[order[i]], and position[item.id] is the inverse, so "which item is at
+slot i" and "where is this item" are both one array lookup. Reorders are
+PermutationDiffs applied to order, with position updated over the same
+window, and the undo history stores the diffs.
+"""
+
+from array import array
+
+from sorter import reorder
+from sorter.imagestore import LazyImage
+
+
+class ImageItem:
+    """One image: its files, typed location and what the grid has loaded for it"""
+
+    __slots__ = (
+        "id", "file", "thumb_file", "image", "location", "color", "tile", "photo", "photo_size",
+        "photo_final", "decode_size", "ready", "duplicate_group"
+    )
+
+    def __init__(self, id, file, thumb_file=None, location="", color="white"):
+        self.id = id
+        self.file = file
+        self.thumb_file = thumb_file
+        # Load the thumbnail if there is one, else the full resolution file;
+        # nothing is read from it until its tile comes near the viewport
+        self.image = LazyImage(thumb_file or file)
+        self.location = location
+        # Dominant color from the manifest: shown until the photo is in
+        self.color = color
+        self.tile = None
+        self.photo = None
+        self.photo_size = None
+        self.photo_final = False
+        # Size of the last decode queued for it, None when nothing is pending
+        self.decode_size = None
+        # Drag is enabled per tile once its image is in
+        self.ready = False
+        self.duplicate_group = None
+
+    def __repr__(self):
+        return f"ImageItem({self.id}, {self.file.name!r})"
+
+    @property
+    def img_path(self):
+        return self.image.path
+
+
+class GalleryModel:
+    """Images and their order; indexing and iterating go by display position"""
+
+    def __init__(self):
+        self.items = []
+        self.order = array('I')
+        self.position = array('I')
+        self.history = reorder.History()
+        self._by_name = {}
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        return self.items[self.order[index]]
+
+    def __contains__(self, item):
+        return item is not None and item.id < len(self.items) and self.items[item.id] is item
+
+    def __iter__(self):
+        items = self.items
+        return (items[item_id] for item_id in self.order)
+
+    def files(self):
+        """Image paths in display order"""
+        return [item.file for item in self]
+
+    def find(self, name):
+        """Item for an image file name, or None"""
+        return self._by_name.get(name)
+
+    def index(self, item):
+        """Display position of item"""
+        return self.position[item.id]
+
+    def add(self, file, thumb_file=None, location="", color="white"):
+        """New item shown after the others"""
+        item = ImageItem(len(self.items), file, thumb_file, location, color)
+        self.items.append(item)
+        self.order.append(item.id)
+        self.position.append(len(self.order) - 1)
+        self._by_name[file.name] = item
+        return item
+
+    def retain(self, keep):
+        """
+        Drop the items keep(item) rejects; the rest keep their relative order.
+        Returns the first display position that changed, or None. Items are
+        renumbered, and the undo history no longer fits, so it is cleared.
+        """
+        kept = [item for item in self if keep(item)]
+        if len(kept) == len(self.order):
+            return None
+        first = next((idx for idx, item in enumerate(kept) if item is not self[idx]), len(kept))
+        self.items = kept
+        for item_id, item in enumerate(kept):
+            item.id = item_id
+        self.order = array('I', range(len(kept)))
+        self.position = array('I', range(len(kept)))
+        self._by_name = {item.file.name: item for item in kept}
+        self.history.clear()
+        return first
+
+    def _update_positions(self, diff):
+        order, position = self.order, self.position
+        for slot in range(diff.first, diff.last + 1):
+            position[order[slot]] = slot
+
+    def apply(self, diff):
+        """Apply a reorder and record it for undo"""
+        diff.apply(self.order)
+        self._update_positions(diff)
+        self.history.record(diff)
+
+    def move(self, selected, position):
+        """Gather the items at the ascending positions selected at position; the diff, or None if nothing moved"""
+        diff = reorder.block_move(selected, position)
+        if diff is not None:
+            self.apply(diff)
+        return diff
+
+    def rearrange(self, items):
+        """Show items (all of them, in a new order); the diff, or None if the order is unchanged"""
+        diff = reorder.PermutationDiff.between(self.order, array('I', (item.id for item in items)))
+        if diff is not None:
+            self.apply(diff)
+        return diff
+
+    def undo(self):
+        """Revert the last reorder; its diff, or None if there is nothing to undo"""
+        diff = self.history.undo(self.order)
+        if diff is not None:
+            self._update_positions(diff)
+        return diff
+
+    def redo(self):
+        diff = self.history.redo(self.order)
+        if diff is not None:
+            self._update_positions(diff)
+        return diff
@@ -0,0 +1,212 @@
+"""
+Rename planning: which number each image gets and the shortest sequence of
+renames that gets the directory there.
+
+Numbering modes:
+
+    dense    01, 02, 03, ... (every image after a moved one shifts)
+    sparse   keep as many current numbers as possible and slot moved images
+             into the gaps (010, 020, ... leaves room for 9 inserts each)
+    respace  renumber everything with gaps of `step`, once, to make later
+             sparse moves cheap
+
+Renames are ordered so a file only moves once its target name is free.
+Chains of renames need no temporary names at all; each cycle (a -> b -> a)
+uses a single temporary slot.
+"""
+
+import re
+from bisect import bisect_right
+from pathlib import Path
+
+DENSE = "dense"
+SPARSE = "sparse"
+RESPACE = "respace"
+NUMBERING_MODES = (DENSE, SPARSE, RESPACE)
+
+DEFAULT_STEP = 10
+MIN_WIDTH = 2
+# Up to 5 digits (galleries of 10k+ images) so date-style names (20240312_...)
+# aren't read as a prefix. Plans never write a wider number.
+MAX_WIDTH = 5
+
+PREFIX_RE = re.compile(rf'^(\d{{{MIN_WIDTH},{MAX_WIDTH}}})_(.+)$')
+
+
+def split_prefix(name):
+    """(number, width, base) for 'NN_base', or (None, 0, name) if unprefixed"""
+    match = PREFIX_RE.match(name)
+    if not match:
+        return None, 0, name
+    digits, base = match.groups()
+    return int(digits), len(digits), base
+
+
+def sort_key(name):
+    """Numeric-aware order of names: by prefix number (99_ before 100_), unprefixed names last"""
+    number, _, base = split_prefix(name)
+    return (number is None, number or 0, base)
+
+
+def _keepers(numbers):
+    """
+    Indices of the largest set of images that can keep their number.
+    Image i keeps number v only if the images between two keepers fit in the
+    gap, i.e. v_j - v_i > j - i, and the ones before the first keeper fit
+    above zero. Both reduce to a non-decreasing v - i, so this is a longest
+    non-decreasing subsequence (patience sort, O(n log n)).
+    """
+    tails = []        # smallest tail key of a subsequence of each length
+    tail_index = []   # index into numbers of that tail
+    parent = {}
+    for i, v in enumerate(numbers):
+        if v is None or v - i < 1:
+            continue
+        key = v - i
+        pos = bisect_right(tails, key)
+        if pos == len(tails):
+            tails.append(key)
+            tail_index.append(i)
+        else:
+            tails[pos] = key
+            tail_index[pos] = i
+        parent[i] = tail_index[pos - 1] if pos else None
+
+    keep = []
+    i = tail_index[-1] if tail_index else None
+    while i is not None:
+        keep.append(i)
+        i = parent[i]
+    return keep[::-1]
+
+
+def _spread(lo, hi, count):
+    """count distinct integers evenly spaced strictly between lo and hi"""
+    return [lo + (hi - lo) * (j + 1) // (count + 1) for j in range(count)]
+
+
+def assign_numbers(names, numbering=DENSE, step=DEFAULT_STEP):
+    """
+    New prefix number for each name (names are in their new order).
+    Returns (numbers, width). Raises ValueError if the numbers need more
+    than MAX_WIDTH digits or step is below 1.
+    """
+    if step < 1:
+        raise ValueError(f"The numbering step must be at least 1, got {step}")
+    count = len(names)
+    if numbering == DENSE:
+        numbers = list(range(1, count + 1))
+    elif numbering == RESPACE:
+        numbers = [step * (i + 1) for i in range(count)]
+    elif numbering == SPARSE:
+        parsed = [split_prefix(name) for name in names]
+        width = max([MIN_WIDTH] + [w for _, w, _ in parsed])
+        # Only names already at the common width can be kept as they are
+        current = [n if w == width else None for n, w, _ in parsed]
+        numbers = [None] * count
+        keep = _keepers(current)
+        for i in keep:
+            numbers[i] = current[i]
+
+        # Fill the gaps between kept numbers
+        prev_index, prev_number = -1, 0
+        for i in keep + [count]:
+            gap = i - prev_index - 1
+            if gap:
+                if i < count:
+                    filled = _spread(prev_number, numbers[i], gap)
+                else:
+                    filled = [prev_number + step * (j + 1) for j in range(gap)]
+                numbers[prev_index + 1:i] = filled
+            if i < count:
+                prev_index, prev_number = i, numbers[i]
+    else:
+        raise ValueError(f"Unknown numbering {numbering!r} (expected one of {', '.join(NUMBERING_MODES)})")
+
+    width = max(MIN_WIDTH, len(str(max(numbers, default=0))))
+    if numbering == SPARSE:
+        width = max(width, max([MIN_WIDTH] + [split_prefix(name)[1] for name in names]))
+    if width > MAX_WIDTH:
+        # A wider prefix wouldn't be recognised and the next plan would add another
+        raise ValueError(
+            f"Numbering {count} images ({numbering}, step {step}) needs {width}-digit prefixes, "
+            f"at most {MAX_WIDTH} are supported: use a smaller step or dense numbering"
+        )
+    return numbers, width
+
+
+def numbered_names(names, numbering=DENSE, step=DEFAULT_STEP):
+    """Final file names for names (in their new order)"""
+    numbers, width = assign_numbers(names, numbering, step)
+    final_names = []
+    for number, name in zip(numbers, names):
+        base = split_prefix(name)[2]
+        final_name = f"{number:0{width}d}_{base}"
+        # The next plan has to read back exactly this number and base
+        if split_prefix(final_name) != (number, width, base):
+            raise ValueError(f"Planned name {final_name!r} for {name!r} would not be read back as numbered")
+        final_names.append(final_name)
+    return final_names
+
+
+def order_moves(renames):
+    """
+    Turn (src, dst) pairs into an executable list of renames where no step
+    overwrites a file that hasn't moved yet. Pairs with src == dst are dropped.
+    """
+    dst_of = {Path(src): Path(dst) for src, dst in renames if Path(src) != Path(dst)}
+    # The move into a path has to wait until the file at that path has left
+    waiting = {dst: src for src, dst in dst_of.items() if dst in dst_of}
+    ready = [src for src, dst in dst_of.items() if dst not in dst_of]
+    pending = set(dst_of)
+    ops = []
+
+    def move(src, dst):
+        ops.append((src, dst))
+        pending.discard(src)
+        follower = waiting.pop(src, None)
+        if follower is not None:
+            ready.append(follower)
+
+    while pending:
+        while ready:
+            src = ready.pop()
+            move(src, dst_of[src])
+        if pending:
+            # Everything left is a cycle: park one file to break it
+            src = min(pending)
+            tmp = src.with_name(f"_temp_{src.name}")
+            n = 1
+            while tmp.exists() or tmp in dst_of:
+                tmp = src.with_name(f"_temp{n}_{src.name}")
+                n += 1
+            ops.append((src, tmp))
+            pending.discard(src)
+            # The parked file moves on once its target has left
+            dst_of[tmp] = dst_of.pop(src)
+            waiting[dst_of[tmp]] = tmp
+            ready.append(waiting.pop(src))
+    return ops
+
+
+class RenamePlan:
+    """Ordered renames plus the metadata that goes with the new names"""
+
+    def __init__(self, ops, metadata, final_names):
+        self.ops = ops
+        self.metadata = metadata
+        self.final_names = final_names
+
+    @property
+    def cycles(self):
+        return sum(1 for _, dst in self.ops if dst.name.startswith("_temp"))
+
+    def describe(self):
+        if not self.ops:
+            return "Nothing to rename"
+        cycles = self.cycles
+        extra = f" ({cycles} through a temporary name)" if cycles else ""
+        return f"{len(self.ops)} renames{extra}"
+
+    def __len__(self):
+        return len(self.ops)
@@ -0,0 +1,173 @@
+"""
+Opt-in timing of startup phases, per-image work and UI event handlers.
+
+    python image_sorter.py --profile startup.json
+    python image_sorter.py --profile startup.trace.json --profile-format trace
+
+Code is instrumented with `span()` blocks and the `timed()` decorator; both
+cost one attribute check while profiling is off. The summary format has
+count / total / p50 / p90 / p99 / max per span name plus machine details,
+so two runs can be diffed. The trace format is Chrome's trace event JSON
+(load it in chrome://tracing or https://ui.perfetto.dev) with the summary
+under "otherData".
+"""
+
+import functools
+import json
+import math
+import os
+import platform
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+FORMATS = ("summary", "trace")
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Profiler:
+    """Collects complete ("X") and instant ("i") events from any thread"""
+
+    def __init__(self):
+        self.enabled = False
+        self.events = []
+        self.info = {}
+        self._thread_names = {}
+        self._origin = time.perf_counter()
+
+    def enable(self):
+        self.enabled = True
+        self.events = []
+        self._origin = time.perf_counter()
+
+    def now(self):
+        """Microseconds since profiling started"""
+        return (time.perf_counter() - self._origin) * 1e6
+
+    def add(self, name, cat, start, duration, args=None):
+        """Record a finished span (start and duration in microseconds)"""
+        # list.append is atomic, worker threads can record without a lock
+        thread = threading.get_ident()
+        if thread not in self._thread_names:
+            self._thread_names[thread] = threading.current_thread().name
+        self.events.append((name, cat, start, duration, thread, args))
+
+    def mark(self, name, cat="mark", **args):
+        """Record an instant event (e.g. "first tiles visible")"""
+        if self.enabled:
+            self.add(name, cat, self.now(), None, args or None)
+
+    @contextmanager
+    def _span(self, name, cat, args):
+        start = self.now()
+        try:
+            yield
+        finally:
+            self.add(name, cat, start, self.now() - start, args)
+
+    def span(self, name, cat="phase", **args):
+        """Context manager timing a block"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(name, cat, args or None)
+
+    def summary(self):
+        """Per-name statistics in milliseconds, plus the marks and run details"""
+        durations = {}
+        marks = {}
+        for name, cat, start, duration, _, _ in self.events:
+            if duration is None:
+                marks.setdefault(name, round(start / 1000, 3))
+            else:
+                durations.setdefault((cat, name), []).append(duration / 1000)
+
+        spans = {}
+        for (cat, name), values in sorted(durations.items()):
+            values.sort()
+            spans[name] = {
+                "cat": cat,
+                "count": len(values),
+                "total_ms": round(sum(values), 3),
+                "p50_ms": round(percentile(values, 0.50), 3),
+                "p90_ms": round(percentile(values, 0.90), 3),
+                "p99_ms": round(percentile(values, 0.99), 3),
+                "max_ms": round(values[-1], 3)
+            }
+        return {"machine": machine_info(), "info": self.info, "marks_ms": marks, "spans": spans}
+
+    def trace(self):
+        """Chrome trace event JSON object"""
+        pid = os.getpid()
+        thread_ids = {}
+        events = []
+        for name, cat, start, duration, thread, args in self.events:
+            tid = thread_ids.setdefault(thread, len(thread_ids))
+            event = {"name": name, "cat": cat, "ts": round(start, 1), "pid": pid, "tid": tid}
+            if duration is None:
+                event.update(ph="i", s="t")
+            else:
+                event.update(ph="X", dur=round(duration, 1))
+            if args:
+                event["args"] = {k: str(v) if isinstance(v, os.PathLike) else v for k, v in args.items()}
+            events.append(event)
+        for thread, tid in thread_ids.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                           "args": {"name": self._thread_names.get(thread, str(thread))}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.summary()}
+
+    def write(self, path, fmt="summary"):
+        data = self.trace() if fmt == "trace" else self.summary()
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1 if fmt == "summary" else None)
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+# The one profiler of the process; disabled unless --profile is given
+PROFILER = Profiler()
+span = PROFILER.span
+mark = PROFILER.mark
+
+
+def timed(name, cat="event"):
+    """Decorator recording every call of a function as a span"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return fn(*args, **kwargs)
+            start = PROFILER.now()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                PROFILER.add(name, cat, start, PROFILER.now() - start)
+        return wrapper
+    return decorate
+
+
+def machine_info():
+    info = {
+        "platform": platform.platform(),
+        "python": sys.version.split()[0],
+        "cpus": os.cpu_count()
+    }
+    pil = sys.modules.get("PIL")
+    if pil is not None:
+        info["pillow"] = getattr(pil, "__version__", None)
+    return info
@@ -0,0 +1,128 @@
+"""
+Block moves of a selection and the undo/redo history of the sorter grid.
+
+Every reorder is a permutation of the items, recorded as a PermutationDiff:
+the first index of the window that changed and, for each slot in it, the
+offset of the item that moved there. Items outside the window keep their
+index, so moving 30 images in a 10k gallery stores the span between the
+block and the drop point rather than a copy of the order, and applying or
+undoing it only touches that span (one splice per list, one re-grid range).
+"""
+
+from array import array
+from collections import deque
+
+# Reorders that can be undone
+HISTORY_LIMIT = 200
+
+
+class PermutationDiff:
+    """Items first..last rearranged: slot i of the window now holds old slot sources[i]"""
+
+    def __init__(self, first, sources):
+        self.first = first
+        self.sources = array('I', sources)
+
+    @property
+    def last(self):
+        return self.first + len(self.sources) - 1
+
+    @classmethod
+    def between(cls, before, after):
+        """Diff turning before into after (the same distinct values reordered), None if equal"""
+        first = 0
+        end = len(before)
+        while first < end and before[first] == after[first]:
+            first += 1
+        while end > first and before[end - 1] == after[end - 1]:
+            end -= 1
+        if first == end:
+            return None
+        slots = {value: slot for slot, value in enumerate(before[first:end])}
+        return cls(first, [slots[value] for value in after[first:end]])
+
+    def _splice(self, items, values):
+        if isinstance(items, array):
+            values = array(items.typecode, values)
+        items[self.first:self.last + 1] = values
+
+    def apply(self, items):
+        """Reorder items (a list or an array) in place"""
+        window = items[self.first:self.last + 1]
+        self._splice(items, [window[source] for source in self.sources])
+
+    def revert(self, items):
+        window = items[self.first:self.last + 1]
+        restored = [None] * len(window)
+        for slot, source in enumerate(self.sources):
+            restored[source] = window[slot]
+        self._splice(items, restored)
+
+
+def drop_position(selected, target):
+    """
+    Where a block lands when dropped before the item at target (len(items)
+    for the end): the index of its first item once it has moved
+    """
+    return target - sum(1 for index in selected if index < target)
+
+
+def block_move(selected, position):
+    """
+    Diff gathering the items at the sorted indices selected, in their current
+    order, at index position (see drop_position). None if nothing moves.
+    """
+    if not selected:
+        return None
+    first = min(selected[0], position)
+    last = max(selected[-1], position + len(selected) - 1)
+    chosen = set(selected)
+    rest = [index for index in range(first, last + 1) if index not in chosen]
+    split = position - first
+    order = rest[:split] + list(selected) + rest[split:]
+    # Items already in place at either end are left out of the window
+    start, end = 0, len(order)
+    while start < end and order[start] == first + start:
+        start += 1
+    while end > start and order[end - 1] == first + end - 1:
+        end -= 1
+    if start == end:
+        return None
+    return PermutationDiff(first + start, [index - first - start for index in order[start:end]])
+
+
+class History:
+    """Undo and redo stacks of PermutationDiffs"""
+
+    def __init__(self, limit=HISTORY_LIMIT):
+        self._undo = deque(maxlen=limit)
+        self._redo = []
+
+    def record(self, diff):
+        """A new reorder was applied; it can be undone and nothing can be redone"""
+        self._undo.append(diff)
+        self._redo.clear()
+
+    def clear(self):
+        self._undo.clear()
+        self._redo.clear()
+
+    def undo(self, *sequences):
+        """Revert the last reorder on each of sequences; returns its diff, or None if there is none"""
+        if not self._undo:
+            return None
+        diff = self._undo.pop()
+        for items in sequences:
+            diff.revert(items)
+        self._redo.append(diff)
+        return diff
+
+    def redo(self, *sequences):
+        """Apply the last undone reorder again on each of sequences; returns its diff or None"""
+        if not self._redo:
+            return None
+        diff = self._redo.pop()
+        for items in sequences:
+            diff.apply(items)
+        self._undo.append(diff)
+        return diff
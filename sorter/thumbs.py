@@ -0,0 +1,123 @@
+"""
+Build the gallery's thumbs/ directory from the full resolution images.
+
+The site only shows images that have a thumbnail with exactly the same name,
+so thumbs/ has to track every add, rename and edit. Thumbnails are rebuilt
+only when missing or older than their source (a make-style mtime check from
+one directory scan per folder), on a process pool, with JPEG draft decoding
+so large sources are decoded at a fraction of their size.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from sorter.core import IMAGE_EXTENSIONS
+
+THUMB_WIDTH = 800
+THUMB_QUALITY = 80
+
+
+def _scan(directory):
+    """name -> mtime_ns for the image files directly inside directory"""
+    found = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in IMAGE_EXTENSIONS:
+                    found[entry.name] = entry.stat().st_mtime_ns
+    except FileNotFoundError:
+        pass
+    return found
+
+
+class ThumbStatus:
+    """Result of comparing the image directory with its thumbs/"""
+
+    def __init__(self, missing, stale, orphaned, ok_names):
+        self.missing = missing
+        self.stale = stale
+        self.orphaned = orphaned
+        self.ok_names = ok_names
+
+    @property
+    def ok(self):
+        return len(self.ok_names)
+
+    @property
+    def clean(self):
+        return not (self.missing or self.stale or self.orphaned)
+
+    def summary(self):
+        return (f"{self.ok} up to date, {len(self.missing)} missing, "
+                f"{len(self.stale)} stale, {len(self.orphaned)} orphaned")
+
+
+def check(image_dir, thumb_dir):
+    """Compare sources and thumbnails by name and mtime (no image is opened)"""
+    sources = _scan(image_dir)
+    thumbs = _scan(thumb_dir)
+    missing = sorted(name for name in sources if name not in thumbs)
+    stale = sorted(name for name, mtime in sources.items() if name in thumbs and thumbs[name] < mtime)
+    orphaned = sorted(name for name in thumbs if name not in sources)
+    ok_names = sorted(name for name, mtime in sources.items() if name in thumbs and thumbs[name] >= mtime)
+    return ThumbStatus(missing, stale, orphaned, ok_names)
+
+
+def make_thumbnail(src, dst, width=THUMB_WIDTH, quality=THUMB_QUALITY):
+    """Write a width-px wide thumbnail of src to dst (runs in a worker process)"""
+    # Imported here so `--check` never loads Pillow
+    from PIL import Image, ImageOps
+
+    with Image.open(src) as img:
+        # JPEG decodes straight at 1/2, 1/4 or 1/8 scale; no-op for other formats.
+        # A square request keeps enough pixels whichever way EXIF rotates it.
+        img.draft("RGB", (width, width))
+        img = ImageOps.exif_transpose(img)
+        if img.mode not in ("RGB", "RGBA"):
+            img = img.convert("RGB")
+        if img.width > width:
+            height = max(1, round(img.height * width / img.width))
+            img = img.resize((width, height), Image.Resampling.LANCZOS, reducing_gap=3.0)
+
+        dst = Path(dst)
+        fmt = Image.registered_extensions()[dst.suffix.lower()]
+        if fmt == "JPEG" and img.mode == "RGBA":
+            img = img.convert("RGB")
+        tmp = dst.with_name(f".{dst.name}.tmp")
+        img.save(tmp, format=fmt, quality=quality)
+    os.replace(tmp, dst)
+    return dst.name
+
+
+def build(image_dir, thumb_dir, names, width=THUMB_WIDTH, quality=THUMB_QUALITY, jobs=None, progress=None):
+    """Generate thumbnails for names on a process pool. Returns the failures as (name, error)."""
+    thumb_dir = Path(thumb_dir)
+    thumb_dir.mkdir(parents=True, exist_ok=True)
+    failures = []
+    if not names:
+        return failures
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(make_thumbnail, Path(image_dir) / name, thumb_dir / name, width, quality): name
+            for name in names
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            name = futures[future]
+            try:
+                future.result()
+            except Exception as e:
+                failures.append((name, e))
+            if progress:
+                progress(done, len(futures), name)
+    return failures
+
+
+def prune(thumb_dir, names):
+    """Delete orphaned thumbnails"""
+    for name in names:
+        try:
+            (Path(thumb_dir) / name).unlink()
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,204 @@
+"""
+Watch the image directories for files being added, removed or replaced.
+
+On Linux this uses inotify (through ctypes, no extra dependency); elsewhere,
+or if inotify can't be set up, it falls back to polling directory listings.
+Either way, events are coalesced: the callback runs once a burst (an export
+writing dozens of files, a tool rewriting one file in several steps) has
+been quiet for `debounce` seconds, with the set of names that changed per
+directory. It runs on the watcher thread, so GUIs should hand it over to
+their own thread.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+from sorter.core import IMAGE_EXTENSIONS
+
+DEBOUNCE = 0.3
+POLL_INTERVAL = 1.0
+# A steady stream of events is still reported at least this often
+MAX_DELAY = 2.0
+
+# inotify(7)
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_image_name(name):
+    # Dot files include the .name.tmp files of atomic writes
+    return not name.startswith(".") and os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS
+
+
+def _snapshot(directory):
+    """name -> (inode, size, mtime_ns) for the images in directory"""
+    found = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if is_image_name(entry.name) and entry.is_file():
+                    stat = entry.stat()
+                    found[entry.name] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    except FileNotFoundError:
+        pass
+    return found
+
+
+def _add(changes, directory, names):
+    if directory in changes and changes[directory] is None:
+        return  # Already marked for a full rescan
+    changes.setdefault(directory, set()).update(names)
+
+
+class _Inotify:
+    """Minimal inotify binding: one fd, a watch per directory"""
+
+    def __init__(self, directories):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories = {}
+        for directory in directories:
+            wd = libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+            if wd < 0:
+                os.close(self.fd)
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self.directories[wd] = directory
+
+    def read(self, changes):
+        """Add the names in the pending events to changes. Returns True if any were relevant."""
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        found = False
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & IN_Q_OVERFLOW:
+                # Events were dropped: every directory has to be rescanned
+                for directory in self.directories.values():
+                    changes[directory] = None
+                found = True
+            elif wd in self.directories and is_image_name(name):
+                _add(changes, self.directories[wd], {name})
+                found = True
+        return found
+
+    def close(self):
+        os.close(self.fd)
+
+
+class DirectoryWatcher:
+    """
+    Calls callback({directory: {names}}) after image files in directories
+    change. A value of None for a directory means "rescan it" (events were
+    lost). Directories that don't exist yet are polled.
+    """
+
+    def __init__(self, directories, callback, debounce=DEBOUNCE, poll_interval=POLL_INTERVAL, use_inotify=True):
+        self.directories = [Path(d) for d in directories]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify([d for d in self.directories if d.is_dir()])
+            except (OSError, AttributeError) as e:
+                print(f"Warning: inotify unavailable ({e}), polling for changes instead")
+        self.backend = "inotify" if self._inotify else "polling"
+        watched = set(self._inotify.directories.values()) if self._inotify else set()
+        self._polled = [d for d in self.directories if d not in watched]
+        self._snapshots = {d: _snapshot(d) for d in self._polled}
+        # A polled change is only settled once the next listing shows nothing new
+        self._quiet = max(debounce, poll_interval * 1.5) if self._polled else debounce
+        # Written to by stop() to wake the thread out of select()
+        self._wake_r, self._wake_w = os.pipe() if self._inotify else (None, None)
+        self._thread = threading.Thread(target=self._run, name="directory-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._inotify:
+            os.write(self._wake_w, b"x")
+        if self._thread.is_alive():
+            self._thread.join()
+        if self._inotify:
+            self._inotify.close()
+            self._inotify = None
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    def _poll(self, changes):
+        """Diff the polled directories against their last listing. True if anything changed."""
+        found = False
+        for directory in self._polled:
+            current = _snapshot(directory)
+            previous = self._snapshots[directory]
+            names = {name for name in current.keys() | previous.keys() if current.get(name) != previous.get(name)}
+            if names:
+                _add(changes, directory, names)
+                found = True
+            self._snapshots[directory] = current
+        return found
+
+    def _wait(self, timeout, changes):
+        """Sleep until timeout, stop() or an inotify event. True if events were added to changes."""
+        if not self._inotify:
+            self._stop.wait(timeout)
+            return False
+        readable, _, _ = select.select([self._wake_r, self._inotify.fd], [], [], timeout)
+        return self._inotify.fd in readable and self._inotify.read(changes)
+
+    def _run(self):
+        changes = {}
+        first_change = last_change = None
+        next_poll = time.monotonic() + self.poll_interval
+        while not self._stop.is_set():
+            now = time.monotonic()
+            if changes and (now - last_change >= self._quiet or now - first_change >= MAX_DELAY):
+                batch, changes = changes, {}
+                first_change = last_change = None
+                try:
+                    self.callback(batch)
+                except Exception as e:
+                    print(f"Error handling directory changes: {e}")
+                continue
+
+            deadline = next_poll if self._polled else now + 60
+            if changes:
+                deadline = min(deadline, last_change + self._quiet, first_change + MAX_DELAY)
+            found = self._wait(max(0.0, deadline - now), changes)
+            if self._polled and time.monotonic() >= next_poll:
+                found = self._poll(changes) or found
+                next_poll = time.monotonic() + self.poll_interval
+
+            if found:
+                last_change = time.monotonic()
+                if first_change is None:
+                    first_change = last_change
@@ -0,0 +1,80 @@
+/**
+ * Gallery order of the architecture images, written by the image sorter.
+ * Key: Filename (as it appears in public/images/architecture/)
+ * Value: position in the gallery (0 = first)
+ */
+export const architectureOrder = {
+    "01_PXL_20250822_172152402~2.webp": 0,
+    "02_PXL_20250821_191140603~2.webp": 1,
+    "03_PXL_20250824_090714275~2.webp": 2,
+    "04_PXL_20240312_190659652~2.webp": 3,
+    "05_PXL_20221217_204749031~2.webp": 4,
+    "06_PXL_20240810_065634673.webp": 5,
+    "07_PXL_20250706_172128615~2.webp": 6,
+    "08_PXL_20250822_092642867~2.webp": 7,
+    "09_PXL_20250830_113922121.webp": 8,
+    "10_PXL_20250706_182200066.webp": 9,
+    "11_PXL_20251206_192935305.webp": 10,
+    "12_PXL_20250824_111430018.webp": 11,
+    "13_PXL_20250830_083930550~2.webp": 12,
+    "14_PXL_20250706_171047823.webp": 13,
+    "15_PXL_20250824_102438799~2.webp": 14,
+    "16_PXL_20250822_163225543.webp": 15,
+    "17_PXL_20250706_173222362~2.webp": 16,
+    "18_PXL_20250706_172813182.webp": 17,
+    "19_Image~3.webp": 18,
+    "20_PXL_20250706_172153148~2.webp": 19,
+    "21_PXL_20250706_170611324~2.webp": 20,
+    "22_PXL_20250706_162337271.webp": 21,
+    "23_PXL_20250706_171257546.webp": 22,
+    "24_PXL_20250705_213854943~2.webp": 23,
+    "25_Image~2.webp": 24,
+    "26_PXL_20250705_234009670~2.webp": 25,
+    "27_PXL_20250704_204053335.MP~2.webp": 26,
+    "28_PXL_20250830_183239712~2.webp": 27,
+    "29_PXL_20250706_000248312.webp": 28,
+    "30_PXL_20240311_202048690~3.webp": 29,
+    "31_PXL_20250824_183325819.webp": 30,
+    "32_PXL_20250705_233147330~2.webp": 31,
+    "33_PXL_20240311_202043373.webp": 32,
+    "34_PXL_20230224_221616739~2.webp": 33,
+    "35_PXL_20240811_192512755.webp": 34,
+    "36_PXL_20250705_235947312.webp": 35,
+    "37_PXL_20230224_231524647.webp": 36,
+    "38_PXL_20230224_231548104~2.webp": 37,
+    "39_PXL_20230820_190817904.webp": 38,
+    "40_PXL_20231209_234911689-01.webp": 39,
+    "41_PXL_20250706_173231367~2.webp": 40,
+    "42_PXL_20250705_232335490~2.webp": 41,
+    "43_PXL_20250705_213231237~2.webp": 42,
+    "44_PXL_20240812_094141298~2.webp": 43,
+    "45_PXL_20251206_195507168.webp": 44,
+    "46_PXL_20240811_154807741~3.webp": 45,
+    "47_PXL_20240808_124013650.webp": 46,
+    "48_PXL_20240808_124655591~2.webp": 47,
+    "49_PXL_20240810_091337394.webp": 48,
+    "50_PXL_20240810_094532001~2.webp": 49,
+    "51_PXL_20240809_092223441~3.webp": 50,
+    "52_PXL_20240811_141332088.webp": 51,
+    "53_PXL_20250215_174428711~2.webp": 52,
+    "54_PXL_20240807_184452907~2.webp": 53,
+    "55_PXL_20250821_171138451~2.webp": 54,
+    "56_PXL_20230615_171002859~2.webp": 55,
+    "57_PXL_20240810_092813117~2.webp": 56,
+    "58_PXL_20250822_091955296~2.webp": 57,
+    "59_PXL_20250823_142022828~2.webp": 58,
+    "60_PXL_20230615_132742527~3.webp": 59,
+    "61_PXL_20240808_121018498~2.webp": 60,
+    "62_PXL_20250826_134846251.webp": 61,
+    "63_PXL_20250826_134746038~2.webp": 62,
+    "64_PXL_20250829_144924912~2.webp": 63,
+    "65_PXL_20250829_120156307~2.webp": 64,
+    "66_PXL_20250829_123341484~3.webp": 65,
+    "67_PXL_20250829_114414779.webp": 66,
+    "68_PXL_20240807_191904432~2.webp": 67,
+    "69_PXL_20230823_163247227.webp": 68,
+    "70_PXL_20250828_164804723~2.webp": 69,
+    "71_PXL_20251025_183557572~2.webp": 70,
+    "72_PXL_20240519_173245250.webp": 71,
+    "73_PXL_20251025_171310690.webp": 72,
+};
\ No newline at end of file
@@ -5,6 +5,7 @@ import { useNavigate } from 'react-router-dom';
 import { useLoader } from '../components/Layout/Layout';
 import Footer from '../components/Layout/Footer';
 import { architectureMetadata } from '../data/architecture_metadata';
+import { architectureOrder } from '../data/architecture_order';
 import usePageTitle from '../hooks/usePageTitle';
 
 
@@ -16,8 +17,14 @@ const thumbModules = import.meta.glob('../../public/images/architecture/thumbs/*
 // Helper to extract filename from path
 const getFilename = (path) => path.split('/').pop();
 
+// Gallery order comes from the order manifest written by the image sorter.
+// Files it doesn't list yet go last, by number prefix (so 100_ follows 99_).
+const galleryPosition = (filename) => architectureOrder[filename] ?? Number.MAX_SAFE_INTEGER;
+const byGalleryOrder = (a, b) =>
+    (galleryPosition(a) - galleryPosition(b)) || a.localeCompare(b, undefined, { numeric: true });
+
 // Get list of all full resolution images
-const allFilenames = Object.keys(fullResModules).map(getFilename).sort();
+const allFilenames = Object.keys(fullResModules).map(getFilename).sort(byGalleryOrder);
 const thumbFilenames = new Set(Object.keys(thumbModules).map(getFilename));
 
 // Full resolution images for lightbox (includes EVERYTHING found in the folder)
@@ -0,0 +1,23 @@
+import pytest
+
+pytest.importorskip("numpy")
+from PIL import Image  # noqa: E402
+
+from sorter import arrange  # noqa: E402
+
+
+def test_unreadable_preview_skips_only_that_image(tmp_path):
+    sources = []
+    for i in range(4):
+        src = tmp_path / f"{i:02d}_img.png"
+        Image.new("RGB", (40, 30), (i * 60, 80, 160)).save(src)
+        preview = tmp_path / f"{i:02d}_thumb.png"
+        Image.new("RGB", (20, 15), (i * 60, 80, 160)).save(preview)
+        sources.append((src, preview))
+    sources[1][1].write_bytes(b"not an image")
+
+    features = arrange.compute_features(sources)
+
+    assert len(features) == len(sources)
+    assert features[1] is None
+    assert all(found is not None for i, found in enumerate(features) if i != 1)
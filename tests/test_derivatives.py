@@ -0,0 +1,22 @@
+from PIL import Image
+
+from sorter import derivatives
+
+
+def test_failed_render_keeps_the_previous_derivatives(tmp_path):
+    for i in range(3):
+        Image.new("RGB", (800, 600), (i * 50, 0, 0)).save(tmp_path / f"0{i}_x.jpg")
+    derivatives.DerivativeBuilder(tmp_path, (320,)).build(jobs=1)
+    width_dir = tmp_path / derivatives.DERIVATIVE_DIR_NAME / "320"
+    before = sorted(path.name for path in width_dir.iterdir())
+
+    (tmp_path / "01_x.jpg").write_bytes(b"not an image any more")
+    seen = []
+    builder = derivatives.DerivativeBuilder(tmp_path, (320,))
+    rendered, _, removed, failures = builder.build(jobs=1, progress=lambda *args: seen.append(args))
+
+    assert (rendered, removed) == (0, 0)
+    assert [name for name, _ in failures] == ["01_x.jpg"]
+    assert seen == [(1, 1, "01_x.jpg")]
+    assert sorted(path.name for path in width_dir.iterdir()) == before
+    assert "01_x.jpg" in builder.state
@@ -0,0 +1,70 @@
+import time
+
+import pytest
+
+tk = pytest.importorskip("tkinter")
+from PIL import Image  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path):
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("no display")
+    from sorter.gui import ImageSorter
+
+    image_dir = tmp_path / "images"
+    (image_dir / "thumbs").mkdir(parents=True)
+    for i in range(6):
+        Image.new("RGB", (40, 30), (i * 40, 80, 160)).save(image_dir / f"{i + 1:02d}_img{i}.png")
+    app = ImageSorter(root, autosave=False, image_dir=image_dir, thumb_dir=image_dir / "thumbs",
+                      metadata_file=tmp_path / "metadata.js", cache_dir=tmp_path / "cache")
+    # Until the visible tiles are in and draggable
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and not all(item.ready for item in app.model):
+        root.update()
+    yield app
+    root.destroy()
+
+
+def tile_at(app, index):
+    return next(t for t in app.tile_pool if t['index'] == index)
+
+
+def click(widget, **modifiers):
+    widget.event_generate("<Button-1>", x=5, y=5, **modifiers)
+    widget.event_generate("<ButtonRelease-1>", x=5, y=5)
+
+
+def names(app):
+    return [item.file.name for item in app.model]
+
+
+@pytest.mark.parametrize("press", [
+    lambda app: click(tile_at(app, 1)['img_label']),
+    lambda app: app.toggle_selection(1),
+    lambda app: app.extend_selection(1),
+    lambda app: app.canvas.event_generate("<Button-1>", x=1, y=1),
+])
+def test_clicks_take_focus_from_the_location_entry(app, press):
+    tile_at(app, 0)['loc_entry'].focus_set()
+    app.root.update()
+    press(app)
+    app.root.update()
+    assert app.root.focus_lastfor() is app.canvas
+
+
+def test_shortcuts_work_again_after_typing_a_location(app):
+    entry = tile_at(app, 0)['loc_entry']
+    entry.focus_set()
+    entry.insert(0, "Somewhere")
+    before = names(app)
+
+    click(tile_at(app, 1)['img_label'])
+    app.canvas.event_generate("<Control-Right>")
+    moved = names(app)
+    assert moved[2] == before[1]
+
+    app.canvas.event_generate("<Control-z>")
+    assert names(app) == before
@@ -0,0 +1,74 @@
+import pytest
+
+from sorter import core, planner
+from sorter.journal import RenameJournal, journal_path
+
+# A swap (a cycle through a temporary name) and a chain into a free name
+RENAMES = [("01_a.jpg", "02_b.jpg"), ("02_b.jpg", "01_a.jpg"), ("03_c.jpg", "04_c.jpg"), ("05_d.jpg", "03_c.jpg")]
+
+
+@pytest.fixture
+def gallery(tmp_path):
+    for src, _ in RENAMES:
+        (tmp_path / src).write_text(src)
+    ops = planner.order_moves([(tmp_path / src, tmp_path / dst) for src, dst in RENAMES])
+    return tmp_path, ops
+
+
+def contents(directory):
+    return {path.name: path.read_text() for path in directory.iterdir() if path.suffix == ".jpg"}
+
+
+def crash(directory, ops, forward, undone=0):
+    """Run forward ops and undo `undone` of them without closing the journal, like a process that died"""
+    journal = RenameJournal.plan(directory, ops)
+    journal._write_header()
+    for i in range(forward):
+        src, dst = journal._paths(journal.ops[i])
+        src.rename(dst)
+        journal._log(i)
+    if undone:
+        journal._turn(True)
+        for i in range(forward - 1, forward - 1 - undone, -1):
+            src, dst = journal._paths(journal.ops[i])
+            dst.rename(src)
+            journal._log(f"-{i}")
+    journal._close()
+
+
+def drop_lines(directory, count):
+    """Lose the last count progress lines, as unsynced writes can be after a power loss"""
+    path = journal_path(directory)
+    lines = path.read_text().split("\n")[:-1]
+    path.write_text("\n".join(lines[:-count]) + "\n")
+
+
+@pytest.mark.parametrize("rollback", [False, True])
+def test_recovery_after_losing_several_progress_lines(gallery, rollback):
+    directory, ops = gallery
+    before = contents(directory)
+    crash(directory, ops, forward=len(ops) - 1)
+    drop_lines(directory, 3)
+
+    core.recover_pending(directory, rollback=rollback)
+
+    assert not journal_path(directory).exists()
+    if rollback:
+        assert contents(directory) == before
+    else:
+        assert contents(directory) == {dst: before[src] for src, dst in RENAMES}
+
+
+@pytest.mark.parametrize("rollback", [False, True])
+def test_recovery_of_an_interrupted_rollback(gallery, rollback):
+    directory, ops = gallery
+    before = contents(directory)
+    crash(directory, ops, forward=len(ops), undone=3)
+    drop_lines(directory, 2)
+
+    core.recover_pending(directory, rollback=rollback)
+
+    if rollback:
+        assert contents(directory) == before
+    else:
+        assert contents(directory) == {dst: before[src] for src, dst in RENAMES}
@@ -0,0 +1,25 @@
+from sorter import core
+
+OLD_HEADER = """/**
+ * Metadata for architecture gallery images.
+ * Value: { location: string }
+ */
+export const architectureMetadata = {
+    "01_a.jpg": { location: 'Rome' },
+    "02_b.jpg": { location: "Oslo" },
+};"""
+
+
+def test_unchanged_metadata_is_not_rewritten(tmp_path):
+    metadata_file = tmp_path / "architecture_metadata.js"
+    metadata_file.write_text(OLD_HEADER, encoding='utf-8')
+    entries = core.read_metadata(metadata_file)[0]
+    assert not core.save_metadata(entries, metadata_file)
+    assert metadata_file.read_text(encoding='utf-8') == OLD_HEADER
+
+
+def test_an_edit_keeps_the_header_and_other_entries(tmp_path):
+    metadata_file = tmp_path / "architecture_metadata.js"
+    metadata_file.write_text(OLD_HEADER, encoding='utf-8')
+    assert core.update_metadata({"02_b.jpg": {"location": "Bergen"}}, metadata_file)
+    assert metadata_file.read_text(encoding='utf-8') == OLD_HEADER.replace("Oslo", "Bergen")
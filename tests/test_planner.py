@@ -0,0 +1,37 @@
+import pytest
+
+from sorter import planner
+
+GALLERY = [f"img{i}.jpg" for i in range(10000)]
+
+
+@pytest.mark.parametrize("numbering, step", [
+    (planner.DENSE, planner.DEFAULT_STEP),
+    (planner.RESPACE, 9),
+    (planner.SPARSE, 9),
+])
+def test_planned_names_read_back_at_10k_images(numbering, step):
+    names = planner.numbered_names(GALLERY, numbering, step)
+    for name, original in zip(names, GALLERY):
+        number, width, base = planner.split_prefix(name)
+        assert number is not None and base == original
+    # Planning again changes numbers at most, never stacks a second prefix
+    again = planner.numbered_names(names, numbering, step)
+    assert [planner.split_prefix(name)[2] for name in again] == GALLERY
+
+
+@pytest.mark.parametrize("numbering", [planner.RESPACE, planner.SPARSE])
+def test_prefixes_wider_than_recognised_are_refused(numbering):
+    with pytest.raises(ValueError, match="6-digit"):
+        planner.numbered_names(GALLERY, numbering, planner.DEFAULT_STEP)
+
+
+def test_sparse_keeps_numbers_of_a_respaced_gallery():
+    names = planner.numbered_names(GALLERY, planner.RESPACE, 9)
+    assert planner.numbered_names(names, planner.SPARSE, 9) == names
+
+
+@pytest.mark.parametrize("step", [0, -10])
+def test_steps_below_one_are_refused(step):
+    with pytest.raises(ValueError, match="at least 1"):
+        planner.numbered_names(GALLERY[:3], planner.RESPACE, step)